@@ -114,6 +114,7 @@ class CliSettings(BaseModel):
     skip_no_text: bool = False
     save_text: bool = True
     load_text: bool = False
+    render_only: bool = False  # 仅重新渲染：复用缓存的修复图，跳过检测/OCR/翻译/修复
     template: bool = False
     save_quality: int = 100
     batch_size: int = 1
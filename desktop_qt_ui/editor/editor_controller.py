@@ -1540,8 +1540,8 @@ class EditorController(QObject):
             import os
             import sys
             sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-            from services.export_service import ExportService
-            export_service = ExportService()
+            from services.export_service import get_export_service
+            export_service = get_export_service()
 
             def progress_callback(message):
                 self.logger.info(f"Export progress: {message}")
@@ -23,6 +23,7 @@ from PyQt6.QtWidgets import QGraphicsItem, QGraphicsPixmapItem, QGraphicsScene,
 from editor import text_renderer_backend
 from editor.editor_model import EditorModel
 from editor.graphics_items import RegionTextItem, TransparentPixmapItem
+from editor.text_preview_renderer import TextPreviewRenderer
 from services import get_render_parameter_service
 
 # --- 结束新增 ---
@@ -78,8 +79,9 @@ class GraphicsView(QGraphicsView):
         self._textbox_start_pos = None
         self._textbox_preview_item = None
 
-        # --- Text Rendering Cache ---
-        self._text_render_cache = {}
+        # --- Text Rendering (后台渲染 + 按内容缓存) ---
+        self._text_preview = TextPreviewRenderer(self)
+        self._text_preview.preview_ready.connect(self._on_text_preview_ready)
 
         # --- Debounce timer for rendering ---
         self.render_debounce_timer = QTimer(self)
@@ -194,8 +196,8 @@ class GraphicsView(QGraphicsView):
             self.scene.removeItem(self._preview_item)
             self._preview_item = None
 
-        # 清空缓存
-        self._text_render_cache.clear()
+        # 清空缓存（文字预览按内容缓存，不需要清空，只作废未完成的任务）
+        self._text_preview.cancel()
         self._text_blocks_cache = []
         self._dst_points_cache = []
 
@@ -451,7 +453,7 @@ class GraphicsView(QGraphicsView):
             self._last_edited_region_index = None # Reset after use
         else:
             # A general change occurred (e.g., new translation). Perform full debounced update.
-            self._text_render_cache.clear()
+            # 文字预览按内容缓存，未变化的区域在刷新时直接命中
             self.render_debounce_timer.start()
 
     def _perform_single_item_update(self, index):
@@ -483,6 +485,9 @@ class GraphicsView(QGraphicsView):
 
     def _perform_render_update(self):
         """执行实际的渲染更新，由防抖计时器调用。"""
+        # 旧 item 即将被替换，尚未完成的预览不再贴回
+        self._text_preview.cancel()
+
         # Clear old region items safely
         for item in self._region_items:
             try:
@@ -569,84 +574,11 @@ class GraphicsView(QGraphicsView):
             # 同步算法计算的 font_size 到 render_params，确保缓存键使用正确的值
             render_params['font_size'] = unrotated_text_block.font_size
             
-            # Set region-specific font_path for cache key
-            region_font_path = region_data.get('font_path', '')
-            if region_font_path and os.path.exists(region_font_path):
-                render_params['font_path'] = region_font_path
-            
-            cache_key = (
-                unrotated_text_block.get_translation_for_rendering(),
-                tuple(map(tuple, self._dst_points_cache[i].reshape(-1, 2))),
-                render_params.get('font_path'),
-                render_params.get('font_size'),
-                render_params.get('bold'),
-                render_params.get('italic'),
-                render_params.get('font_weight'),
-                tuple(render_params.get('font_color', (0,0,0))),
-                tuple(render_params.get('text_stroke_color', (0,0,0))),
-                render_params.get('opacity'),
-                render_params.get('alignment'),
-                render_params.get('direction'),
-                render_params.get('vertical'),
-                render_params.get('line_spacing'),
-                render_params.get('letter_spacing'),
-                render_params.get('layout_mode'),
-                render_params.get('disable_auto_wrap'),
-                render_params.get('hyphenate'),
-                render_params.get('font_size_offset'),
-                render_params.get('font_size_minimum'),
-                render_params.get('max_font_size'),
-                render_params.get('font_scale_ratio'),
-                render_params.get('center_text_in_bubble'),
-                render_params.get('text_stroke_width'),
-                render_params.get('shadow_radius'),
-                render_params.get('shadow_strength'),
-                tuple(render_params.get('shadow_color', (0,0,0))),
-                tuple(render_params.get('shadow_offset', [0.0, 0.0])),
-                render_params.get('disable_font_border'),
-                render_params.get('auto_rotate_symbols'),
-            )
-            cached_result = self._text_render_cache.get(cache_key)
-
-            if cached_result is None:
-                # Set font for this region if specified
-                region_font_path = region_data.get('font_path', '')
-                if region_font_path and os.path.exists(region_font_path):
-                    text_renderer_backend.update_font_config(region_font_path)
-                else:
-                    # Use default font from global parameters
-                    default_params_obj = render_parameter_service.get_default_parameters()
-                    font_path = default_params_obj.font_path
-                    if font_path:
-                        text_renderer_backend.update_font_config(font_path)
-                
-                identity_transform = QTransform()
-                render_result = text_renderer_backend.render_text_for_region(
-                    unrotated_text_block,
-                    self._dst_points_cache[i],
-                    identity_transform,
-                    render_params,
-                    pure_zoom=1.0,
-                    total_regions=len(self._text_blocks_cache)
-                )
-
-                if render_result:
-                    pixmap, pos = render_result
-                    self._text_render_cache[cache_key] = (pixmap, pos)
-                    cached_result = (pixmap, pos)
-            
-            if cached_result:
-                pixmap, pos = cached_result
-                # 不传递 angle，因为 item 已经通过 setRotation() 设置了旋转
-                pivot = None
-
-                item.update_text_pixmap(pixmap, pos, 0, pivot)
-            else:
-                item.update_text_pixmap(QPixmap(), QPointF(0, 0))
-
             # 无论是否有渲染结果,都设置绿框数据(即使 translation 为空)
             item.set_dst_points(self._dst_points_cache[i])
 
+            self._request_text_preview(i, unrotated_text_block, region_data, render_params, render_parameter_service)
+
     def _recalculate_single_region_render_data(self, index):
         """重新计算单个区域的渲染数据"""
         regions = self.model.get_regions()
@@ -717,8 +649,6 @@ class GraphicsView(QGraphicsView):
         global_params_dict = default_params_obj.to_dict()
 
         font_path = default_params_obj.font_path
-        if font_path:
-            text_renderer_backend.update_font_config(font_path)
 
         from manga_translator.config import Config, RenderConfig
 
@@ -732,7 +662,11 @@ class GraphicsView(QGraphicsView):
 
         # 3. 调用后端进行布局计算（只计算单个区域）
         try:
-            single_region_dst_points = resize_regions_to_font_size(self._image_np, [text_block], config_obj, self._image_np)
+            # 字体是全局状态，与后台预览渲染共用一把锁
+            with text_renderer_backend.font_lock:
+                if font_path:
+                    text_renderer_backend.update_font_config(font_path)
+                single_region_dst_points = resize_regions_to_font_size(self._image_np, [text_block], config_obj, self._image_np)
             if single_region_dst_points and len(single_region_dst_points) > 0:
                 self._dst_points_cache[index] = single_region_dst_points[0]
             else:
@@ -813,36 +747,70 @@ class GraphicsView(QGraphicsView):
         # 同步算法计算的 font_size 到 render_params
         render_params['font_size'] = unrotated_text_block.font_size
         
-        # Set font for this region if specified
+        item.set_dst_points(self._dst_points_cache[index])
+        # 几何改变时内容键随之改变，不会误用旧的缓存
+        self._request_text_preview(index, unrotated_text_block, region_data, render_params, render_parameter_service)
+
+    def _request_text_preview(self, index, text_block, region_data, render_params, render_parameter_service):
+        """缓存命中时立即贴图，否则交给后台渲染，完成后由 _on_text_preview_ready 替换"""
+        # Set font for this region if specified, otherwise use default font from global parameters
         region_font_path = region_data.get('font_path', '')
         if region_font_path and os.path.exists(region_font_path):
-            text_renderer_backend.update_font_config(region_font_path)
+            render_params['font_path'] = region_font_path
+            font_filename = region_font_path
         else:
-            # Use default font from global parameters
-            default_params_obj = render_parameter_service.get_default_parameters()
-            font_path = default_params_obj.font_path
-            if font_path:
-                text_renderer_backend.update_font_config(font_path)
-
-        # 渲染文字（不使用缓存，因为几何已经改变）
-        identity_transform = QTransform()
-        render_result = text_renderer_backend.render_text_for_region(
-            unrotated_text_block,
-            self._dst_points_cache[index],
-            identity_transform,
-            render_params,
-            pure_zoom=1.0,
-            total_regions=len(self._text_blocks_cache)
+            font_filename = render_parameter_service.get_default_parameters().font_path or ''
+        dst_points = self._dst_points_cache[index]
+        cache_key = (
+            font_filename,
+            text_block.get_translation_for_rendering(),
+            tuple(map(tuple, dst_points.reshape(-1, 2))),
+            render_params.get('font_path'),
+            render_params.get('font_size'),
+            render_params.get('bold'),
+            render_params.get('italic'),
+            render_params.get('font_weight'),
+            tuple(render_params.get('font_color', (0,0,0))),
+            tuple(render_params.get('text_stroke_color', (0,0,0))),
+            render_params.get('opacity'),
+            render_params.get('alignment'),
+            render_params.get('direction'),
+            render_params.get('vertical'),
+            render_params.get('line_spacing'),
+            render_params.get('letter_spacing'),
+            render_params.get('layout_mode'),
+            render_params.get('disable_auto_wrap'),
+            render_params.get('hyphenate'),
+            render_params.get('font_size_offset'),
+            render_params.get('font_size_minimum'),
+            render_params.get('max_font_size'),
+            render_params.get('font_scale_ratio'),
+            render_params.get('center_text_in_bubble'),
+            render_params.get('text_stroke_width'),
+            render_params.get('shadow_radius'),
+            render_params.get('shadow_strength'),
+            tuple(render_params.get('shadow_color', (0,0,0))),
+            tuple(render_params.get('shadow_offset', [0.0, 0.0])),
+            render_params.get('disable_font_border'),
+            render_params.get('auto_rotate_symbols'),
         )
+        cached_result = self._text_preview.request(index, cache_key, text_block, dst_points, render_params, font_filename)
+        if cached_result is not None:
+            self._on_text_preview_ready(index, cache_key, cached_result)
 
-        if render_result:
-            pixmap, pos = render_result
+    @pyqtSlot(int, object, object)
+    def _on_text_preview_ready(self, index, cache_key, result):
+        """后台渲染完成（或缓存命中），替换对应区域的文字 pixmap"""
+        if not (0 <= index < len(self._region_items)):
+            return
+        item = self._region_items[index]
+        if result:
+            pixmap, pos = result
             # 不传递 angle，因为 item 已经通过 setRotation() 设置了旋转
             item.update_text_pixmap(pixmap, pos, 0, None)
-            item.set_dst_points(self._dst_points_cache[index])
         else:
             item.update_text_pixmap(QPixmap(), QPointF(0, 0))
-            item.set_dst_points(None)
+        item.update()
 
     def recalculate_render_data(self):
         """
@@ -897,8 +865,6 @@ class GraphicsView(QGraphicsView):
         
         # 关键修复：在调用任何渲染函数之前，确保字体已设置
         font_path = default_params_obj.font_path
-        if font_path:
-            text_renderer_backend.update_font_config(font_path)
         
         from manga_translator.config import Config, RenderConfig
         
@@ -918,7 +884,11 @@ class GraphicsView(QGraphicsView):
                 self._dst_points_cache = []
                 return
             
-            self._dst_points_cache = resize_regions_to_font_size(self._image_np, valid_blocks, config_obj, self._image_np)
+            # 字体是全局状态，与后台预览渲染共用一把锁
+            with text_renderer_backend.font_lock:
+                if font_path:
+                    text_renderer_backend.update_font_config(font_path)
+                self._dst_points_cache = resize_regions_to_font_size(self._image_np, valid_blocks, config_obj, self._image_np)
             print(f"[View] Recalculated dst_points for {len(self._dst_points_cache)} regions.")
         except Exception as e:
             print(f"[View] Error during resize_regions_to_font_size: {e}")
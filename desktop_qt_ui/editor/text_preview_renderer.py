@@ -0,0 +1,146 @@
+"""
+编辑器文字预览的后台渲染
+
+以前防抖后的全量刷新在 GUI 线程里逐个区域同步调用 render_text_for_region，区域多时界面会卡住；
+而且任何非定向的区域变化都会清空整个渲染缓存。这里:
+    - 渲染（排版 + 透视变换）在线程池中完成，只产出 BGRA 数组；QPixmap 在 GUI 线程里创建
+    - 每个区域有一个代数，同一区域的新请求会让旧任务作废（未开始的直接取消，已开始的结果不再贴回）
+    - 结果按内容键（译文、几何、渲染参数、字体）缓存，按像素字节数做 LRU，与其他区域的编辑无关
+    - 完成的预览通过 preview_ready 信号逐个交给视图替换
+"""
+import os
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QPointF, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QPixmap
+
+from editor import text_renderer_backend
+
+_MB = 1024 * 1024
+
+
+class PreviewCache:
+    """内容键 -> (QPixmap, QPointF)，超出 max_bytes 时丢弃最久未用的预览；只在 GUI 线程访问"""
+
+    def __init__(self, max_bytes: int = 256 * _MB):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, Tuple[QPixmap, QPointF]]' = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _nbytes(value: Tuple[QPixmap, QPointF]) -> int:
+        pixmap = value[0]
+        return max(1, pixmap.width() * pixmap.height() * 4)
+
+    def get(self, key: Hashable) -> Optional[Tuple[QPixmap, QPointF]]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Tuple[QPixmap, QPointF]):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= self._nbytes(old)
+        self._entries[key] = value
+        self._bytes += self._nbytes(value)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._nbytes(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+class TextPreviewRenderer(QObject):
+    """
+    request() 缓存命中时直接返回 (QPixmap, QPointF)；否则提交后台任务并返回 None，
+    完成后在 GUI 线程发出 preview_ready(区域序号, 内容键, 结果)，渲染失败时结果为 None。
+    """
+    preview_ready = pyqtSignal(int, object, object)
+    # 工作线程 -> GUI 线程（跨线程自动排队）
+    _job_finished = pyqtSignal(int, int, object, object)
+
+    def __init__(self, parent=None, max_workers: int = None, cache_bytes: int = 256 * _MB,
+                 render_func: Callable[..., Optional[Tuple[Any, Tuple[int, int]]]] = None):
+        super().__init__(parent)
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self.cache = PreviewCache(cache_bytes)
+        self._render_func = render_func or text_renderer_backend.render_text_image
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='text-preview')
+        self._generations: Dict[int, int] = {}
+        self._futures: Dict[int, Future] = {}
+        self._job_finished.connect(self._on_job_finished)
+
+    def request(self, index: int, key: Hashable, text_block, dst_points, render_params: dict,
+                font_filename: str = None) -> Optional[Tuple[QPixmap, QPointF]]:
+        self.cancel(index)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self._generations[index]
+        self._futures[index] = self._executor.submit(
+            self._run, index, generation, key, text_block, dst_points, dict(render_params), font_filename)
+        return None
+
+    def cancel(self, index: int = None):
+        """作废一个区域（index 为 None 时所有区域）尚未贴回的任务"""
+        indices = list(self._generations.keys()) if index is None else [index]
+        for i in indices:
+            self._generations[i] = self._generations.get(i, 0) + 1
+            future = self._futures.pop(i, None)
+            if future is not None:
+                future.cancel()
+
+    def pending(self) -> int:
+        return len(self._futures)
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, index: int, generation: int, key, text_block, dst_points, render_params, font_filename):
+        if self._generations.get(index) != generation:
+            return
+        try:
+            result = self._render_func(text_block, dst_points, render_params, font_filename=font_filename)
+        except Exception as e:
+            print(f"[TextPreview] Failed to render region {index}: {e}")
+            result = None
+        try:
+            self._job_finished.emit(index, generation, key, result)
+        except RuntimeError:
+            # 视图已经销毁
+            pass
+
+    @pyqtSlot(int, int, object, object)
+    def _on_job_finished(self, index: int, generation: int, key, result):
+        value = None
+        if result is not None:
+            bgra_image, (x, y) = result
+            value = (text_renderer_backend.bgra_to_pixmap(bgra_image), QPointF(x, y))
+            # 内容键与区域无关，即使任务已作废，结果仍然有效
+            self.cache.put(key, value)
+        if self._generations.get(index) != generation:
+            return
+        self._futures.pop(index, None)
+        self.preview_ready.emit(index, key, value)
@@ -1,6 +1,7 @@
 
 import re
 import logging
+import threading
 
 import cv2
 import numpy as np
@@ -13,10 +14,14 @@ from manga_translator.rendering.text_render import (
 )
 from manga_translator.utils import TextBlock
 from PyQt6.QtCore import QPointF
-from PyQt6.QtGui import QImage, QPixmap, QPolygonF
+from PyQt6.QtGui import QImage, QPixmap
 
 logger = logging.getLogger('manga_translator')
 
+# text_render 的字体是模块级全局状态（FONT / FONT_SELECTION，freetype.Face 也不是线程安全的），
+# 切换字体和排版必须在同一把锁里完成；之后的宽高比校正和透视变换只用 numpy/cv2，可以并行
+font_lock = threading.RLock()
+
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -40,11 +45,37 @@ def update_font_config(font_filename: str):
         except Exception as e:
             pass  # Silently ignore font update errors
 
+def qtransform_to_matrix(transform) -> np.ndarray:
+    """QTransform -> 3x3 齐次矩阵（列向量约定，可直接用于 cv2.perspectiveTransform）"""
+    return np.array([
+        [transform.m11(), transform.m21(), transform.m31()],
+        [transform.m12(), transform.m22(), transform.m32()],
+        [transform.m13(), transform.m23(), transform.m33()],
+    ], dtype=np.float64)
+
+def bgra_to_pixmap(bgra_image: np.ndarray) -> QPixmap:
+    """BGRA 数组 -> QPixmap，只能在 GUI 线程调用"""
+    h, w, _ = bgra_image.shape
+    image = QImage(bgra_image.data, w, h, w * 4, QImage.Format.Format_ARGB32)
+    return QPixmap.fromImage(image)
+
 def render_text_for_region(text_block: TextBlock, dst_points: np.ndarray, transform, render_params: dict, pure_zoom: float = 1.0, total_regions: int = 1):
     """
     为单个区域渲染文本的核心函数
     返回一个包含 (QPixmap, QPointF) 的元组用于绘制，或者在失败时返回 None
     """
+    result = render_text_image(text_block, dst_points, render_params, qtransform_to_matrix(transform))
+    if result is None:
+        return None
+    bgra_image, (x, y) = result
+    return (bgra_to_pixmap(bgra_image), QPointF(x, y))
+
+def render_text_image(text_block: TextBlock, dst_points: np.ndarray, render_params: dict, transform_matrix: np.ndarray = None, font_filename: str = None):
+    """
+    render_text_for_region 的纯 numpy 部分，不创建任何 Qt 对象，可以在工作线程中调用
+    transform_matrix 为 None 时使用图像坐标；font_filename 不为空时先切换到该字体再排版
+    返回 (BGRA 数组, (x, y))，失败时返回 None
+    """
     original_translation = text_block.translation
     try:
         # --- 1. 文本预处理 ---
@@ -106,10 +137,13 @@ def render_text_for_region(text_block: TextBlock, dst_points: np.ndarray, transf
             except:
                 region_count = 1
 
-        if text_block.horizontal:
-            rendered_surface = put_text_horizontal(font_size, text_block.get_translation_for_rendering(), render_w, render_h, text_block.alignment, text_block.direction == 'hl', fg_color, bg_color, text_block.target_lang, hyphenate, line_spacing_from_params, config=config_obj, region_count=region_count)
-        else:
-            rendered_surface = put_text_vertical(font_size, text_block.get_translation_for_rendering(), render_h, text_block.alignment, fg_color, bg_color, line_spacing_from_params, config=config_obj, region_count=region_count)
+        with font_lock:
+            if font_filename:
+                update_font_config(font_filename)
+            if text_block.horizontal:
+                rendered_surface = put_text_horizontal(font_size, text_block.get_translation_for_rendering(), render_w, render_h, text_block.alignment, text_block.direction == 'hl', fg_color, bg_color, text_block.target_lang, hyphenate, line_spacing_from_params, config=config_obj, region_count=region_count)
+            else:
+                rendered_surface = put_text_vertical(font_size, text_block.get_translation_for_rendering(), render_h, text_block.alignment, fg_color, bg_color, line_spacing_from_params, config=config_obj, region_count=region_count)
 
         if rendered_surface is None or rendered_surface.size == 0:
             logger.warning(f"[EDITOR RENDER SKIPPED] Rendered surface is None or empty. Text: '{text_block.translation[:50] if hasattr(text_block, 'translation') else 'N/A'}...'")
@@ -179,8 +213,9 @@ def render_text_for_region(text_block: TextBlock, dst_points: np.ndarray, transf
         src_points = np.float32([[0, 0], [box.shape[1], 0], [box.shape[1], box.shape[0]], [0, box.shape[0]]])
 
         # 将图像坐标转换为视图(屏幕)坐标
-        qpoly = transform.map(QPolygonF([QPointF(p[0], p[1]) for p in dst_points[0]]))
-        dst_points_screen = np.float32([ [p.x(), p.y()] for p in qpoly ])
+        dst_points_screen = np.float32(dst_points[0])
+        if transform_matrix is not None:
+            dst_points_screen = cv2.perspectiveTransform(dst_points_screen.reshape(-1, 1, 2), transform_matrix).reshape(-1, 2).astype(np.float32)
 
         # 计算屏幕上的最小边界框
         x_s, y_s, w_s, h_s = cv2.boundingRect(np.round(dst_points_screen).astype(np.int32))
@@ -198,16 +233,13 @@ def render_text_for_region(text_block: TextBlock, dst_points: np.ndarray, transf
 
         warped_image = cv2.warpPerspective(box, matrix, (w_s, h_s), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(0,0,0,0))
 
-        # --- 5. 转换为QPixmap并返回绘制信息 ---
+        # --- 5. 转换为BGRA并返回绘制信息 ---
         h, w, ch = warped_image.shape
         if ch == 4:
             # Convert RGBA to BGRA for QImage Format_ARGB32
-            bgra_image = warped_image.copy()
-            bgra_image[:, :, [0, 2]] = bgra_image[:, :, [2, 0]]  # Swap R and B channels
-            final_image = QImage(bgra_image.data, w, h, w * 4, QImage.Format.Format_ARGB32)
-            final_pixmap = QPixmap.fromImage(final_image)
-            # 返回pixmap和它在屏幕(视图)上的绘制位置
-            return (final_pixmap, QPointF(x_s, y_s))
+            bgra_image = np.ascontiguousarray(warped_image[:, :, [2, 1, 0, 3]])
+            # 返回图像和它在屏幕(视图)上的绘制位置
+            return (bgra_image, (x_s, y_s))
 
     except Exception as e:
         print(f"Error during backend text rendering: {e}")
@@ -3,15 +3,20 @@
 """
 导出服务
 负责将编辑器中的内容导出为后端渲染的图片
+
+渲染直接在内存中进行（MangaTranslator.render_regions），不再写临时图片和翻译JSON；
+翻译器实例在参数不变时复用，并固定在一个常驻事件循环线程上运行；编辑器通过 get_export_service() 共用同一个实例。
+编辑器目前每次导出当前这一页，export_rendered_image 也走 export_rendered_images → export_pages；
+一次传入多页时渲染依次进行，合成和编码保存交给线程池，与下一页的渲染重叠。
 """
 
 import asyncio
 import json
 import logging
 import os
-import tempfile
 import threading
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 from PIL import Image
@@ -31,11 +36,44 @@ def get_global_output_directory() -> Optional[str]:
     return _global_output_directory
 
 
+class _RenderLoop:
+    """常驻的事件循环线程，翻译器及其加载的模型始终在同一个循环里使用"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                threading.Thread(target=run, name='export-render-loop', daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro):
+        """在渲染线程中执行协程并阻塞等待结果"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+
 class ExportService:
     """导出服务类"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self._render_loop = _RenderLoop()
+        # 同一时间只渲染一页（GPU/字体等全局状态），合成和保存可以并行
+        self._render_lock = threading.Lock()
+        self._translator = None
+        self._translator_signature: Optional[str] = None
     
     def get_output_directory(self) -> Optional[str]:
         """获取设置的输出目录"""
@@ -136,134 +174,223 @@ class ExportService:
         
         if progress_callback:
             progress_callback("开始导出渲染图片...")
-        
-        # 在后台线程中执行导出
-        export_thread = threading.Thread(
-            target=self._perform_backend_render_export,
-            args=(image, regions_data, config, output_path, mask, progress_callback, success_callback, error_callback),
-            daemon=True
-        )
-        export_thread.start()
-    
-    def _perform_backend_render_export(self, image: Image.Image, regions_data: List[Dict[str, Any]],
-                                     config: Dict[str, Any], output_path: str,
-                                     mask: Optional[np.ndarray] = None,
-                                     progress_callback: Optional[callable] = None,
-                                     success_callback: Optional[callable] = None,
-                                     error_callback: Optional[callable] = None):
-        """在后台线程中执行后端渲染导出"""
-        import gc
-        try:
-            if progress_callback:
-                progress_callback("准备导出环境...")
-
-            # 创建临时目录
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # 保存当前图片到临时文件
-                temp_image_path = os.path.join(temp_dir, "temp_image.png")
-                image.save(temp_image_path)
-                
-                # 保存区域数据到JSON文件，使用load_text模式期望的文件名格式
-                base_name = os.path.splitext(os.path.basename(temp_image_path))[0]
-                regions_json_path = os.path.join(temp_dir, f"{base_name}_translations.json")
-                self._save_regions_data(regions_data, regions_json_path, mask, config)
-                
+
+        # 单页导出走批量导出的同一条路径
+        self.export_rendered_images(
+            [{'image': image, 'regions': regions_data, 'mask': mask, 'output_path': output_path}],
+            config, max_workers=1,
+            progress_callback=progress_callback,
+            success_callback=success_callback,
+            error_callback=error_callback)
+
+    def export_rendered_images(self, pages: List[Dict[str, Any]], config: Dict[str, Any],
+                               max_workers: int = 2,
+                               progress_callback: Optional[callable] = None,
+                               success_callback: Optional[callable] = None,
+                               error_callback: Optional[callable] = None):
+        """
+        批量导出多页（后台线程）。pages 中每项包含 image、regions、output_path，可选 mask。
+        全部完成后 success_callback 收到成功数量的说明，有失败时 error_callback 收到失败列表。
+        """
+        def run():
+            import gc
+            try:
+                results = self.export_pages(pages, config, max_workers, progress_callback)
+            except Exception as e:
+                self.logger.error(f"后端渲染导出失败: {e}")
+                if error_callback:
+                    error_callback(f"后端渲染导出失败: {e}")
+                return
+            finally:
+                # 强制执行垃圾回收，释放内存
+                gc.collect()
+            failed = [(path, error) for path, error in results if error]
+            if len(results) == 1:
+                path, error = results[0]
+                if error:
+                    if error_callback:
+                        error_callback(f"导出失败: {error}")
+                elif success_callback:
+                    success_callback(f"图片已导出到: {path}")
+                return
+            if failed and error_callback:
+                error_callback("以下页面导出失败:\n" + "\n".join(f"{os.path.basename(path)}: {error}" for path, error in failed))
+            if success_callback and len(failed) < len(results):
+                success_callback(f"已导出 {len(results) - len(failed)}/{len(results)} 张图片")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def export_pages(self, pages: List[Dict[str, Any]], config: Dict[str, Any], max_workers: int = 2,
+                     progress_callback: Optional[callable] = None) -> List[Tuple[str, Optional[str]]]:
+        """
+        同步批量导出，返回 [(输出路径, 错误信息或None)]，顺序与 pages 一致。
+        渲染在渲染线程中依次执行；合成和编码保存在线程池中进行，与下一页的渲染重叠，
+        等待保存的页面数不超过 max_workers * 2，成品图不会在内存里堆积。
+        """
+        results: List[Tuple[str, Optional[str]]] = [(page['output_path'], None) for page in pages]
+        slots = threading.BoundedSemaphore(max(1, max_workers) * 2)
+
+        def save(i, page, rendered):
+            try:
+                self._composite_and_save(page['image'], rendered, config, page['output_path'])
+            except Exception as e:
+                results[i] = (page['output_path'], str(e))
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='export-save') as executor:
+            for i, page in enumerate(pages):
                 if progress_callback:
-                    progress_callback("初始化翻译引擎...")
-                
-                # 准备翻译器参数
-                translator_params = self._prepare_translator_params(config)
-                
-                # 创建翻译器实例并执行渲染
-                rendered_text_layer = self._execute_backend_render(
-                    temp_image_path, regions_json_path, translator_params, config, progress_callback
-                )
-                
-                if rendered_text_layer:
-                    # Composite the text layer onto the original image
-                    final_image = image.copy()
-                    if final_image.mode != 'RGBA':
-                        temp_img = final_image.convert('RGBA')
-                        final_image.close()  # 释放旧图像
-                        final_image = temp_img
-                    if rendered_text_layer.mode != 'RGBA':
-                        temp_layer = rendered_text_layer.convert('RGBA')
-                        rendered_text_layer.close()  # 释放旧图像
-                        rendered_text_layer = temp_layer
-
-                    # Ensure sizes match before pasting, resizing if necessary
-                    if final_image.size != rendered_text_layer.size:
-                        self.logger.warning(f"Size mismatch: Original {final_image.size}, Rendered {rendered_text_layer.size}. Resizing text layer.")
-                        temp_layer = rendered_text_layer.resize(final_image.size, Image.LANCZOS)
-                        rendered_text_layer.close()  # 释放旧图像
-                        rendered_text_layer = temp_layer
-
-                    final_image.paste(rendered_text_layer, (0, 0), rendered_text_layer)
-                    rendered_text_layer.close()  # 释放渲染层
-
-                    # --- Safer saving logic ---
-                    temp_output_path = output_path + ".tmp"
+                    progress_callback(f"渲染第 {i + 1}/{len(pages)} 页...")
+                slots.acquire()
+                try:
+                    rendered = self.render_page(page['image'], page['regions'], config, page.get('mask'))
+                except Exception as e:
+                    self.logger.error(f"渲染 {page['output_path']} 失败: {e}")
+                    rendered = None
+                    results[i] = (page['output_path'], str(e))
+                if rendered is None:
+                    if results[i][1] is None:
+                        results[i] = (page['output_path'], "没有生成结果图片")
+                    slots.release()
+                    continue
+                executor.submit(save, i, page, rendered)
+        return results
+
+    def render_page(self, image: Image.Image, regions_data: List[Dict[str, Any]], config: Dict[str, Any],
+                    mask: Optional[np.ndarray] = None) -> Optional[Image.Image]:
+        """在内存中渲染一页，返回后端的结果图（失败时返回 None）"""
+        regions = self._prepare_regions(regions_data)
+        if not regions:
+            raise ValueError("没有可渲染的区域数据")
+        translator_params = self._prepare_translator_params(config)
+        cfg = self._build_render_config(config)
+        with self._render_lock:
+            translator = self._get_translator(translator_params)
+            ctx = self._render_loop.run(translator.render_regions(image, regions, cfg, mask=mask, mask_is_refined=mask is not None))
+        if ctx.result is None:
+            self.logger.error("后端渲染没有生成结果")
+            return None
+        return ctx.result
+
+    def _get_translator(self, translator_params: Dict[str, Any]):
+        """参数不变时复用同一个翻译器实例"""
+        signature = json.dumps(translator_params, sort_keys=True, ensure_ascii=False, default=str)
+        if self._translator is None or signature != self._translator_signature:
+            from manga_translator.manga_translator import MangaTranslator
+            self.logger.info("创建翻译器实例...")
+            self._translator = MangaTranslator(params=translator_params)
+            self._translator_signature = signature
+        return self._translator
+
+    def _composite_and_save(self, image: Image.Image, rendered_text_layer: Image.Image,
+                            config: Dict[str, Any], output_path: str):
+        """把渲染结果合成到原图上并保存（先写临时文件再替换）"""
+        # Composite the text layer onto the original image
+        final_image = image.copy()
+        if final_image.mode != 'RGBA':
+            temp_img = final_image.convert('RGBA')
+            final_image.close()  # 释放旧图像
+            final_image = temp_img
+        if rendered_text_layer.mode != 'RGBA':
+            temp_layer = rendered_text_layer.convert('RGBA')
+            rendered_text_layer.close()  # 释放旧图像
+            rendered_text_layer = temp_layer
+
+        # Ensure sizes match before pasting, resizing if necessary
+        if final_image.size != rendered_text_layer.size:
+            self.logger.warning(f"Size mismatch: Original {final_image.size}, Rendered {rendered_text_layer.size}. Resizing text layer.")
+            temp_layer = rendered_text_layer.resize(final_image.size, Image.LANCZOS)
+            rendered_text_layer.close()  # 释放旧图像
+            rendered_text_layer = temp_layer
+
+        final_image.paste(rendered_text_layer, (0, 0), rendered_text_layer)
+        rendered_text_layer.close()  # 释放渲染层
+
+        # --- Safer saving logic ---
+        temp_output_path = output_path + ".tmp"
 
-                    try:
-                        # Handle image saving, applying quality settings for supported formats
-                        output_lower = output_path.lower()
-
-                        if output_lower.endswith(('.jpg', '.jpeg')):
-                            self.logger.info("Output is JPEG, converting from RGBA to RGB...")
-                            temp_img = final_image.convert('RGB')
-                            save_quality = config.get('cli', {}).get('save_quality', 95)
-                            self.logger.info(f"Saving JPEG with quality: {save_quality}")
-                            temp_img.save(temp_output_path, format='JPEG', quality=save_quality)
-                            temp_img.close()  # 释放转换后的图像
-                        elif output_lower.endswith('.webp'):
-                            save_quality = config.get('cli', {}).get('save_quality', 95)
-                            self.logger.info(f"Saving WEBP with quality: {save_quality}")
-                            final_image.save(temp_output_path, format='WEBP', quality=save_quality)
-                        else:
-                            # For other formats like PNG, save directly
-                            final_image.save(temp_output_path, format='PNG')
-
-                        # 释放 final_image
-                        final_image.close()
-
-                        # If save is successful, rename the temp file to the final output path
-                        os.replace(temp_output_path, output_path)
-                        self.logger.info(f"Successfully saved and replaced file at: {output_path}")
-
-                    except Exception as e:
-                        self.logger.error(f"Failed to save image to {output_path}: {e}")
-                        # 确保释放图像
-                        if 'final_image' in locals():
-                            final_image.close()
-                        # Re-raise the exception to be caught by the main try-except block
-                        raise
-                    finally:
-                        # Clean up the temporary file if it still exists
-                        if os.path.exists(temp_output_path):
-                            os.remove(temp_output_path)
-                    
-                    if success_callback:
-                        success_callback(f"图片已导出到: {output_path}")
+        try:
+            # Handle image saving, applying quality settings for supported formats
+            output_lower = output_path.lower()
+
+            if output_lower.endswith(('.jpg', '.jpeg')):
+                self.logger.info("Output is JPEG, converting from RGBA to RGB...")
+                temp_img = final_image.convert('RGB')
+                save_quality = config.get('cli', {}).get('save_quality', 95)
+                self.logger.info(f"Saving JPEG with quality: {save_quality}")
+                temp_img.save(temp_output_path, format='JPEG', quality=save_quality)
+                temp_img.close()  # 释放转换后的图像
+            elif output_lower.endswith('.webp'):
+                save_quality = config.get('cli', {}).get('save_quality', 95)
+                self.logger.info(f"Saving WEBP with quality: {save_quality}")
+                final_image.save(temp_output_path, format='WEBP', quality=save_quality)
+            else:
+                # For other formats like PNG, save directly
+                final_image.save(temp_output_path, format='PNG')
 
-                    self.logger.info(f"图片已成功导出到: {output_path}")
-                else:
-                    if error_callback:
-                        error_callback("导出失败: 没有生成结果图片")
+            # If save is successful, rename the temp file to the final output path
+            os.replace(temp_output_path, output_path)
+            self.logger.info(f"Successfully saved and replaced file at: {output_path}")
 
         except Exception as e:
-            self.logger.error(f"后端渲染导出失败: {e}")
-            import traceback
-            traceback.print_exc()
-
-            if error_callback:
-                error_callback(f"后端渲染导出失败: {e}")
+            self.logger.error(f"Failed to save image to {output_path}: {e}")
+            raise
         finally:
-            # 强制执行垃圾回收，释放内存
-            gc.collect()
+            final_image.close()
+            # Clean up the temporary file if it still exists
+            if os.path.exists(temp_output_path):
+                os.remove(temp_output_path)
     
     def _save_regions_data(self, regions_data: List[Dict[str, Any]], json_path: str, mask: Optional[np.ndarray] = None, config: Optional[Dict[str, Any]] = None):
         """保存区域数据到JSON文件，确保格式与TextBlock兼容"""
-        # 准备保存数据，确保数据格式正确
+        save_data = self._prepare_regions(regions_data)
+        
+        # load_text模式期望的格式：字典，键为图片路径，值为包含regions的字典
+        # 使用临时图片路径作为键
+        image_key = os.path.splitext(os.path.basename(json_path.replace('_translations.json', '')))[0]
+        formatted_data = {
+            image_key: {
+                'regions': save_data
+            }
+        }
+        
+        # 添加超分和上色配置信息
+        if config:
+            upscale_config = config.get('upscale', {})
+            upscale_ratio = upscale_config.get('upscale_ratio', 0)
+            if upscale_ratio:
+                formatted_data[image_key]['upscale_ratio'] = upscale_ratio
+                upscaler = upscale_config.get('upscaler', '')
+                if upscaler:
+                    formatted_data[image_key]['upscaler'] = upscaler
+                self.logger.info(f"在JSON中记录超分信息: ratio={upscale_ratio}, upscaler={upscaler}")
+            
+            colorizer_config = config.get('colorizer', {})
+            colorizer = colorizer_config.get('colorizer', '')
+            if colorizer and colorizer != 'none':
+                formatted_data[image_key]['colorizer'] = colorizer
+                self.logger.info(f"在JSON中记录上色信息: colorizer={colorizer}")
+        
+        # 如果有蒙版数据，则添加到JSON中
+        if mask is not None:
+            self.logger.info("在导出JSON中加入预计算的蒙版。")
+            formatted_data[image_key]['mask_raw'] = mask.tolist()
+            formatted_data[image_key]['mask_is_refined'] = True
+
+        # 添加调试信息
+        self.logger.info(f"保存区域数据到: {json_path}")
+        self.logger.info(f"区域数量: {len(save_data)}")
+        for i, region in enumerate(save_data):
+            lines = region.get('lines', [])
+            shape = np.array(lines).shape if lines is not None else 'N/A'
+            self.logger.info(f"区域 {i}: lines形状={shape}, translation='{region.get('translation', '')[:50]}...'")
+        
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(formatted_data, f, indent=2, ensure_ascii=False, cls=CustomJSONEncoder)
+    
+    def _prepare_regions(self, regions_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """整理编辑器的区域数据，确保格式与TextBlock兼容（JSON导出和内存渲染共用）"""
         save_data = []
         for region in regions_data:
             region_copy = region.copy()
@@ -367,50 +494,8 @@ class ExportService:
                     region_copy['direction'] = 'horizontal'
             
             save_data.append(region_copy)
-        
-        # load_text模式期望的格式：字典，键为图片路径，值为包含regions的字典
-        # 使用临时图片路径作为键
-        image_key = os.path.splitext(os.path.basename(json_path.replace('_translations.json', '')))[0]
-        formatted_data = {
-            image_key: {
-                'regions': save_data
-            }
-        }
-        
-        # 添加超分和上色配置信息
-        if config:
-            upscale_config = config.get('upscale', {})
-            upscale_ratio = upscale_config.get('upscale_ratio', 0)
-            if upscale_ratio:
-                formatted_data[image_key]['upscale_ratio'] = upscale_ratio
-                upscaler = upscale_config.get('upscaler', '')
-                if upscaler:
-                    formatted_data[image_key]['upscaler'] = upscaler
-                self.logger.info(f"在JSON中记录超分信息: ratio={upscale_ratio}, upscaler={upscaler}")
-            
-            colorizer_config = config.get('colorizer', {})
-            colorizer = colorizer_config.get('colorizer', '')
-            if colorizer and colorizer != 'none':
-                formatted_data[image_key]['colorizer'] = colorizer
-                self.logger.info(f"在JSON中记录上色信息: colorizer={colorizer}")
-        
-        # 如果有蒙版数据，则添加到JSON中
-        if mask is not None:
-            self.logger.info("在导出JSON中加入预计算的蒙版。")
-            formatted_data[image_key]['mask_raw'] = mask.tolist()
-            formatted_data[image_key]['mask_is_refined'] = True
+        return save_data
 
-        # 添加调试信息
-        self.logger.info(f"保存区域数据到: {json_path}")
-        self.logger.info(f"区域数量: {len(save_data)}")
-        for i, region in enumerate(save_data):
-            lines = region.get('lines', [])
-            shape = np.array(lines).shape if lines is not None else 'N/A'
-            self.logger.info(f"区域 {i}: lines形状={shape}, translation='{region.get('translation', '')[:50]}...'")
-        
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(formatted_data, f, indent=2, ensure_ascii=False, cls=CustomJSONEncoder)
-    
     def _prepare_translator_params(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """准备翻译器参数"""
         translator_params = {}
@@ -464,88 +549,40 @@ class ExportService:
         
         return translator_params
     
-    def _execute_backend_render(self, image_path: str, regions_json_path: str,
-                              translator_params: Dict[str, Any], config: Dict[str, Any],
-                              progress_callback: Optional[callable] = None) -> Optional[Image.Image]:
-        """执行后端渲染"""
-        image = None
-        try:
-            from manga_translator.config import Config, RenderConfig
-            from manga_translator.manga_translator import MangaTranslator
-
-            if progress_callback:
-                progress_callback("创建翻译器实例...")
-
-            # 创建翻译器实例
-            translator = MangaTranslator(params=translator_params)
-
-            if progress_callback:
-                progress_callback("加载图片和配置...")
-
-            # 加载图片
-            image = Image.open(image_path)
-            image.name = image_path  # 确保图片名称正确，用于load_text模式查找翻译文件
-
-            # 创建配置对象
-            render_config = config.get('render', {}).copy()  # 使用copy避免修改原配置
-            
-            # 转换 direction 值：'v' -> 'vertical', 'h' -> 'horizontal'
-            if 'direction' in render_config:
-                direction_value = render_config['direction']
-                if direction_value == 'v':
-                    render_config['direction'] = 'vertical'
-                elif direction_value == 'h':
-                    render_config['direction'] = 'horizontal'
-            
-            render_config['font_color'] = None # Explicitly disable global font color
-            render_cfg = RenderConfig(**render_config)
-
-            # 创建翻译器配置，设置为none以跳过翻译
-            from manga_translator.config import TranslatorConfig, UpscaleConfig, ColorizerConfig
-            translator_cfg = TranslatorConfig(translator='none')
-            
-            # 从config中提取upscale和colorizer配置
-            upscale_config = config.get('upscale', {})
-            colorizer_config = config.get('colorizer', {})
-            upscale_cfg = UpscaleConfig(**upscale_config) if upscale_config else UpscaleConfig()
-            colorizer_cfg = ColorizerConfig(**colorizer_config) if colorizer_config else ColorizerConfig()
-            
-            self.logger.info(f"Creating Config with upscale_ratio={upscale_cfg.upscale_ratio}, colorizer={colorizer_cfg.colorizer}")
-
-            cfg = Config(render=render_cfg, translator=translator_cfg, upscale=upscale_cfg, colorizer=colorizer_cfg)
-
-            if progress_callback:
-                progress_callback("执行后端渲染...")
-
-            # 执行翻译（实际是渲染）
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+    def _build_render_config(self, config: Dict[str, Any]):
+        """由配置字典创建渲染用的 Config（翻译器为none以跳过翻译）"""
+        from manga_translator.config import (
+            ColorizerConfig,
+            Config,
+            RenderConfig,
+            TranslatorConfig,
+            UpscaleConfig,
+        )
 
-            try:
-                ctx = loop.run_until_complete(translator.translate(image, cfg, image_name=image.name))
-
-                if ctx.result is not None:
-                    # ctx.result is already a PIL Image object, no conversion needed.
-                    result_image = ctx.result
-                    # 关闭输入图像以释放内存
-                    if image:
-                        image.close()
-                        image = None
-                    return result_image
-                else:
-                    self.logger.error("后端渲染没有生成结果")
-                    return None
+        render_config = config.get('render', {}).copy()  # 使用copy避免修改原配置
+        
+        # 转换 direction 值：'v' -> 'vertical', 'h' -> 'horizontal'
+        if 'direction' in render_config:
+            direction_value = render_config['direction']
+            if direction_value == 'v':
+                render_config['direction'] = 'vertical'
+            elif direction_value == 'h':
+                render_config['direction'] = 'horizontal'
+        
+        render_config['font_color'] = None # Explicitly disable global font color
+        render_cfg = RenderConfig(**render_config)
 
-            finally:
-                loop.close()
+        translator_cfg = TranslatorConfig(translator='none')
+        
+        # 从config中提取upscale和colorizer配置
+        upscale_config = config.get('upscale', {})
+        colorizer_config = config.get('colorizer', {})
+        upscale_cfg = UpscaleConfig(**upscale_config) if upscale_config else UpscaleConfig()
+        colorizer_cfg = ColorizerConfig(**colorizer_config) if colorizer_config else ColorizerConfig()
+        
+        self.logger.info(f"Creating Config with upscale_ratio={upscale_cfg.upscale_ratio}, colorizer={colorizer_cfg.colorizer}")
 
-        except Exception as e:
-            self.logger.error(f"执行后端渲染时出错: {e}")
-            raise
-        finally:
-            # 确保输入图像被关闭
-            if image:
-                image.close()
+        return Config(render=render_cfg, translator=translator_cfg, upscale=upscale_cfg, colorizer=colorizer_cfg)
     
     def export_regions_json(self, regions_data: List[Dict[str, Any]], output_path: str, config: Optional[Dict[str, Any]] = None) -> bool:
         """导出区域数据为JSON文件"""
@@ -558,12 +595,14 @@ class ExportService:
             return False
 
 
-# 创建全局导出服务实例
+# 创建全局导出服务实例（所有导出共用一个渲染线程和翻译器）
 _export_service = None
+_export_service_lock = threading.Lock()
 
 def get_export_service() -> ExportService:
     """获取导出服务实例"""
     global _export_service
-    if _export_service is None:
-        _export_service = ExportService()
-    return _export_service
+    with _export_service_lock:
+        if _export_service is None:
+            _export_service = ExportService()
+        return _export_service
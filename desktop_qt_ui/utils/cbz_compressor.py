@@ -3,24 +3,47 @@
 """
 CBZ压缩器模块
 功能：将漫画章节文件夹压缩为CBZ格式，避免重复打包
+
+已处理记录和目录列表保存在 SQLite 目录索引中（旧的 processed_folders.txt 会自动导入）
+
+打包：
+- 多个章节在线程池中同时打包（文件读写、CRC 和 deflate 都会释放 GIL）
+- JPEG/PNG/WebP 等已压缩格式原样存储，只有 BMP/TIFF 这类未压缩格式才 deflate
+- 图片由 ZipFile.write 分块流式写入，不整张读入内存
+- 先写到同目录的 *.part 临时文件，完成后再重命名，中途失败不会留下半个 CBZ
 """
 
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from zipfile import ZipFile, ZIP_STORED
-from typing import List, Tuple, Set
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+from typing import Iterable, Iterator, List, Optional, Tuple, Set
+
+from library_index import LibraryIndex
+
+# 这些格式本身已经压缩，再 deflate 只会浪费 CPU
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.jxl'}
 
 
 class CBZCompressor:
     """CBZ 压缩器"""
     
-    def __init__(self, processed_file: str = "processed_folders.txt"):
+    def __init__(self, processed_file: str = "processed_folders.txt", index_file: Optional[str] = None,
+                 max_workers: Optional[int] = None, compresslevel: int = 6):
         """
         初始化压缩器
         
         Args:
-            processed_file: 记录已处理文件夹的文件路径
+            processed_file: 旧版记录已处理文件夹的文本文件路径（仅用于导入）
+            index_file: 目录索引数据库路径，默认与 processed_file 同名的 .db 文件
+            max_workers: 同时打包的章节数，默认 min(4, CPU 核数)
+            compresslevel: 未压缩格式（BMP/TIFF）的 deflate 级别
         """
+        self.max_workers = max(1, max_workers or min(4, os.cpu_count() or 1))
+        self.compresslevel = compresslevel
         self.processed_file = Path(processed_file)
+        self.index = LibraryIndex(str(index_file or self.processed_file.with_suffix('.db')))
         self.processed = self._load_processed()
     
     def _load_processed(self) -> Set[str]:
@@ -30,23 +53,47 @@ class CBZCompressor:
         Returns:
             已处理文件夹路径集合
         """
-        if self.processed_file.exists():
+        processed = self.index.processed_ids()
+        if not processed and self.processed_file.exists():
+            # 从旧的文本记录导入，导入后改名，避免清空记录后再次导入
             try:
                 with open(self.processed_file, 'r', encoding='utf-8') as f:
-                    return set(line.strip() for line in f if line.strip())
+                    processed = set(line.strip() for line in f if line.strip())
+                self.index.mark_processed(processed)
+                self.processed_file.replace(self.processed_file.with_name(self.processed_file.name + '.bak'))
             except Exception as e:
                 print(f"加载已处理列表失败: {e}")
                 return set()
-        return set()
+        return processed
     
-    def _save_processed(self):
-        """保存已处理的文件夹列表"""
-        try:
-            with open(self.processed_file, 'w', encoding='utf-8') as f:
-                for item in sorted(self.processed):
-                    f.write(f"{item}\n")
-        except Exception as e:
-            print(f"保存已处理列表失败: {e}")
+    def _mark_processed(self, folder_id: str):
+        """记录一个已处理的文件夹（单条写入索引）"""
+        self.processed.add(folder_id)
+        self.index.mark_processed([folder_id])
+    
+    def find_pending_folders(self, base_folder: Path) -> List[Path]:
+        """
+        查找尚未处理的章节文件夹
+        
+        结构：base_folder / 漫画名 / 章节名；目录列表经过索引，未变化的漫画文件夹不会重新扫描
+        
+        Args:
+            base_folder: 基础文件夹路径
+            
+        Returns:
+            待压缩的章节文件夹列表
+        """
+        pending = []
+        if not base_folder.exists():
+            return pending
+        for comic_name in self.index.list_dir(base_folder)[0]:
+            comic_folder = base_folder / comic_name
+            for chapter_name in self.index.list_dir(comic_folder)[0]:
+                chapter_folder = comic_folder / chapter_name
+                # 生成唯一标识符（相对路径）
+                if str(chapter_folder.relative_to(base_folder)) not in self.processed:
+                    pending.append(chapter_folder)
+        return pending
     
     def compress_folders(self, base_folder: Path, recursive: bool = True) -> List[Tuple[str, str]]:
         """
@@ -68,46 +115,37 @@ class CBZCompressor:
             print(f"文件夹不存在: {base_folder}")
             return compressed
         
-        # 遍历漫画文件夹（第一层）
-        for comic_folder in base_folder.iterdir():
-            if not comic_folder.is_dir():
+        # 遍历未处理的章节文件夹（漫画名 / 章节名），需要打包的交给线程池
+        jobs = []
+        for chapter_folder in self.find_pending_folders(base_folder):
+            folder_id = str(chapter_folder.relative_to(base_folder))
+            
+            # 检查是否有图片文件
+            image_files = self._get_image_files(chapter_folder)
+            if not image_files:
+                print(f"跳过（无图片）: {chapter_folder.name}")
                 continue
             
-            # 遍历章节文件夹（第二层）
-            for chapter_folder in comic_folder.iterdir():
-                if not chapter_folder.is_dir():
-                    continue
-                
-                # 生成唯一标识符（相对路径）
-                folder_id = str(chapter_folder.relative_to(base_folder))
-                
-                # 检查是否已处理
-                if folder_id in self.processed:
-                    continue
-                
-                # 检查是否有图片文件
-                image_files = self._get_image_files(chapter_folder)
-                if not image_files:
-                    print(f"跳过（无图片）: {chapter_folder.name}")
-                    continue
-                
-                # 生成 CBZ 文件路径（与章节文件夹同级）
-                cbz_path = chapter_folder.parent / f"{chapter_folder.name}.cbz"
-                
-                # 如果 CBZ 已存在，跳过
-                if cbz_path.exists():
-                    print(f"跳过（已存在）: {cbz_path.name}")
-                    self.processed.add(folder_id)
-                    self._save_processed()
-                    continue
-                
-                # 执行压缩
+            # 生成 CBZ 文件路径（与章节文件夹同级）
+            cbz_path = chapter_folder.parent / f"{chapter_folder.name}.cbz"
+            
+            # 如果 CBZ 已存在，跳过
+            if cbz_path.exists():
+                print(f"跳过（已存在）: {cbz_path.name}")
+                self._mark_processed(folder_id)
+                continue
+            
+            jobs.append((folder_id, chapter_folder, cbz_path, image_files))
+        
+        # 执行压缩
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cbz') as executor:
+            futures = {executor.submit(self._create_cbz, job[1], job[2], job[3]): job for job in jobs}
+            for future in as_completed(futures):
+                folder_id, chapter_folder, cbz_path, _ = futures[future]
                 try:
-                    success = self._create_cbz(chapter_folder, cbz_path, image_files)
-                    if success:
+                    if future.result():
                         compressed.append((str(chapter_folder), str(cbz_path)))
-                        self.processed.add(folder_id)
-                        self._save_processed()
+                        self._mark_processed(folder_id)
                         print(f"✓ 已压缩: {chapter_folder.name} -> {cbz_path.name}")
                 except Exception as e:
                     print(f"✗ 压缩失败 {chapter_folder.name}: {e}")
@@ -126,18 +164,23 @@ class CBZCompressor:
         Returns:
             是否成功创建
         """
+        tmp_path = cbz_path.with_name(f".{cbz_path.name}.{uuid.uuid4().hex[:8]}.part")
         try:
-            with ZipFile(cbz_path, 'w', ZIP_STORED) as cbz:
+            with ZipFile(tmp_path, 'w', ZIP_STORED) as cbz:
                 for img_file in sorted(image_files):
                     # 使用相对路径作为压缩包内的文件名
                     arcname = img_file.name
-                    cbz.write(img_file, arcname)
+                    if img_file.suffix.lower() in STORED_EXTENSIONS:
+                        cbz.write(img_file, arcname)
+                    else:
+                        cbz.write(img_file, arcname, ZIP_DEFLATED, self.compresslevel)
+            os.replace(tmp_path, cbz_path)
             return True
         except Exception as e:
             print(f"创建CBZ失败: {e}")
-            # 删除不完整的文件
-            if cbz_path.exists():
-                cbz_path.unlink()
+            # 删除不完整的临时文件
+            if tmp_path.exists():
+                tmp_path.unlink()
             return False
     
     def compress_folder(self, chapter_folder: Path) -> str:
@@ -175,6 +218,24 @@ class CBZCompressor:
         
         return None
     
+    def compress_chapters(self, chapter_folders: Iterable[Path]) -> Iterator[Tuple[Path, Optional[str], Optional[Exception]]]:
+        """
+        在线程池中并行压缩多个章节文件夹（每个章节同 compress_folder）
+        
+        Args:
+            chapter_folders: 章节文件夹路径列表
+            
+        Yields:
+            按完成顺序产出 (章节文件夹, CBZ文件路径或None, 异常或None)
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cbz') as executor:
+            futures = {executor.submit(self.compress_folder, folder): folder for folder in chapter_folders}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+    
     def _get_image_files(self, folder: Path) -> List[Path]:
         """
         获取文件夹中的所有图片文件
@@ -188,8 +249,9 @@ class CBZCompressor:
         image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff', '.tif'}
         image_files = []
         
-        for file in folder.iterdir():
-            if file.is_file() and file.suffix.lower() in image_extensions:
+        for name in self.index.list_dir(folder)[1]:
+            file = folder / name
+            if file.suffix.lower() in image_extensions:
                 image_files.append(file)
         
         return image_files
@@ -197,7 +259,7 @@ class CBZCompressor:
     def clear_processed_history(self):
         """清空已处理记录（慎用）"""
         self.processed.clear()
-        self._save_processed()
+        self.index.clear_processed()
         print("已清空处理记录")
     
     def get_processed_count(self) -> int:
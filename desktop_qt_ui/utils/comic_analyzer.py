@@ -3,17 +3,56 @@
 """
 漫画章节分析器模块
 功能：分析漫画文件夹结构，识别章节更新情况
+
+目录列表通过 LibraryIndex 获取，未变化的目录直接使用索引，只有变化的子树会重新扫描
 """
 
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from library_index import LibraryIndex
+
+
+# 常见的章节关键词
+CHAPTER_KEYWORDS = ('chapter', 'ch', '第', '话', 'episode', 'ep', 'vol', 'volume')
+
+
+# 不同漫画的章节名大量重复（"Chapter 1"、"第1话"...），判断结果按名称缓存
+@lru_cache(maxsize=65536)
+def _is_chapter_name(name: str) -> bool:
+    folder_name = name.lower()
+    
+    # 检查是否包含章节关键词和数字
+    has_keyword = any(keyword in folder_name for keyword in CHAPTER_KEYWORDS)
+    has_number = bool(re.search(r'\d+', folder_name))
+    
+    # 如果包含章节关键词和数字，或者纯数字文件夹名，则认为是章节文件夹
+    if has_keyword and has_number:
+        return True
+    
+    # 检查是否为纯数字或数字开头的文件夹
+    if re.match(r'^\d+', folder_name):
+        return True
+    
+    return False
+
+
+@lru_cache(maxsize=65536)
+def _chapter_number(chapter_name: str) -> float:
+    # 尝试匹配数字（包括小数）
+    match = re.search(r'(\d+\.?\d*)', chapter_name)
+    if match:
+        return float(match.group(1))
+    return 0
 
 
 class ComicAnalyzer:
     """漫画章节分析器"""
     
-    def __init__(self, download_folder: str, translated_folder: str, storage_folder: str):
+    def __init__(self, download_folder: str, translated_folder: str, storage_folder: str,
+                 index_file: Optional[str] = None):
         """
         初始化分析器
         
@@ -21,10 +60,16 @@ class ComicAnalyzer:
             download_folder: 下载文件夹路径（第一层：网站名，第二层：漫画名，第三层：章节）
             translated_folder: 翻译输出文件夹路径（第一层：漫画名，第二层：章节）
             storage_folder: 存储文件夹路径（第一层：漫画名，包含CBZ文件）
+            index_file: 目录索引数据库路径，为 None 时索引只保存在内存中
         """
         self.download_folder = Path(download_folder)
         self.translated_folder = Path(translated_folder)
         self.storage_folder = Path(storage_folder)
+        self.index = LibraryIndex(index_file)
+    
+    def _list_dir(self, folder: Path):
+        """(子目录名列表, 文件名列表)，经过目录索引"""
+        return self.index.list_dir(folder)
         
     def analyze_updates(self) -> Dict[str, Dict]:
         """
@@ -44,15 +89,11 @@ class ComicAnalyzer:
         
         # 分析下载文件夹（生肉）
         if self.download_folder.exists():
-            for site_folder in self.download_folder.iterdir():
-                if not site_folder.is_dir():
-                    continue
+            for site_name in self._list_dir(self.download_folder)[0]:
+                site_folder = self.download_folder / site_name
                     
-                for comic_folder in site_folder.iterdir():
-                    if not comic_folder.is_dir():
-                        continue
-                        
-                    comic_name = comic_folder.name
+                for comic_name in self._list_dir(site_folder)[0]:
+                    comic_folder = site_folder / comic_name
                     chapters = self._get_chapters(comic_folder)
                     
                     if comic_name not in results:
@@ -65,11 +106,8 @@ class ComicAnalyzer:
         
         # 分析翻译输出文件夹
         if self.translated_folder.exists():
-            for comic_folder in self.translated_folder.iterdir():
-                if not comic_folder.is_dir():
-                    continue
-                    
-                comic_name = comic_folder.name
+            for comic_name in self._list_dir(self.translated_folder)[0]:
+                comic_folder = self.translated_folder / comic_name
                 chapters = self._get_chapters(comic_folder)
                 
                 if comic_name not in results:
@@ -82,14 +120,10 @@ class ComicAnalyzer:
         
         # 分析存储文件夹（CBZ文件）
         if self.storage_folder.exists():
-            for comic_folder in self.storage_folder.iterdir():
-                if not comic_folder.is_dir():
-                    continue
-                    
-                comic_name = comic_folder.name
+            for comic_name in self._list_dir(self.storage_folder)[0]:
+                comic_folder = self.storage_folder / comic_name
                 # 检查 CBZ 文件
-                cbz_files = list(comic_folder.glob('*.cbz'))
-                chapters = [f.stem for f in cbz_files]
+                chapters = [name[:-len('.cbz')] for name in self._list_dir(comic_folder)[1] if name.endswith('.cbz')]
                 
                 if comic_name not in results:
                     results[comic_name] = {
@@ -129,16 +163,13 @@ class ComicAnalyzer:
         if current_depth > max_depth:
             return
         
-        for item in folder.iterdir():
-            if not item.is_dir():
-                continue
-            
+        for name in self._list_dir(folder)[0]:
             # 检查文件夹名是否包含章节号
-            if self._is_chapter_folder(item):
-                chapters.append(item.name)
+            if _is_chapter_name(name):
+                chapters.append(name)
             else:
                 # 继续向下查找
-                self._find_chapters_recursive(item, chapters, current_depth + 1, max_depth)
+                self._find_chapters_recursive(folder / name, chapters, current_depth + 1, max_depth)
     
     def _is_chapter_folder(self, folder: Path) -> bool:
         """
@@ -150,24 +181,7 @@ class ComicAnalyzer:
         Returns:
             是否为章节文件夹
         """
-        folder_name = folder.name.lower()
-        
-        # 常见的章节关键词
-        chapter_keywords = ['chapter', 'ch', '第', '话', 'episode', 'ep', 'vol', 'volume']
-        
-        # 检查是否包含章节关键词和数字
-        has_keyword = any(keyword in folder_name for keyword in chapter_keywords)
-        has_number = bool(re.search(r'\d+', folder_name))
-        
-        # 如果包含章节关键词和数字，或者纯数字文件夹名，则认为是章节文件夹
-        if has_keyword and has_number:
-            return True
-        
-        # 检查是否为纯数字或数字开头的文件夹
-        if re.match(r'^\d+', folder_name):
-            return True
-        
-        return False
+        return _is_chapter_name(folder.name)
     
     def _extract_chapter_number(self, chapter_name: str) -> float:
         """
@@ -179,11 +193,28 @@ class ComicAnalyzer:
         Returns:
             章节号（浮点数）
         """
-        # 尝试匹配数字（包括小数）
-        match = re.search(r'(\d+\.?\d*)', chapter_name)
-        if match:
-            return float(match.group(1))
-        return 0
+        return _chapter_number(chapter_name)
+    
+    def find_untranslated(self, results: Optional[Dict] = None) -> Dict[str, List[str]]:
+        """
+        查找需要翻译的章节（有生肉但既未翻译也未存储）
+        
+        Args:
+            results: analyze_updates()返回的结果字典，为 None 时重新分析
+            
+        Returns:
+            字典，键为漫画名，值为待翻译章节列表（已排序）
+        """
+        if results is None:
+            results = self.analyze_updates()
+        pending = {}
+        for comic_name, data in results.items():
+            done = set(data['translated_chapters']) | set(data['stored_chapters'])
+            # 同一漫画可能来自多个网站，去重后排序
+            chapters = sorted(set(data['raw_chapters']) - done, key=self._extract_chapter_number)
+            if chapters:
+                pending[comic_name] = chapters
+        return pending
     
     def get_latest_chapter(self, comic_name: str, results: Dict) -> str:
         """
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+漫画库目录索引模块
+功能：用 SQLite 持久化目录列表，分析/压缩时只重新扫描有变化的目录
+
+- 每个目录的子项列表连同 (mtime_ns, inode) 存为一行，一次查询即可取回；
+  目录内增删、改名都会更新它自己的 mtime，两者不变时直接使用索引中的列表，
+  只需一次 stat，无需 scandir 和逐项 is_dir
+- 文件系统时间戳有精度限制，刚修改过（2 秒内）的目录不记录 mtime，下次仍会重新扫描
+- 目录被删除后，重新扫描父目录时一并清理其子树的索引
+- processed 表记录已压缩的章节，逐条写入，不再整体重写文本文件
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 修改时间离现在太近的目录不信任缓存
+_RACY_WINDOW_NS = 2_000_000_000
+# 文件名中不可能出现的分隔符
+_SEP = '\0'
+
+
+def _pack(names: List[str]) -> str:
+    return _SEP.join(names)
+
+
+def _unpack(packed: str) -> List[str]:
+    return packed.split(_SEP) if packed else []
+
+
+class LibraryIndex:
+    """目录列表索引（线程安全）"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化索引
+
+        Args:
+            db_path: SQLite 数据库路径，为 None 时只保存在内存中
+        """
+        self.db_path = db_path or ':memory:'
+        if db_path:
+            db_dir = os.path.dirname(os.path.abspath(db_path))
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.stats: Dict[str, int] = {'cached': 0, 'scanned': 0}
+        with self._lock, self._conn:
+            if db_path:
+                self._conn.execute('PRAGMA journal_mode=WAL')
+                self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS dirs (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    subdirs TEXT NOT NULL,
+                    files TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS processed (
+                    folder_id TEXT PRIMARY KEY
+                ) WITHOUT ROWID;
+            """)
+
+    def list_dir(self, path) -> Tuple[List[str], List[str]]:
+        """
+        列出目录的直接子项
+
+        Args:
+            path: 目录路径
+
+        Returns:
+            (子目录名列表, 文件名列表)，均已排序；目录不存在时抛出 OSError
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT mtime_ns, ino, subdirs, files FROM dirs WHERE path = ?', (path,)).fetchone()
+        if row is not None and row[0] == st.st_mtime_ns and row[1] == st.st_ino:
+            self.stats['cached'] += 1
+            return _unpack(row[2]), _unpack(row[3])
+
+        subdirs, files = [], []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    # DirEntry 在大多数平台上直接使用 d_type，不额外 stat
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                (subdirs if is_dir else files).append(entry.name)
+        subdirs.sort()
+        files.sort()
+        trusted = time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS
+        with self._lock, self._conn:
+            if row is not None:
+                for name in set(_unpack(row[2])).difference(subdirs):
+                    self._forget_tree(os.path.join(path, name))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO dirs (path, mtime_ns, ino, subdirs, files) VALUES (?, ?, ?, ?, ?)',
+                (path, st.st_mtime_ns if trusted else -1, st.st_ino, _pack(subdirs), _pack(files)))
+            self.stats['scanned'] += 1
+        return subdirs, files
+
+    def _forget_tree(self, path: str):
+        """删除一个目录及其所有子目录的索引"""
+        # 用范围查询代替 LIKE，路径中的 % 和 _ 不需要转义
+        prefix = path + os.sep
+        upper = path + chr(ord(os.sep) + 1)
+        self._conn.execute('DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)', (path, prefix, upper))
+
+    def processed_ids(self) -> Set[str]:
+        """获取所有已处理的文件夹标识"""
+        with self._lock:
+            return {folder_id for (folder_id,) in self._conn.execute('SELECT folder_id FROM processed')}
+
+    def mark_processed(self, folder_ids: Iterable[str]):
+        """记录已处理的文件夹标识"""
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR IGNORE INTO processed (folder_id) VALUES (?)',
+                                   [(folder_id,) for folder_id in folder_ids])
+
+    def clear_processed(self):
+        """清空已处理记录"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM processed')
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -209,6 +209,7 @@ class OneClickProcessor:
             压缩记录列表 [(源文件夹, CBZ文件), ...]
         """
         compressed = []
+        chapter_folders = []
         
         # 扫描漫画文件夹
         for comic_folder in self.input_folder.iterdir():
@@ -217,19 +218,19 @@ class OneClickProcessor:
             
             # 扫描漫画文件夹中的章节文件夹
             for chapter_folder in comic_folder.iterdir():
-                if not chapter_folder.is_dir():
-                    continue
-                
-                try:
-                    # 压缩章节文件夹
-                    cbz_path = self.compressor.compress_folder(chapter_folder)
-                    if cbz_path:
-                        compressed.append((str(chapter_folder), str(cbz_path)))
-                        self._report_progress(f"  • {comic_folder.name}/{chapter_folder.name} → {Path(cbz_path).name}")
-                except Exception as e:
-                    error_msg = f"压缩失败 {comic_folder.name}/{chapter_folder.name}: {str(e)}"
-                    self.results['errors'].append(error_msg)
-                    self._report_progress(f"  ❌ {error_msg}")
+                if chapter_folder.is_dir():
+                    chapter_folders.append(chapter_folder)
+        
+        # 压缩章节文件夹（多个章节并行打包）
+        for chapter_folder, cbz_path, error in self.compressor.compress_chapters(chapter_folders):
+            comic_name = chapter_folder.parent.name
+            if error is not None:
+                error_msg = f"压缩失败 {comic_name}/{chapter_folder.name}: {str(error)}"
+                self.results['errors'].append(error_msg)
+                self._report_progress(f"  ❌ {error_msg}")
+            elif cbz_path:
+                compressed.append((str(chapter_folder), str(cbz_path)))
+                self._report_progress(f"  • {comic_name}/{chapter_folder.name} → {Path(cbz_path).name}")
         
         return compressed
     
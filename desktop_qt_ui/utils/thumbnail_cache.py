@@ -0,0 +1,81 @@
+"""
+文件列表缩略图的生成与磁盘缓存（不依赖 Qt，可在工作线程中调用）
+
+- 生成时尽量少解码：JPEG 用 draft 模式直接按 1/2~1/8 的 DCT 缩放解码，
+  其余格式用 reduce 先整数倍缩小再做高质量缩放
+- 生成的缩略图以 PNG 存到缓存目录，键为 (绝对路径, 修改时间, 文件大小, 缩略图尺寸)，
+  源文件变化后自然失效；下次打开同一批文件时只读几 KB 的小图
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.webp'}
+
+
+def list_images(folder_path: str) -> List[str]:
+    """列出文件夹中的图片（一次 scandir，不额外 stat），按文件名排序"""
+    with os.scandir(folder_path) as entries:
+        return sorted(entry.path for entry in entries
+                      if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS)
+
+
+def make_thumbnail(path: str, size: int = 40) -> Image.Image:
+    """按缩小尺寸解码并生成不超过 size x size 的缩略图（RGB 或 RGBA）"""
+    with Image.open(path) as img:
+        # JPEG: 解码器直接输出接近目标尺寸的图像，其他格式忽略
+        img.draft('RGB', (size * 2, size * 2))
+        img.thumbnail((size, size), reducing_gap=2.0)
+        if img.mode not in ('RGB', 'RGBA'):
+            return img.convert('RGBA')
+        return img.copy()
+
+
+class ThumbnailDiskCache:
+    def __init__(self, cache_dir: Optional[str] = None, size: int = 40):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'manga-translator-thumbnails')
+        self.size = size
+
+    def key(self, path: str) -> Optional[str]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        raw = f'{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size}'
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.png')
+
+    def get(self, path: str) -> Tuple[Image.Image, bool]:
+        """返回 (缩略图, 是否来自缓存)；源文件无法解码时抛出异常"""
+        key = self.key(path)
+        if key is not None:
+            cache_file = self._file(key)
+            if os.path.isfile(cache_file):
+                try:
+                    with Image.open(cache_file) as cached:
+                        cached.load()
+                        return cached.copy(), True
+                except Exception:
+                    pass
+        thumbnail = make_thumbnail(path, self.size)
+        if key is not None:
+            self._store(key, thumbnail)
+        return thumbnail, False
+
+    def _store(self, key: str, thumbnail: Image.Image):
+        cache_file = self._file(key)
+        tmp_file = f'{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            thumbnail.save(tmp_file, format='PNG')
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"Failed to write thumbnail cache {cache_file}: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
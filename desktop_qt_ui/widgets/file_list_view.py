@@ -1,9 +1,8 @@
 import os
 from typing import Dict, List, Optional
 
-from PIL import Image
-from PyQt6.QtCore import QSize, Qt, pyqtSignal
-from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtCore import QSize, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import (
     QApplication,
     QHBoxLayout,
@@ -15,15 +14,20 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from utils.thumbnail_cache import list_images
+from widgets.thumbnail_loader import ThumbnailLoader
+
 
 class FileItemWidget(QWidget):
     """自定义列表项，用于显示缩略图、文件名和移除按钮"""
     remove_requested = pyqtSignal(str)
 
-    def __init__(self, file_path, is_folder=False, parent=None):
+    def __init__(self, file_path, is_folder=False, parent=None, file_count=None):
         super().__init__(parent)
         self.file_path = file_path
         self.is_folder = is_folder
+        # 缩略图由 FileListView 在行可见时异步加载
+        self.thumbnail_requested = False
 
         self.layout = QHBoxLayout(self)
         self.layout.setContentsMargins(5, 5, 5, 5)
@@ -35,18 +39,21 @@ class FileItemWidget(QWidget):
         self.thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.layout.addWidget(self.thumbnail_label)
 
+        style = QApplication.style()
         if is_folder or os.path.isdir(self.file_path):
-            style = QApplication.style()
+            self.is_folder = True
             icon = style.standardIcon(QStyle.StandardPixmap.SP_DirIcon)
-            self.thumbnail_label.setPixmap(icon.pixmap(QSize(40,40)))
         else:
-            self._load_thumbnail()
+            # 占位图标，真正的缩略图加载完成后替换
+            icon = style.standardIcon(QStyle.StandardPixmap.SP_FileIcon)
+        self.thumbnail_label.setPixmap(icon.pixmap(QSize(40,40)))
 
         # File Name
         display_name = os.path.basename(file_path)
         if is_folder:
-            # 统计文件夹下的文件数量
-            file_count = self._count_files(file_path)
+            # 统计文件夹下的文件数量（调用方已经列过目录时直接传入）
+            if file_count is None:
+                file_count = self._count_files(file_path)
             display_name = f"{display_name} ({file_count}个文件)"
         
         self.name_label = QLabel(display_name)
@@ -64,32 +71,15 @@ class FileItemWidget(QWidget):
         if not os.path.isdir(folder_path):
             return 0
         try:
-            image_extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.webp'}
-            files = [f for f in os.listdir(folder_path) 
-                    if os.path.splitext(f)[1].lower() in image_extensions]
-            return len(files)
+            return len(list_images(folder_path))
         except:
             return 0
 
-    def _load_thumbnail(self):
-        try:
-            img = Image.open(self.file_path)
-            img.thumbnail((40, 40))
-            
-            # Convert PIL image to QPixmap
-            if img.mode == 'RGB':
-                q_img = QImage(img.tobytes(), img.width, img.height, img.width * 3, QImage.Format.Format_RGB888)
-            elif img.mode == 'RGBA':
-                q_img = QImage(img.tobytes(), img.width, img.height, img.width * 4, QImage.Format.Format_RGBA8888)
-            else: # Fallback for other modes like L, P, etc.
-                img = img.convert('RGBA')
-                q_img = QImage(img.tobytes(), img.width, img.height, img.width * 4, QImage.Format.Format_RGBA8888)
-
-            pixmap = QPixmap.fromImage(q_img)
-            self.thumbnail_label.setPixmap(pixmap)
-        except Exception as e:
+    def set_thumbnail(self, pixmap: QPixmap):
+        if pixmap.isNull():
             self.thumbnail_label.setText("ERR")
-            print(f"Error loading thumbnail for {self.file_path}: {e}")
+        else:
+            self.thumbnail_label.setPixmap(pixmap)
 
     def _emit_remove_request(self):
         self.remove_requested.emit(self.file_path)
@@ -114,10 +104,57 @@ class FileListView(QTreeWidget):
         
         # 存储文件夹到树节点的映射
         self.folder_nodes: Dict[str, QTreeWidgetItem] = {}
+
+        # 缩略图只为可见的行加载（后台线程 + 磁盘缓存），列表本身立即显示
+        self._thumbnail_loader = ThumbnailLoader(self)
+        self._thumbnail_loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self._waiting_thumbnails: Dict[str, List[FileItemWidget]] = {}
+        self._thumbnail_timer = QTimer(self)
+        self._thumbnail_timer.setSingleShot(True)
+        self._thumbnail_timer.setInterval(30)
+        self._thumbnail_timer.timeout.connect(self._load_visible_thumbnails)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_thumbnails)
+        self.itemExpanded.connect(self._schedule_thumbnails)
         
         # 连接选择信号
         self.itemSelectionChanged.connect(self._on_selection_changed)
 
+    def _schedule_thumbnails(self, *args):
+        self._thumbnail_timer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._schedule_thumbnails()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._schedule_thumbnails()
+
+    def _load_visible_thumbnails(self):
+        """为可见的行（以及下方一屏，滚动时不必等待）请求缩略图"""
+        limit = self.viewport().height() * 2
+        item = self.itemAt(0, 0)
+        while item is not None:
+            if self.visualItemRect(item).top() > limit:
+                break
+            widget = self.itemWidget(item, 0)
+            if isinstance(widget, FileItemWidget) and not widget.is_folder and not widget.thumbnail_requested:
+                widget.thumbnail_requested = True
+                pixmap = self._thumbnail_loader.request(widget.file_path)
+                if pixmap is not None:
+                    widget.set_thumbnail(pixmap)
+                else:
+                    self._waiting_thumbnails.setdefault(widget.file_path, []).append(widget)
+            item = self.itemBelow(item)
+
+    def _on_thumbnail_ready(self, file_path: str, pixmap: QPixmap):
+        for widget in self._waiting_thumbnails.pop(file_path, []):
+            try:
+                widget.set_thumbnail(pixmap)
+            except RuntimeError:
+                # 行已被移除
+                pass
+
     def _on_selection_changed(self):
         """处理选择变化"""
         selected_items = self.selectedItems()
@@ -142,6 +179,7 @@ class FileListView(QTreeWidget):
             else:
                 # 添加单个文件
                 self._add_single_file(norm_path)
+        self._schedule_thumbnails()
 
     def _add_folder(self, folder_path: str):
         """添加文件夹及其包含的所有图片文件"""
@@ -152,8 +190,15 @@ class FileListView(QTreeWidget):
         folder_item = QTreeWidgetItem(self)
         folder_item.setData(0, Qt.ItemDataRole.UserRole, folder_path)
         
+        # 只列一次目录，数量和文件列表共用
+        try:
+            files = list_images(folder_path)
+        except Exception as e:
+            print(f"Error loading files from folder {folder_path}: {e}")
+            files = []
+
         # 创建文件夹项的自定义控件
-        folder_widget = FileItemWidget(folder_path, is_folder=True)
+        folder_widget = FileItemWidget(folder_path, is_folder=True, file_count=len(files))
         folder_widget.remove_requested.connect(self.file_remove_requested.emit)
         
         self.addTopLevelItem(folder_item)
@@ -163,18 +208,8 @@ class FileListView(QTreeWidget):
         self.folder_nodes[folder_path] = folder_item
         
         # 添加文件夹中的文件
-        try:
-            image_extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.webp'}
-            files = [
-                os.path.join(folder_path, f)
-                for f in os.listdir(folder_path)
-                if os.path.splitext(f)[1].lower() in image_extensions
-            ]
-            
-            for file_path in sorted(files):
-                self._add_file_to_folder(file_path, folder_item)
-        except Exception as e:
-            print(f"Error loading files from folder {folder_path}: {e}")
+        for file_path in files:
+            self._add_file_to_folder(file_path, folder_item)
 
     def _add_file_to_folder(self, file_path: str, parent_item: QTreeWidgetItem):
         """将文件添加到文件夹节点下"""
@@ -245,3 +280,4 @@ class FileListView(QTreeWidget):
         """清空所有项"""
         super().clear()
         self.folder_nodes.clear()
+        self._waiting_thumbnails.clear()
@@ -0,0 +1,99 @@
+"""
+文件列表缩略图的后台加载
+
+缩略图在线程池里生成（或从磁盘缓存读取）并转换为 QImage，完成后在 GUI 线程转成 QPixmap，
+通过 thumbnail_ready 交给列表；同一路径同时只有一个任务，生成过的 QPixmap 留在内存里。
+"""
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set
+
+from PIL import Image
+from PyQt6.QtCore import QObject, QStandardPaths, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImage, QPixmap
+
+from utils.thumbnail_cache import ThumbnailDiskCache
+
+
+def pil_to_qimage(img: Image.Image) -> QImage:
+    """PIL 图像 -> 独立持有数据的 QImage（QImage 可以在工作线程中创建）"""
+    if img.mode == 'RGB':
+        q_img = QImage(img.tobytes(), img.width, img.height, img.width * 3, QImage.Format.Format_RGB888)
+    else:
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        q_img = QImage(img.tobytes(), img.width, img.height, img.width * 4, QImage.Format.Format_RGBA8888)
+    # tobytes() 返回的缓冲区在函数返回后释放，必须复制
+    return q_img.copy()
+
+
+def default_cache_dir() -> Optional[str]:
+    location = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    return os.path.join(location, 'thumbnails') if location else None
+
+
+class ThumbnailLoader(QObject):
+    """
+    request() 内存中已有缩略图时直接返回 QPixmap，否则提交后台任务并返回 None，
+    完成后发出 thumbnail_ready(路径, QPixmap)，失败时 QPixmap 为空。
+    """
+    thumbnail_ready = pyqtSignal(str, QPixmap)
+    # 工作线程 -> GUI 线程（跨线程自动排队）
+    _loaded = pyqtSignal(str, object)
+
+    def __init__(self, parent=None, size: int = 40, max_workers: int = None, cache_dir: str = None,
+                 max_memory_items: int = 2000):
+        super().__init__(parent)
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self.disk_cache = ThumbnailDiskCache(cache_dir or default_cache_dir(), size)
+        self.max_memory_items = max_memory_items
+        self._pixmaps: 'OrderedDict[str, QPixmap]' = OrderedDict()
+        self._in_flight: Set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='thumbnail')
+        self.disk_hits = 0
+        self._loaded.connect(self._on_loaded)
+
+    def request(self, path: str) -> Optional[QPixmap]:
+        pixmap = self._pixmaps.get(path)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(path)
+            return pixmap
+        if path not in self._in_flight:
+            self._in_flight.add(path)
+            self._executor.submit(self._load, path)
+        return None
+
+    def pending(self) -> int:
+        return len(self._in_flight)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, path: str):
+        try:
+            thumbnail, from_disk = self.disk_cache.get(path)
+            if from_disk:
+                self.disk_hits += 1
+            q_img = pil_to_qimage(thumbnail)
+        except Exception as e:
+            print(f"Error loading thumbnail for {path}: {e}")
+            q_img = None
+        try:
+            self._loaded.emit(path, q_img)
+        except RuntimeError:
+            # 列表已经销毁
+            pass
+
+    @pyqtSlot(str, object)
+    def _on_loaded(self, path: str, q_img: Optional[QImage]):
+        self._in_flight.discard(path)
+        if q_img is None:
+            self.thumbnail_ready.emit(path, QPixmap())
+            return
+        pixmap = QPixmap.fromImage(q_img)
+        self._pixmaps[path] = pixmap
+        while len(self._pixmaps) > self.max_memory_items:
+            self._pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(path, pixmap)
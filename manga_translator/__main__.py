@@ -66,6 +66,9 @@ async def dispatch(args: Namespace):
                     textline.translation = apply_dictionary(textline.translation, post_dict)
                     logger.info(f'Post-translation dictionary applied: {textline.translation}')
 
+        # 离线翻译模型在所有输入间常驻，全部处理完后再释放
+        await translator.unload_translators()
+
     elif args.mode == 'ws':
         from manga_translator.mode.ws import MangaTranslatorWS
         translator = MangaTranslatorWS(args_dict)
@@ -102,6 +102,33 @@ def general_parser(g_parser):
                         help='Number of images to send to AI translator at once in high quality mode. Default is 3')
     g_parser.add_argument('--disable-memory-optimization', action='store_true',
                         help='Disable automatic memory optimization during processing')
+    g_parser.add_argument('--model-memory-budget', default=0, type=float,
+                        help='RAM budget in MB for loaded models; least recently used models are unloaded when exceeded (0 means unlimited)')
+    g_parser.add_argument('--vram-memory-budget', default=0, type=float,
+                        help='VRAM budget in MB for loaded models (0 means unlimited)')
+    g_parser.add_argument('--cpu-runtime', default='eager', choices=['eager', 'onnx', 'auto', 'int8'],
+                        help='CPU inference backend (opt-in): eager keeps plain PyTorch; onnx (or auto) exports the default detector to ONNX on first load, '
+                             'writing <checkpoint>.cpu.onnx next to the weights after a drift check; int8 additionally quantizes the 48px OCR linear layers. '
+                             'LaMa inpainters are not covered')
+    g_parser.add_argument('--cleanup-rss-threshold', default=0, type=float,
+                        help='Run garbage collection after inpainting only when process RSS exceeds this many MB (0 = 75%% of system RAM, negative disables)')
+    g_parser.add_argument('--cleanup-vram-threshold', default=0, type=float,
+                        help='Release the CUDA cache after inpainting only when reserved VRAM exceeds this many MB (0 = 85%% of total VRAM, negative disables)')
+    g_parser.add_argument('--cleanup-every-n-pages', default=10, type=int,
+                        help='Also clean up memory every N inpainted pages regardless of pressure (0 disables)')
+    g_parser.add_argument('--dedup', default='off', choices=['off', 'perceptual', 'strict'],
+                        help='Reuse results for duplicate pages and repeated text regions: perceptual also matches near-duplicate regions by pHash/dHash (whole pages only with --dedup-near-pages), strict only byte-identical images')
+    g_parser.add_argument('--dedup-distance', default=4, type=int,
+                        help='Maximum Hamming distance (out of 64 bits) for a perceptual duplicate match')
+    g_parser.add_argument('--dedup-near-pages', action='store_true',
+                        help='Also reuse the whole previous page for perceptual (not byte-identical) matches. Pages that differ only in small text, e.g. title cards with different chapter numbers, can then get the wrong output')
+    g_parser.add_argument('--dedup-cache-dir', default=None, type=str,
+                        help='Directory to persist the duplicate index so later runs can reuse results. '
+                             'Results are stored as pickle files: only point this at a directory written by this program that you trust')
+    g_parser.add_argument('--dedup-memory', default=512, type=float,
+                        help='Maximum MB of cached page results kept in memory for duplicate reuse')
+    g_parser.add_argument('--pin-models', default='', type=str,
+                        help='Comma-separated model class names that are never unloaded by the memory budget or models TTL, e.g. DefaultDetector,LamaLargeInpainter')
     
 
 
@@ -128,11 +155,17 @@ g_batch = parser_batch.add_mutually_exclusive_group()
 g_batch.add_argument('--save-text', action='store_true', help='Save extracted text and translations into a text file.')
 g_batch.add_argument('--load-text', action='store_true', help='Load extracted text and translations from a text file.')
 g_batch.add_argument('--save-text-file', default='', type=str, help='Like --save-text but with a specified file path.')
+g_batch.add_argument('--render-only', action='store_true', help='Like --load-text but reuse the cached inpainted image and only re-run rendering.')
 parser_batch.add_argument('--template', action='store_true', help='Generate a translation template JSON where the translation field is a copy of the original text.')
 parser_batch.add_argument('--prep-manual', action='store_true', help='Prepare for manual typesetting by outputting blank, inpainted images, plus copies of the original for reference')
 parser_batch.add_argument('--save-quality', default=100, type=int, help='Quality of saved JPEG image, range from 0 to 100 with 100 being best')
+parser_batch.add_argument('--png-compress-level', default=None, type=int, choices=range(10), metavar='[0-9]', help='zlib compression level of saved PNG images, lower is faster but larger (default 6)')
+parser_batch.add_argument('--save-workers', default=2, type=int, help='Number of background threads encoding and writing result images')
+parser_batch.add_argument('--save-queue-size', default=4, type=int, help='Maximum number of result images waiting to be written before translation blocks')
 parser_batch.add_argument('--config-file', default=None, type=str, help='path to the config file')
 parser_batch.add_argument('--no-save-mask', action='store_true', help='Do not save the raw mask in the translation JSON file.')
+parser_batch.add_argument('--text-file-format', default='json', choices=['json', 'binary'], help='Format of saved translation data: json (editable) or binary (.mtpack, compact regions and raw/RLE/zstd mask). --save-text-file always writes JSON')
+parser_batch.add_argument('--mask-encoding', default='auto', choices=['auto', 'raw', 'rle', 'zstd', 'zlib'], help='Mask encoding in binary translation files; raw masks can be memory-mapped')
 
 # WebSocket mode
 parser_ws = subparsers.add_parser('ws', help='Run in WebSocket mode')
@@ -141,6 +174,9 @@ parser_ws.add_argument('--port', default=5003, type=int, help='Port for WebSocke
 parser_ws.add_argument('--nonce', default=os.getenv('MT_WEB_NONCE', ''), type=str, help='Nonce for securing internal WebSocket communication')
 parser_ws.add_argument('--ws-url', default='ws://localhost:5000', type=str, help='Server URL for WebSocket mode')
 parser_ws.add_argument('--models-ttl', default='0', type=int, help='How long to keep models in memory in seconds after last use (0 means forever)')
+parser_ws.add_argument('--prefetch-depth', default=2, type=int, help='Number of queued tasks whose images are downloaded and decoded ahead of translation')
+parser_ws.add_argument('--prefetch-memory', default=512, type=float, help='Maximum MB of decoded images held by prefetched tasks')
+parser_ws.add_argument('--upload-concurrency', default=2, type=int, help='Maximum number of results uploaded at the same time')
 
 # API mode
 parser_api = subparsers.add_parser('shared', help='Run in API mode')
@@ -3,6 +3,7 @@ from PIL import Image
 from .common import CommonColorizer, OfflineColorizer
 from .manga_colorization_v2 import MangaColorizationV2
 from ..config import Colorizer
+from ..utils import unload_model_instance
 
 COLORIZERS = {
     Colorizer.mc2: MangaColorizationV2,
@@ -29,4 +30,4 @@ async def dispatch(key: Colorizer, device: str = 'cpu', **kwargs) -> Image.Image
     return await colorizer.colorize(**kwargs)
 
 async def unload(key: Colorizer):
-    colorizer_cache.pop(key, None)
\ No newline at end of file
+    await unload_model_instance(colorizer_cache.pop(key, None))
\ No newline at end of file
@@ -11,7 +11,7 @@ from .none import NoneDetector
 from .yolo_obb import YOLOOBBDetector
 from .common import CommonDetector, OfflineDetector
 from ..config import Detector
-from ..utils import Quadrilateral
+from ..utils import Quadrilateral, unload_model_instance
 
 DETECTORS = {
     Detector.default: DefaultDetector,
@@ -121,96 +121,60 @@ def merge_detection_boxes(yolo_boxes: List[Quadrilateral], main_boxes: List[Quad
     if len(yolo_boxes) == 0:
         return main_boxes
     
-    # 标记要移除的主检测器框索引
-    main_boxes_to_remove = set()
-    # 标记要移除的YOLO框索引
-    yolo_boxes_to_remove = set()
-    # 要添加的YOLO框（用于替换）
-    yolo_boxes_to_add_set = set()  # 使用set避免重复
+    # 一次性计算所有 YOLO框 x 主框 的 AABB 关系矩阵，避免逐对的 Python 循环
+    overlap, overlap_ratio, contains, area_ratio = _aabb_relations(_quads_to_aabb(yolo_boxes), _quads_to_aabb(main_boxes))
     
-    for yolo_idx, yolo_box in enumerate(yolo_boxes):
-        # 计算YOLO框的AABB和面积
-        yolo_min_x = np.min(yolo_box.pts[:, 0])
-        yolo_max_x = np.max(yolo_box.pts[:, 0])
-        yolo_min_y = np.min(yolo_box.pts[:, 1])
-        yolo_max_y = np.max(yolo_box.pts[:, 1])
-        yolo_area = (yolo_max_x - yolo_min_x) * (yolo_max_y - yolo_min_y)
-        
-        # 检查这个YOLO框是否满足任何替换条件
-        can_replace = False
-        max_overlap_ratio_with_others = 0.0  # 与其他未替换主框的最大重叠率
-        replaced_main_indices = set()  # 被这个YOLO框替换的主框索引
-        
-        for main_idx, main_box in enumerate(main_boxes):
-            # 计算主检测器框的AABB和面积
-            main_min_x = np.min(main_box.pts[:, 0])
-            main_max_x = np.max(main_box.pts[:, 0])
-            main_min_y = np.min(main_box.pts[:, 1])
-            main_max_y = np.max(main_box.pts[:, 1])
-            main_area = (main_max_x - main_min_x) * (main_max_y - main_min_y)
-            
-            # 检查是否有重叠
-            if not (yolo_max_x < main_min_x or yolo_min_x > main_max_x or
-                    yolo_max_y < main_min_y or yolo_min_y > main_max_y):
-                # 有重叠，计算重叠面积
-                inter_min_x = max(yolo_min_x, main_min_x)
-                inter_max_x = min(yolo_max_x, main_max_x)
-                inter_min_y = max(yolo_min_y, main_min_y)
-                inter_max_y = min(yolo_max_y, main_max_y)
-                inter_area = (inter_max_x - inter_min_x) * (inter_max_y - inter_min_y)
-                
-                # 计算重叠率（相对于较小框的比例）
-                overlap_ratio = inter_area / min(yolo_area, main_area) if min(yolo_area, main_area) > 0 else 0
-                
-                # 检查YOLO框是否完全包含主检测器框
-                contains = (yolo_min_x <= main_min_x and yolo_max_x >= main_max_x and
-                           yolo_min_y <= main_min_y and yolo_max_y >= main_max_y)
-                
-                # 检查面积条件
-                area_ratio = yolo_area / main_area if main_area > 0 else 0
-                
-                if contains and area_ratio >= 2.0:
-                    # 满足替换条件：标记主检测器框为待删除，记录索引
-                    replaced_main_indices.add(main_idx)
-                    can_replace = True
-                else:
-                    # 不满足替换条件，记录与其他主框的重叠率
-                    max_overlap_ratio_with_others = max(max_overlap_ratio_with_others, overlap_ratio)
-        
-        # 决定这个YOLO框的命运
-        if can_replace:
-            # 满足了替换条件，但还需要检查与其他未替换主框的重叠率
-            if max_overlap_ratio_with_others >= overlap_threshold:
-                # 与其他主框重叠率过高，删除这个YOLO框，不进行替换
-                yolo_boxes_to_remove.add(yolo_idx)
-            else:
-                # 可以安全替换：删除被替换的主框，添加YOLO框
-                for main_idx in replaced_main_indices:
-                    main_boxes_to_remove.add(main_idx)
-                yolo_boxes_to_add_set.add(yolo_idx)
-        else:
-            # 不满足替换条件，按原有逻辑处理
-            if max_overlap_ratio_with_others >= overlap_threshold:
-                # 有重叠且重叠率 >= 阈值，删除这个YOLO框
-                yolo_boxes_to_remove.add(yolo_idx)
-            # else: 没有重叠或重叠率 < 阈值，会在后面作为新框添加
-    
-    # 构建最终结果
-    result = []
+    # 满足替换条件：YOLO框完全包含主框且面积 >= 主框面积 * 2
+    replace = overlap & contains & (area_ratio >= 2.0)
+    can_replace = replace.any(axis=1)
+    # 与其他（不会被替换的）主框的最大重叠率
+    max_overlap_ratio_with_others = np.where(overlap & ~replace, overlap_ratio, 0.0).max(axis=1)
+    too_much_overlap = max_overlap_ratio_with_others >= overlap_threshold
     
-    # 添加未被移除的主检测器框
-    for idx, main_box in enumerate(main_boxes):
-        if idx not in main_boxes_to_remove:
-            result.append(main_box)
-    
-    # 添加YOLO框（替换的 + 不重叠的新框）
-    for idx, yolo_box in enumerate(yolo_boxes):
-        # 如果不在删除列表中，就添加（包括替换框和新框）
-        if idx not in yolo_boxes_to_remove:
-            result.append(yolo_box)
+    # 重叠率过高的YOLO框直接删除（无论是否满足替换条件）
+    yolo_keep = ~too_much_overlap
+    # 可以安全替换的YOLO框，删除它包含的主框
+    main_keep = ~(replace & (can_replace & yolo_keep)[:, None]).any(axis=0)
     
+    # 构建最终结果：未被移除的主框 + YOLO框（替换的 + 不重叠的新框）
+    result = [box for box, keep in zip(main_boxes, main_keep) if keep]
+    result.extend(box for box, keep in zip(yolo_boxes, yolo_keep) if keep)
     return result
 
+
+def _quads_to_aabb(boxes: List[Quadrilateral]) -> np.ndarray:
+    """把检测框列表转换为 (N, 4) 的 [min_x, min_y, max_x, max_y] 数组"""
+    if len(boxes) == 0:
+        return np.zeros((0, 4), dtype=np.float64)
+    pts = np.stack([box.pts for box in boxes]).astype(np.float64)  # (N, 4, 2)
+    return np.concatenate([pts.min(axis=1), pts.max(axis=1)], axis=1)
+
+
+def _aabb_relations(a: np.ndarray, b: np.ndarray):
+    """
+    计算两组 AABB 两两之间的关系（广播）
+    
+    Returns:
+        overlap: (N, M) 是否有重叠（边界接触也算）
+        overlap_ratio: (N, M) 交集面积 / 较小框面积
+        contains: (N, M) a 是否完全包含 b
+        area_ratio: (N, M) a 面积 / b 面积
+    """
+    a_min_x, a_min_y, a_max_x, a_max_y = (a[:, i:i + 1] for i in range(4))
+    b_min_x, b_min_y, b_max_x, b_max_y = (b[None, :, i] for i in range(4))
+    a_area = (a_max_x - a_min_x) * (a_max_y - a_min_y)
+    b_area = (b_max_x - b_min_x) * (b_max_y - b_min_y)
+    
+    overlap = ~((a_max_x < b_min_x) | (a_min_x > b_max_x) | (a_max_y < b_min_y) | (a_min_y > b_max_y))
+    inter_area = (np.minimum(a_max_x, b_max_x) - np.maximum(a_min_x, b_min_x)) * \
+                 (np.minimum(a_max_y, b_max_y) - np.maximum(a_min_y, b_min_y))
+    min_area = np.minimum(a_area, b_area)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        overlap_ratio = np.where(overlap & (min_area > 0), inter_area / min_area, 0.0)
+        area_ratio = np.where(b_area > 0, a_area / b_area, 0.0)
+    contains = (a_min_x <= b_min_x) & (a_max_x >= b_max_x) & (a_min_y <= b_min_y) & (a_max_y >= b_max_y)
+    return overlap, overlap_ratio, contains, area_ratio
+
 def draw_detection_debug_image(image: np.ndarray, main_boxes: List[Quadrilateral], yolo_boxes: List[Quadrilateral], overlap_threshold: float = 0.1) -> np.ndarray:
     """
     绘制检测框调试图片，并标注重叠率
@@ -235,38 +199,15 @@ def draw_detection_debug_image(image: np.ndarray, main_boxes: List[Quadrilateral
         cv2.putText(debug_img, "Main", tuple(pts[0]), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
     
     # 绘制YOLO检测器的框（蓝色），并计算重叠率
-    for yolo_idx, yolo_box in enumerate(yolo_boxes):
+    if len(yolo_boxes) > 0 and len(main_boxes) > 0:
+        overlap, overlap_ratio, _, _ = _aabb_relations(_quads_to_aabb(yolo_boxes), _quads_to_aabb(main_boxes))
+        max_overlap_ratios = np.where(overlap, overlap_ratio, 0.0).max(axis=1)
+    else:
+        max_overlap_ratios = np.zeros(len(yolo_boxes))
+    
+    for yolo_box, max_overlap_ratio in zip(yolo_boxes, max_overlap_ratios):
         pts = yolo_box.pts.astype(np.int32)
         
-        # 计算与主检测器框的最大重叠率
-        yolo_min_x = np.min(yolo_box.pts[:, 0])
-        yolo_max_x = np.max(yolo_box.pts[:, 0])
-        yolo_min_y = np.min(yolo_box.pts[:, 1])
-        yolo_max_y = np.max(yolo_box.pts[:, 1])
-        yolo_area = (yolo_max_x - yolo_min_x) * (yolo_max_y - yolo_min_y)
-        
-        max_overlap_ratio = 0.0
-        for main_box in main_boxes:
-            main_min_x = np.min(main_box.pts[:, 0])
-            main_max_x = np.max(main_box.pts[:, 0])
-            main_min_y = np.min(main_box.pts[:, 1])
-            main_max_y = np.max(main_box.pts[:, 1])
-            main_area = (main_max_x - main_min_x) * (main_max_y - main_min_y)
-            
-            # 检查是否有重叠
-            if not (yolo_max_x < main_min_x or yolo_min_x > main_max_x or
-                    yolo_max_y < main_min_y or yolo_min_y > main_max_y):
-                # 计算重叠面积
-                inter_min_x = max(yolo_min_x, main_min_x)
-                inter_max_x = min(yolo_max_x, main_max_x)
-                inter_min_y = max(yolo_min_y, main_min_y)
-                inter_max_y = min(yolo_max_y, main_max_y)
-                inter_area = (inter_max_x - inter_min_x) * (inter_max_y - inter_min_y)
-                
-                # 计算重叠率
-                overlap_ratio = inter_area / min(yolo_area, main_area) if min(yolo_area, main_area) > 0 else 0
-                max_overlap_ratio = max(max_overlap_ratio, overlap_ratio)
-        
         # 根据重叠率选择颜色 (RGB格式)
         if max_overlap_ratio >= overlap_threshold:
             # 重叠率超过阈值，用红色表示（会被删除）
@@ -293,4 +234,4 @@ def draw_detection_debug_image(image: np.ndarray, main_boxes: List[Quadrilateral
     return debug_img
 
 async def unload(detector_key: Detector):
-    detector_cache.pop(detector_key, None)
+    await unload_model_instance(detector_cache.pop(detector_key, None))
@@ -0,0 +1,114 @@
+"""
+检测批处理调度器
+
+把并发提交的、letterbox 之后尺寸相同的页面合并成一个 batch 做一次 DBNet 前向，
+再把 db/mask 按页拆回去。batch 大小根据当前可用显存/内存估算。
+"""
+import asyncio
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import psutil
+import torch
+
+from ..utils import get_logger
+
+logger = get_logger('DetectionBatchScheduler')
+
+# 单张输入像素在前向过程中大致占用的字节数（激活 + 输出），按 DBNet 2048 分辨率实测取保守值
+_BYTES_PER_PIXEL = 600
+# 只使用可用内存的一部分，给其他模型和碎片留余量
+_MEMORY_FRACTION = 0.6
+MAX_DETECTION_BATCH_SIZE = 8
+
+
+def estimate_detection_batch_size(image_shape: Tuple[int, ...], device: str, max_batch_size: int = MAX_DETECTION_BATCH_SIZE) -> int:
+    """根据可用显存/内存估算能同时前向的页数，至少为1"""
+    h, w = image_shape[:2]
+    per_image = max(1, h * w * _BYTES_PER_PIXEL)
+    try:
+        if device.startswith('cuda') and torch.cuda.is_available():
+            free, _ = torch.cuda.mem_get_info()
+        else:
+            # CPU 以及和系统内存共享的 MPS 都按可用内存估算
+            free = psutil.virtual_memory().available
+    except Exception as e:
+        logger.debug(f'Unable to query free memory, falling back to batch size 1: {e}')
+        return 1
+    return int(max(1, min(max_batch_size, free * _MEMORY_FRACTION // per_image)))
+
+
+def _is_oom_error(e: BaseException) -> bool:
+    return 'out of memory' in str(e).lower()
+
+
+class DetectionBatchScheduler:
+    """
+    合并同一事件循环中并发到达的检测请求。
+
+    第一个到达的请求会让出几次控制权，让其他并发页面（如流水线线1的多个任务）
+    把已经 letterbox 好的图像放进队列，然后由它统一前向；
+    其余请求只需等待自己的结果。顺序调用时退化为单张前向，结果与原来一致。
+    """
+
+    def __init__(self, forward_fn: Callable[[np.ndarray, str], Tuple[np.ndarray, np.ndarray]],
+                 max_batch_size: int = MAX_DETECTION_BATCH_SIZE, gather_ticks: int = 3):
+        self.forward_fn = forward_fn
+        self.max_batch_size = max_batch_size
+        self.gather_ticks = gather_ticks
+        self._pending: List[Tuple[np.ndarray, str, asyncio.Future]] = []
+        self._flush_scheduled = False
+
+    async def forward(self, image: np.ndarray, device: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        提交一张 letterbox 后的图像 (h, w, c)，返回形如 (1, C, H, W) 的 db 和 mask，
+        与 forward_fn([image], device) 的返回格式相同。
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((image, device, future))
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            try:
+                for _ in range(self.gather_ticks):
+                    await asyncio.sleep(0)
+            finally:
+                # 即使当前协程被取消也要完成其他页面的前向，避免它们永远等待
+                self._flush_scheduled = False
+                pending, self._pending = self._pending, []
+                self._flush(pending)
+
+        return await future
+
+    def _flush(self, pending: List[Tuple[np.ndarray, str, asyncio.Future]]):
+        groups: Dict[Tuple, List[Tuple[np.ndarray, asyncio.Future]]] = defaultdict(list)
+        for image, device, future in pending:
+            groups[(image.shape, device)].append((image, future))
+
+        for (shape, device), items in groups.items():
+            batch_size = min(self.max_batch_size, estimate_detection_batch_size(shape, device, self.max_batch_size))
+            if len(items) > 1:
+                logger.info(f'Batched detection: {len(items)} pages of {shape[1]}x{shape[0]}, batch size {batch_size}')
+            start = 0
+            while start < len(items):
+                chunk = items[start:start + batch_size]
+                try:
+                    db, mask = self.forward_fn([image for image, _ in chunk], device)
+                except Exception as e:
+                    if _is_oom_error(e) and batch_size > 1:
+                        batch_size = max(1, batch_size // 2)
+                        logger.warning(f'Detection batch ran out of memory, retrying with batch size {batch_size}')
+                        if device.startswith('cuda') and torch.cuda.is_available():
+                            torch.cuda.empty_cache()
+                        continue
+                    for _, future in chunk:
+                        if not future.done():
+                            future.set_exception(e)
+                    start += len(chunk)
+                    continue
+                for i, (_, future) in enumerate(chunk):
+                    if not future.done():
+                        future.set_result((db[i:i + 1], mask[i:i + 1]))
+                start += len(chunk)
@@ -493,6 +493,7 @@ class DBNetConvNext(nn.Module) :
 import os
 from .default_utils import imgproc, dbnet_utils, craft_utils
 from .common import OfflineDetector
+from .batch_scheduler import DetectionBatchScheduler
 from ..utils import TextBlock, Quadrilateral, det_rearrange_forward
 
 MODEL = None
@@ -523,6 +524,7 @@ class DBConvNextDetector(OfflineDetector):
         if os.path.exists('dbnet_convnext.ckpt'):
             shutil.move('dbnet_convnext.ckpt', self._get_file_path('dbnet_convnext.ckpt'))
         super().__init__(*args, **kwargs)
+        self._batch_scheduler = DetectionBatchScheduler(det_batch_forward_default)
 
     async def _load(self, device: str):
         self.model = DBNetConvNext()
@@ -549,7 +551,8 @@ class DBConvNextDetector(OfflineDetector):
             img_resized, target_ratio, _, pad_w, pad_h = imgproc.resize_aspect_ratio(cv2.bilateralFilter(image, 17, 80, 80), detect_size, cv2.INTER_LINEAR, mag_ratio = 1)
             img_resized_h, img_resized_w = img_resized.shape[:2]
             ratio_h = ratio_w = 1 / target_ratio
-            db, mask = det_batch_forward_default([img_resized], self.device)
+            # 并发到达的同尺寸页面会被合并成一个 batch 前向
+            db, mask = await self._batch_scheduler.forward(img_resized, self.device)
         else:
             img_resized_h, img_resized_w = image.shape[:2]
             ratio_w = ratio_h = 1
@@ -9,7 +9,9 @@ from typing import List, Tuple
 from .default_utils.DBNet_resnet34 import TextDetection as TextDetectionDefault
 from .default_utils import imgproc, dbnet_utils, craft_utils
 from .common import OfflineDetector
+from .batch_scheduler import DetectionBatchScheduler
 from ..utils import TextBlock, Quadrilateral, det_rearrange_forward, imwrite_unicode
+from ..utils.cpu_export import load_or_export_onnx, synthetic_text_page, use_onnx_on
 from ..utils.generic import BASE_PATH
 
 MODEL = None
@@ -39,6 +41,7 @@ class DefaultDetector(OfflineDetector):
         if os.path.exists('detect-20241225.ckpt'):
             shutil.move('detect-20241225.ckpt', self._get_file_path('detect-20241225.ckpt'))
         super().__init__(*args, **kwargs)
+        self._batch_scheduler = DetectionBatchScheduler(det_batch_forward_default)
 
     async def _load(self, device: str):
         self.model = TextDetectionDefault()
@@ -48,9 +51,28 @@ class DefaultDetector(OfflineDetector):
         self.device = device
         if device == 'cuda' or device == 'mps':
             self.model = self.model.to(self.device)
+        elif use_onnx_on(device):
+            # CPU 上使用导出的 ONNX 模型，偏差检查不通过时保留 PyTorch 模型
+            onnx_model = self._load_onnx_model()
+            if onnx_model is not None:
+                self.model = onnx_model
         global MODEL
         MODEL = self.model
 
+    def _load_onnx_model(self):
+        pages = [synthetic_text_page(seed=i) for i in range(2)]
+        inputs = []
+        for page in pages:
+            img_resized, *_ = imgproc.resize_aspect_ratio(page, 768, cv2.INTER_LINEAR, mag_ratio=1)
+            batch = einops.rearrange(img_resized.astype(np.float32) / 127.5 - 1.0, 'h w c -> 1 c h w')
+            inputs.append((torch.from_numpy(batch),))
+        return load_or_export_onnx(
+            self.model, self._get_file_path('detect-20241225.ckpt'), inputs[0],
+            input_names=['image'], output_names=['db', 'mask'],
+            dynamic_axes={'image': {0: 'n', 2: 'h', 3: 'w'}, 'db': {0: 'n', 2: 'h', 3: 'w'}, 'mask': {0: 'n', 2: 'mh', 3: 'mw'}},
+            drift_inputs=inputs, max_abs_tolerance=5e-3, mean_abs_tolerance=1e-4,
+        )
+
     async def _unload(self):
         del self.model
 
@@ -70,7 +92,8 @@ class DefaultDetector(OfflineDetector):
             img_resized, target_ratio, _, pad_w, pad_h = imgproc.resize_aspect_ratio(cv2.bilateralFilter(image, 17, 80, 80), detect_size, cv2.INTER_LINEAR, mag_ratio = 1)
             img_resized_h, img_resized_w = img_resized.shape[:2]
             ratio_h = ratio_w = 1 / target_ratio
-            db, mask = det_batch_forward_default([img_resized], self.device)
+            # 并发到达的同尺寸页面会被合并成一个 batch 前向
+            db, mask = await self._batch_scheduler.forward(img_resized, self.device)
         else:
             img_resized_h, img_resized_w = image.shape[:2]
             ratio_w = ratio_h = 1
@@ -200,30 +200,67 @@ class YOLOOBBDetector(OfflineDetector):
         corners = np.stack([pt1, pt2, pt3, pt4], axis=1)
         return corners
     
-    def nms_rotated(self, boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> List[int]:
-        """旋转框的非极大值抑制 (简化版本)"""
+    @staticmethod
+    def _covariance_matrix(boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """把 xywhr 旋转框转换为高斯分布的协方差矩阵分量 (a, b, c)"""
+        gbbs_a = boxes[:, 2] ** 2 / 12
+        gbbs_b = boxes[:, 3] ** 2 / 12
+        cos = np.cos(boxes[:, 4])
+        sin = np.sin(boxes[:, 4])
+        cos2 = cos ** 2
+        sin2 = sin ** 2
+        return gbbs_a * cos2 + gbbs_b * sin2, gbbs_a * sin2 + gbbs_b * cos2, (gbbs_a - gbbs_b) * cos * sin
+    
+    @classmethod
+    def batch_probiou(cls, obb1: np.ndarray, obb2: np.ndarray, eps: float = 1e-7) -> np.ndarray:
+        """
+        两组旋转框之间的 ProbIoU（基于高斯分布的 Bhattacharyya 距离，与 ultralytics OBB 的 NMS 一致）
+        
+        Args:
+            obb1: (N, 5) xywhr
+            obb2: (M, 5) xywhr
+        
+        Returns:
+            (N, M) IoU 矩阵
+        """
+        x1, y1 = obb1[:, 0:1], obb1[:, 1:2]
+        x2, y2 = obb2[None, :, 0], obb2[None, :, 1]
+        a1, b1, c1 = (v[:, None] for v in cls._covariance_matrix(obb1))
+        a2, b2, c2 = (v[None, :] for v in cls._covariance_matrix(obb2))
+        
+        denom = (a1 + a2) * (b1 + b2) - (c1 + c2) ** 2 + eps
+        t1 = ((a1 + a2) * (y1 - y2) ** 2 + (b1 + b2) * (x1 - x2) ** 2) / denom * 0.25
+        t2 = ((c1 + c2) * (x2 - x1) * (y1 - y2)) / denom * 0.5
+        t3 = np.log(
+            ((a1 + a2) * (b1 + b2) - (c1 + c2) ** 2)
+            / (4 * np.sqrt(np.clip(a1 * b1 - c1 ** 2, 0, None) * np.clip(a2 * b2 - c2 ** 2, 0, None)) + eps)
+            + eps
+        ) * 0.5
+        bd = np.clip(t1 + t2 + t3, eps, 100.0)
+        hd = np.sqrt(1.0 - np.exp(-bd) + eps)
+        return 1 - hd
+    
+    def nms_rotated(self, boxes: np.ndarray, scores: np.ndarray, iou_threshold: float,
+                    class_ids: Optional[np.ndarray] = None) -> List[int]:
+        """
+        旋转框的非极大值抑制（向量化）
+        
+        按分数降序排列后一次性计算所有框两两之间的 ProbIoU，
+        只要与任意一个分数更高的框 IoU 超过阈值就被抑制。
+        给出 class_ids 时按类别分别抑制（与 ultralytics 默认的非 agnostic NMS 一致），
+        不同类别的框（如气泡和其中的文字框）互不影响。
+        """
         if len(boxes) == 0:
             return []
         
         # 按分数排序
-        indices = np.argsort(scores)[::-1]
-        keep = []
-        
-        while len(indices) > 0:
-            current = indices[0]
-            keep.append(current)
-            
-            if len(indices) == 1:
-                break
-            
-            # 简化的 IoU 计算（使用外接矩形）
-            current_box = boxes[current]
-            other_boxes = boxes[indices[1:]]
-            
-            # 计算边界框重叠（简化版）
-            indices = indices[1:]
-        
-        return keep
+        order = np.argsort(scores)[::-1]
+        ious = np.triu(self.batch_probiou(boxes[order], boxes[order]), k=1)
+        if class_ids is not None:
+            sorted_classes = np.asarray(class_ids)[order]
+            ious = np.where(sorted_classes[:, None] == sorted_classes[None, :], ious, 0.0)
+        keep = order[ious.max(axis=0) < iou_threshold]
+        return keep.tolist()
     
     def deduplicate_boxes(
         self,
@@ -237,52 +274,31 @@ class YOLOOBBDetector(OfflineDetector):
         if len(boxes) == 0:
             return boxes, scores, class_ids
         
-        # 计算每个框的中心点
+        # 计算每个框的中心点和外接矩形
         centers = np.mean(boxes, axis=1)  # (N, 2)
-        
+        box_min = np.min(boxes, axis=1)  # (N, 2)
+        box_max = np.max(boxes, axis=1)  # (N, 2)
+        box_area = np.prod(box_max - box_min, axis=1)
+        
+        # 一次性计算两两之间的冲突矩阵
+        dist = np.linalg.norm(centers[:, None, :] - centers[None, :, :], axis=-1)
+        same_class_close = (class_ids[:, None] == class_ids[None, :]) & (dist < distance_threshold)
+        
+        inter_wh = np.maximum(0, np.minimum(box_max[:, None, :], box_max[None, :, :]) - np.maximum(box_min[:, None, :], box_min[None, :, :]))
+        inter_area = inter_wh[..., 0] * inter_wh[..., 1]
+        union_area = box_area[:, None] + box_area[None, :] - inter_area
+        with np.errstate(divide='ignore', invalid='ignore'):
+            overlapping = (union_area > 0) & (inter_area / union_area > iou_threshold)
+        conflicts = same_class_close | overlapping
+        
+        # 按分数从高到低贪心保留：与已保留框冲突的框被移除
         keep = []
-        
-        # 按分数排序（从高到低）
-        sorted_indices = np.argsort(scores)[::-1]
-        
-        for i in sorted_indices:
-            should_keep = True
-            
-            for j in keep:
-                # 检查中心点距离
-                dist = np.linalg.norm(centers[i] - centers[j])
-                
-                # 同类别且距离很近，则去重
-                if class_ids[i] == class_ids[j] and dist < distance_threshold:
-                    should_keep = False
-                    break
-                
-                # 计算简化的IoU（使用边界框）
-                box_i_min = np.min(boxes[i], axis=0)
-                box_i_max = np.max(boxes[i], axis=0)
-                box_j_min = np.min(boxes[j], axis=0)
-                box_j_max = np.max(boxes[j], axis=0)
-                
-                # 计算交集
-                inter_min = np.maximum(box_i_min, box_j_min)
-                inter_max = np.minimum(box_i_max, box_j_max)
-                inter_wh = np.maximum(0, inter_max - inter_min)
-                inter_area = inter_wh[0] * inter_wh[1]
-                
-                # 计算并集
-                box_i_area = (box_i_max[0] - box_i_min[0]) * (box_i_max[1] - box_i_min[1])
-                box_j_area = (box_j_max[0] - box_j_min[0]) * (box_j_max[1] - box_j_min[1])
-                union_area = box_i_area + box_j_area - inter_area
-                
-                # 计算IoU
-                if union_area > 0:
-                    iou = inter_area / union_area
-                    if iou > iou_threshold:
-                        should_keep = False
-                        break
-            
-            if should_keep:
-                keep.append(i)
+        suppressed = np.zeros(len(boxes), dtype=bool)
+        for i in np.argsort(scores)[::-1]:
+            if suppressed[i]:
+                continue
+            keep.append(i)
+            suppressed |= conflicts[i]
         
         return boxes[keep], scores[keep], class_ids[keep]
     
@@ -352,7 +368,7 @@ class YOLOOBBDetector(OfflineDetector):
         # NMS
         boxes_xywhr = np.concatenate((x[:, :4], x[:, -1:]), axis=-1)
         scores = x[:, 4]
-        keep_indices = self.nms_rotated(boxes_xywhr, scores, iou_threshold)
+        keep_indices = self.nms_rotated(boxes_xywhr, scores, iou_threshold, class_ids=x[:, 5])
         x = x[keep_indices]
         
         # 提取结果
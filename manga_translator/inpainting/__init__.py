@@ -9,6 +9,7 @@ from .inpainting_sd import StableDiffusionInpainter
 from .none import NoneInpainter
 from .original import OriginalInpainter
 from ..config import Inpainter, InpainterConfig
+from ..utils import unload_model_instance
 
 INPAINTERS = {
     Inpainter.default: AotInpainter,
@@ -42,4 +43,4 @@ async def dispatch(inpainter_key: Inpainter, image: np.ndarray, mask: np.ndarray
     return await inpainter.inpaint(image, mask, config, inpainting_size, verbose)
 
 async def unload(inpainter_key: Inpainter):
-    inpainter_cache.pop(inpainter_key, None)
\ No newline at end of file
+    await unload_model_instance(inpainter_cache.pop(inpainter_key, None))
\ No newline at end of file
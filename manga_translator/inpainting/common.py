@@ -2,7 +2,7 @@ import numpy as np
 from abc import abstractmethod
 
 from ..config import InpainterConfig
-from ..utils import InfererModule, ModelWrapper
+from ..utils import InfererModule, ModelWrapper, memory_cleanup
 
 class CommonInpainter(InfererModule):
 
@@ -18,25 +18,13 @@ class OfflineInpainter(CommonInpainter, ModelWrapper):
 
     async def _inpaint(self, *args, **kwargs):
         result = await self.infer(*args, **kwargs)
-        # ✅ 统一Inpainting内存清理：在修复完成后立即清理
+        # 只在内存/显存压力超过阈值或每隔 N 页时才做 gc 和 CUDA 缓存清理
         self._cleanup_memory()
         return result
     
     def _cleanup_memory(self):
-        """统一的Inpainting内存清理方法，在每次推理后自动调用"""
-        import torch
-        import gc
-        
-        # 清理CUDA缓存（多次确保彻底）
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-            torch.cuda.synchronize()
-        
-        # 强制垃圾回收（3次确保彻底）
-        for _ in range(3):
-            gc.collect()
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
+        """每次推理后调用，由 memory_cleanup 决定是否真正清理"""
+        memory_cleanup.page_done(self._key)
 
     @abstractmethod
     async def _infer(self, image: np.ndarray, mask: np.ndarray, config: InpainterConfig, inpainting_size: int = 1024, verbose: bool = False) -> np.ndarray:
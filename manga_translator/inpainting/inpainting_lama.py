@@ -164,10 +164,8 @@ class LamaInpainter(LamaMPEInpainter):
         
         ans = img_inpainted * mask_original_resized + img_original * (1 - mask_original_resized)
         
-        # ✅ ONNX内存清理
-        import gc
+        # 释放中间数组；gc 由 OfflineInpainter 按内存压力统一处理
         del img, mask_input, ort_inputs, img_inpainted, img_original, mask_original, mask_original_resized
-        gc.collect()
         
         return ans
 
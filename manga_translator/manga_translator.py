@@ -1,5 +1,6 @@
 
 import asyncio
+import copy
 import torch
 import cv2
 import json
@@ -13,7 +14,7 @@ import sys
 import traceback
 import numpy as np
 from PIL import Image
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Union
 import py3langid as langid
 
 from .config import Config, Colorizer, Detector, Translator, Renderer, Inpainter
@@ -21,6 +22,8 @@ from .utils import (
     BASE_PATH,
     LANGUAGE_ORIENTATION_PRESETS,
     ModelWrapper,
+    model_residency,
+    memory_cleanup,
     Context,
     load_image,
     dump_image,
@@ -36,11 +39,19 @@ import matplotlib
 matplotlib.use('Agg')  # 使用非GUI后端
 import matplotlib.pyplot as plt
 from matplotlib import cm
+from .save import ResultWriter
+from .utils.page_dedup import DedupIndex, config_signature, fingerprint
+from .utils.cpu_export import set_cpu_runtime
+from .utils.replace_dictionary import ReplaceDictionary, load_replace_dictionary, apply_replace_dictionary
 from .utils.path_manager import (
     get_json_path,
+    get_sidecar_path,
     get_inpainted_path,
-    find_json_path
+    find_json_path,
+    find_translation_file,
+    find_inpainted_path
 )
+from .utils.sidecar import SIDECAR_EXT, save_sidecar, load_sidecar
 
 from .detection import dispatch as dispatch_detection, prepare as prepare_detection, unload as unload_detection
 from .upscaling import dispatch as dispatch_upscaling, prepare as prepare_upscaling, unload as unload_upscaling
@@ -52,6 +63,7 @@ from .translators import (
     dispatch as dispatch_translation,
     prepare as prepare_translation,
     unload as unload_translation,
+    unload_all as unload_all_translators,
 )
 from .translators.common import ISO_639_1_TO_VALID_LANGUAGES
 from .colorization import dispatch as dispatch_colorization, prepare as prepare_colorization, unload as unload_colorization
@@ -76,38 +88,26 @@ class TranslationInterrupt(Exception):
     pass
 
 def load_dictionary(file_path):
-    dictionary = []
+    """加载译前/译后替换字典，按文件修改时间缓存编译结果"""
     if file_path:
         path_to_check = file_path if os.path.isabs(file_path) else os.path.join(BASE_PATH, file_path)
         if os.path.exists(path_to_check):
-            with open(path_to_check, 'r', encoding='utf-8') as file:
-                for line_number, line in enumerate(file, start=1):
-                    # Ignore empty lines and lines starting with '#' or '//'
-                    if not line.strip() or line.strip().startswith('#') or line.strip().startswith('//'):
-                        continue
-                    # Remove comment parts
-                    line = line.split('#')[0].strip()
-                    line = line.split('//')[0].strip()
-                    parts = line.split()
-                    if len(parts) == 1:
-                        # If there is only the left part, the right part defaults to an empty string, meaning delete the left part
-                        pattern = re.compile(parts[0])
-                        dictionary.append((pattern, '', line_number))
-                    elif len(parts) == 2:
-                        # If both left and right parts are present, perform the replacement
-                        pattern = re.compile(parts[0])
-                        dictionary.append((pattern, parts[1], line_number))
-                    else:
-                        logger.error(f'Invalid dictionary entry at line {line_number}: {line.strip()}')
-    return dictionary
+            return load_replace_dictionary(path_to_check, on_error=logger.error)
+    return ReplaceDictionary([])
+
+def _regions_geometry_digest(regions_data) -> str:
+    """计算JSON中文本区域几何信息的摘要，用于判断缓存的修复图是否仍然有效"""
+    import hashlib
+    h = hashlib.md5()
+    for region_data in regions_data or []:
+        lines = region_data.get('lines') if isinstance(region_data, dict) else None
+        if lines is None:
+            continue
+        h.update(np.round(np.asarray(lines, dtype=np.float64)).astype(np.int32).tobytes())
+    return h.hexdigest()
 
 def apply_dictionary(text, dictionary):
-    for pattern, value, line_number in dictionary:
-        original_text = text  
-        text = pattern.sub(value, text)
-        if text != original_text:  
-            logger.info(f'Line {line_number}: Replaced "{original_text}" with "{text}" using pattern "{pattern.pattern}" and value "{value}"')
-    return text
+    return apply_replace_dictionary(text, dictionary)
 
 class MangaTranslator:
     verbose: bool
@@ -306,6 +306,18 @@ class MangaTranslator:
         self.use_mtpe = params.get('use_mtpe', False)
         self.font_path = params.get('font_path', None)
         self.models_ttl = params.get('models_ttl', 0)
+        # 模型驻留预算（MB，0 表示不限制）与固定不卸载的模型。
+        # 驻留管理器是进程级共享的，只应用参数中显式给出的项，
+        # 避免后创建的实例（如编辑器导出用的翻译器）覆盖已有的预算和固定列表
+        pinned_models = params.get('pin_models')
+        if isinstance(pinned_models, str):
+            pinned_models = [name.strip() for name in pinned_models.split(',') if name.strip()]
+        set_cpu_runtime(params.get('cpu_runtime') or 'eager')
+        model_residency.configure(
+            ram_budget_mb=float(params['model_memory_budget'] or 0) if params.get('model_memory_budget') is not None else None,
+            vram_budget_mb=float(params['vram_memory_budget'] or 0) if params.get('vram_memory_budget') is not None else None,
+            pinned=list(pinned_models) if pinned_models is not None else None,
+        )
         self.batch_size = params.get('batch_size', 1)  # 添加批量大小参数
         self.high_quality_batch_size = params.get('high_quality_batch_size', 3)
         self.pipeline_mode = params.get('pipeline_mode', False)  # 流水线并行模式
@@ -325,6 +337,12 @@ class MangaTranslator:
             params.get('pipeline_translation_batch_size', self.high_quality_batch_size),
             self.high_quality_batch_size
         )
+        # 修复后的 gc/CUDA 缓存清理阈值（MB，0 表示按物理内存/显存自动计算，负数表示禁用该项）
+        memory_cleanup.configure(
+            rss_threshold_mb=float(params.get('cleanup_rss_threshold') or 0),
+            vram_threshold_mb=float(params.get('cleanup_vram_threshold') or 0),
+            every_n_pages=_safe_int(params.get('cleanup_every_n_pages', 10), 10),
+        )
         
         # 长图拼接配置
         self.enable_long_image_stitching = params.get('enable_long_image_stitching', False)
@@ -362,15 +380,52 @@ class MangaTranslator:
         self.save_text = params.get('save_text', False)
         # Set load_text
         self.load_text = params.get('load_text', False)
+        # Set render_only: 复用JSON中的文本区域和缓存的修复图，只重新渲染
+        self.render_only = params.get('render_only', False)
+        if self.render_only:
+            self.load_text = True
         self.save_mask = not params.get('no_save_mask', False)
+        # 翻译数据文件格式：json（默认，编辑器可直接读取）或 binary（.mtpack，蒙版不再编码为base64 PNG）
+        self.text_file_format = params.get('text_file_format') or 'json'
+        self.mask_encoding = params.get('mask_encoding') or 'auto'
+        if self.text_file_format == 'binary' and self.text_output_file:
+            # --save-text-file 写到指定的单个文件，加载时只查找默认位置，二进制文件无法被读回
+            logger.warning('--text-file-format binary is not supported with --save-text-file, saving JSON instead')
+            self.text_file_format = 'json'
         self.template = params.get('template', False)
         self.is_ui_mode = params.get('is_ui_mode', False)
         self.attempts = params.get('attempts', -1)
         self.save_quality = params.get('save_quality', 100)
+        # 后台结果写入：并行编码、原子写入，队列满时阻塞提交方
+        self.png_compress_level = params.get('png_compress_level', None)
+        if getattr(self, '_result_writer', None) is None:
+            self._result_writer = ResultWriter(
+                max_workers=params.get('save_workers') or 2,
+                max_pending=params.get('save_queue_size') or 4,
+                png_compress_level=self.png_compress_level,
+            )
+        else:
+            self._result_writer.png_compress_level = self.png_compress_level
+        if getattr(self, '_pending_result_saves', None) is None:
+            self._pending_result_saves = []
         self.skip_no_text = params.get('skip_no_text', False)
         self.generate_and_export = params.get('generate_and_export', False)
         self.colorize_only = params.get('colorize_only', False)
         self.upscale_only = params.get('upscale_only', False)
+        # 重复页面/区域复用：perceptual 按感知哈希匹配近似重复，strict 只复用字节相同的图片
+        self.dedup_mode = params.get('dedup') or 'off'
+        if self.dedup_mode != 'off' and getattr(self, '_page_dedup', None) is None:
+            dedup_kwargs = dict(
+                mode=self.dedup_mode,
+                max_distance=_safe_int(params.get('dedup_distance', 4), 4),
+                cache_dir=params.get('dedup_cache_dir') or None,
+            )
+            self._page_dedup = DedupIndex('page', max_memory_mb=float(params.get('dedup_memory') or 512), **dedup_kwargs)
+            self._region_dedup = DedupIndex('region', max_memory_mb=16, **dedup_kwargs)
+        elif self.dedup_mode == 'off':
+            self._page_dedup = self._region_dedup = None
+        # 近似重复（感知哈希命中、字节不同）的页面默认不整页复用，只有字节相同才直接输出之前的结果
+        self.dedup_near_pages = bool(params.get('dedup_near_pages', False))
         
         
         # batch_concurrent 已在初始化时设置并验证
@@ -521,117 +576,18 @@ class MangaTranslator:
             except Exception as e:
                 logger.error(f"Failed to import TXT: {e}, continuing with normal load text processing")
 
+            if self.render_only:
+                render_ctx = await self._try_render_only(config, ctx)
+                if render_ctx is not None:
+                    return render_ctx
+                logger.info("Render-only cache is not usable, falling back to full load text processing.")
+
             logger.info("Attempting to load translation from file...")
             loaded_regions, loaded_mask, mask_is_refined = self._load_text_and_regions_from_file(ctx.image_name, config)
             if loaded_regions:
                 logger.info("Successfully loaded translations. Skipping detection, OCR and translation.")
 
-                # In --load-text mode, TextBlock objects are missing calculated fields like font_size.
-                # We must add a reasonable font_size based on the bounding box height to prevent rendering errors.
-                for region in loaded_regions:
-                    if not hasattr(region, 'font_size') or not region.font_size:
-                        box_height = np.max(region.lines[:,:,1]) - np.min(region.lines[:,:,1])
-                        # Heuristic: Set font size to 80% of box height, but cap at a max of 128 to be safe.
-                        region.font_size = min(int(box_height * 0.8), 128)
-
-                ctx.text_regions = loaded_regions
-                
-                # -- 在load_text模式下也执行上色和超分 --
-                # Colorization
-                if config.colorizer.colorizer != Colorizer.none:
-                    await self._report_progress('colorizing')
-                    try:
-                        ctx.img_colorized = await self._run_colorizer(config, ctx)
-                    except Exception as e:  
-                        logger.error(f"Error during colorizing in load_text mode:\n{traceback.format_exc()}")  
-                        if not self.ignore_errors:  
-                            raise  
-                        ctx.img_colorized = ctx.input  # Fallback to input image if colorization fails
-                else:
-                    ctx.img_colorized = ctx.input
-
-                # Upscaling
-                if config.upscale.upscale_ratio:
-                    await self._report_progress('upscaling')
-                    try:
-                        ctx.upscaled = await self._run_upscaling(config, ctx)
-                    except Exception as e:  
-                        logger.error(f"Error during upscaling in load_text mode:\n{traceback.format_exc()}")  
-                        if not self.ignore_errors:  
-                            raise  
-                        ctx.upscaled = ctx.img_colorized # Fallback to colorized (or input) image if upscaling fails
-                else:
-                    ctx.upscaled = ctx.img_colorized
-
-                # 使用上色和超分后的图片进行后续处理
-                ctx.img_rgb, ctx.img_alpha = load_image(ctx.upscaled)
-
-                # 加载文本模式不需要翻译处理，直接跳过到渲染阶段
-                
-                if loaded_mask is not None:
-                    if mask_is_refined:
-                        ctx.mask = loaded_mask
-                    else:
-                        ctx.mask_raw = loaded_mask
-                else:
-                    # Manually create raw mask from loaded regions if not present in JSON
-                    if ctx.mask_raw is None:
-                        logger.debug("Creating raw mask from loaded regions for --load-text mode (mask_raw not in JSON).")
-                        mask = np.zeros_like(ctx.img_rgb[:, :, 0])
-                        polygons = [p.reshape((-1, 1, 2)) for r in ctx.text_regions for p in r.lines]
-                        cv2.fillPoly(mask, polygons, 255)
-                        ctx.mask_raw = mask
-                
-                # 如果执行了超分，需要将mask和坐标也超分到相同尺寸
-                if config.upscale.upscale_ratio:
-                    upscale_ratio = config.upscale.upscale_ratio
-                    if ctx.mask_raw is not None:
-                        logger.info(f"Upscaling mask_raw from {ctx.mask_raw.shape} to match upscaled image {ctx.img_rgb.shape[:2]}")
-                        ctx.mask_raw = cv2.resize(ctx.mask_raw, (ctx.img_rgb.shape[1], ctx.img_rgb.shape[0]), interpolation=cv2.INTER_LINEAR)
-                    if ctx.mask is not None:
-                        logger.info(f"Upscaling mask from {ctx.mask.shape} to match upscaled image {ctx.img_rgb.shape[:2]}")
-                        ctx.mask = cv2.resize(ctx.mask, (ctx.img_rgb.shape[1], ctx.img_rgb.shape[0]), interpolation=cv2.INTER_LINEAR)
-                    
-                    # 同时放大文本区域的坐标和字体大小
-                    logger.info(f"Upscaling text region coordinates and font sizes by {upscale_ratio}x")
-                    for i, region in enumerate(ctx.text_regions):
-                        # 放大坐标
-                        old_lines = region.lines.copy()
-                        region.lines = region.lines * upscale_ratio
-                        # 放大字体大小
-                        if hasattr(region, 'font_size') and region.font_size:
-                            old_font_size = region.font_size
-                            region.font_size = int(region.font_size * upscale_ratio)
-                            logger.debug(f"Region {i}: coordinates scaled, font_size {old_font_size} → {region.font_size}")
-                        else:
-                            logger.debug(f"Region {i}: coordinates scaled, no font_size to scale")
-                
-                # Mask generation
-                if ctx.mask is None:  # Only run mask refinement if no pre-refined mask is loaded
-                    await self._report_progress('mask-generation')
-                    ctx.mask = await self._run_mask_refinement(config, ctx)
-                else:
-                    logger.info("Using pre-refined mask from JSON, skipping mask refinement")
-                if self.verbose and ctx.mask is not None:
-                    imwrite_unicode(self._result_path('mask_final.png'), ctx.mask, logger)
-
-                # Inpainting
-                await self._report_progress('inpainting')
-                ctx.img_inpainted = await self._run_inpainting(config, ctx)
-                if self.verbose:
-                    imwrite_unicode(self._result_path('inpainted.png'), cv2.cvtColor(ctx.img_inpainted, cv2.COLOR_RGB2BGR), logger)
-
-                # 保存inpainted图片到新目录结构
-                if hasattr(ctx, 'image_name') and ctx.image_name and ctx.img_inpainted is not None:
-                    self._save_inpainted_image(ctx.image_name, ctx.img_inpainted)
-
-                # Rendering
-                await self._report_progress('rendering')
-                ctx.img_rendered = await self._run_text_rendering(config, ctx)
-                
-                await self._report_progress('finished', True)
-                ctx.result = dump_image(ctx.input, ctx.img_rendered, ctx.img_alpha)
-                return await self._revert_upscale(config, ctx)
+                return await self._render_loaded_regions(config, ctx, loaded_regions, loaded_mask, mask_is_refined)
             else:
                 # 加载文本模式下JSON文件不存在或解析失败，应该报错而不是回退到翻译
                 json_path = os.path.splitext(ctx.image_name)[0] + '_translations.json'
@@ -693,6 +649,126 @@ class MangaTranslator:
 
         return ctx
 
+    async def _render_loaded_regions(self, config: Config, ctx: Context, loaded_regions: List[TextBlock],
+                                     loaded_mask: Optional[np.ndarray], mask_is_refined: bool) -> Context:
+        """load_text 的后半段：上色、超分、蒙版、修复、渲染（跳过检测、OCR和翻译）"""
+        self._fill_loaded_font_sizes(loaded_regions)
+        ctx.text_regions = loaded_regions
+        
+        # -- 在load_text模式下也执行上色和超分 --
+        # Colorization
+        if config.colorizer.colorizer != Colorizer.none:
+            await self._report_progress('colorizing')
+            try:
+                ctx.img_colorized = await self._run_colorizer(config, ctx)
+            except Exception as e:  
+                logger.error(f"Error during colorizing in load_text mode:\n{traceback.format_exc()}")  
+                if not self.ignore_errors:  
+                    raise  
+                ctx.img_colorized = ctx.input  # Fallback to input image if colorization fails
+        else:
+            ctx.img_colorized = ctx.input
+
+        # Upscaling
+        if config.upscale.upscale_ratio:
+            await self._report_progress('upscaling')
+            try:
+                ctx.upscaled = await self._run_upscaling(config, ctx)
+            except Exception as e:  
+                logger.error(f"Error during upscaling in load_text mode:\n{traceback.format_exc()}")  
+                if not self.ignore_errors:  
+                    raise  
+                ctx.upscaled = ctx.img_colorized # Fallback to colorized (or input) image if upscaling fails
+        else:
+            ctx.upscaled = ctx.img_colorized
+
+        # 使用上色和超分后的图片进行后续处理
+        ctx.img_rgb, ctx.img_alpha = load_image(ctx.upscaled)
+
+        # 加载文本模式不需要翻译处理，直接跳过到渲染阶段
+        
+        if loaded_mask is not None:
+            if mask_is_refined:
+                ctx.mask = loaded_mask
+            else:
+                ctx.mask_raw = loaded_mask
+        else:
+            # Manually create raw mask from loaded regions if not present in JSON
+            if ctx.mask_raw is None:
+                logger.debug("Creating raw mask from loaded regions for --load-text mode (mask_raw not in JSON).")
+                mask = np.zeros_like(ctx.img_rgb[:, :, 0])
+                polygons = [np.round(p).astype(np.int32).reshape((-1, 1, 2)) for r in ctx.text_regions for p in r.lines]
+                cv2.fillPoly(mask, polygons, 255)
+                ctx.mask_raw = mask
+        
+        # 如果执行了超分，需要将mask和坐标也超分到相同尺寸
+        if config.upscale.upscale_ratio:
+            upscale_ratio = config.upscale.upscale_ratio
+            if ctx.mask_raw is not None:
+                logger.info(f"Upscaling mask_raw from {ctx.mask_raw.shape} to match upscaled image {ctx.img_rgb.shape[:2]}")
+                ctx.mask_raw = cv2.resize(ctx.mask_raw, (ctx.img_rgb.shape[1], ctx.img_rgb.shape[0]), interpolation=cv2.INTER_LINEAR)
+            if ctx.mask is not None:
+                logger.info(f"Upscaling mask from {ctx.mask.shape} to match upscaled image {ctx.img_rgb.shape[:2]}")
+                ctx.mask = cv2.resize(ctx.mask, (ctx.img_rgb.shape[1], ctx.img_rgb.shape[0]), interpolation=cv2.INTER_LINEAR)
+            
+            # 同时放大文本区域的坐标和字体大小
+            self._upscale_loaded_regions(ctx.text_regions, upscale_ratio)
+        
+        # Mask generation
+        if ctx.mask is None:  # Only run mask refinement if no pre-refined mask is loaded
+            await self._report_progress('mask-generation')
+            ctx.mask = await self._run_mask_refinement(config, ctx)
+        else:
+            logger.info("Using pre-refined mask from JSON, skipping mask refinement")
+        if self.verbose and ctx.mask is not None:
+            imwrite_unicode(self._result_path('mask_final.png'), ctx.mask, logger)
+
+        # Inpainting
+        await self._report_progress('inpainting')
+        ctx.img_inpainted = await self._run_inpainting(config, ctx)
+        if self.verbose:
+            imwrite_unicode(self._result_path('inpainted.png'), cv2.cvtColor(ctx.img_inpainted, cv2.COLOR_RGB2BGR), logger)
+
+        # 保存inpainted图片到新目录结构
+        if hasattr(ctx, 'image_name') and ctx.image_name and ctx.img_inpainted is not None:
+            self._save_inpainted_image(ctx.image_name, ctx.img_inpainted)
+
+        # Rendering
+        await self._report_progress('rendering')
+        ctx.img_rendered = await self._run_text_rendering(config, ctx)
+        
+        await self._report_progress('finished', True)
+        ctx.result = dump_image(ctx.input, ctx.img_rendered, ctx.img_alpha)
+        return await self._revert_upscale(config, ctx)
+
+    async def render_regions(self, image: Image.Image, regions: List[Union[TextBlock, dict]], config: Config,
+                             mask: Optional[np.ndarray] = None, mask_is_refined: bool = True,
+                             image_name: str = None) -> Context:
+        """
+        直接用内存中的图片和文本区域渲染，效果等同于 load_text 模式，但不读写翻译文件。
+        regions 可以是 TextBlock 或编辑器/JSON 格式的字典（都会被复制，超分等步骤不修改调用方数据）。
+        同一个实例可以反复调用，编辑器导出多页时不必每页重建翻译器。
+        """
+        ctx = Context()
+        ctx.input = image
+        ctx.image_name = image_name
+        ctx.result = None
+        ctx.verbose = self.verbose
+        ctx.save_quality = self.save_quality
+        ctx.config = config
+        self._set_image_context(config, image)
+        ctx.debug_folder = self._get_image_subfolder()
+
+        text_regions = [copy.deepcopy(region) for region in regions if isinstance(region, TextBlock)]
+        region_dicts = [dict(region) for region in regions if not isinstance(region, TextBlock)]
+        if region_dicts:
+            text_regions.extend(self._regions_from_data(region_dicts, config, 'in-memory regions'))
+        if not text_regions:
+            raise ValueError('render_regions: no valid text regions to render')
+        if mask is not None:
+            mask = np.asarray(mask, dtype=np.uint8)
+        return await self._render_loaded_regions(config, ctx, text_regions, mask, mask_is_refined)
+
     def _save_text_to_file(self, image_path: str, ctx: Context, config: Config = None):
         """保存翻译数据到JSON文件，使用新的目录结构"""
         text_output_file = self.text_output_file
@@ -725,6 +801,21 @@ class MangaTranslator:
                 data_to_save['colorizer'] = config.colorizer.colorizer
                 logger.info(f"在JSON中记录上色信息: colorizer={config.colorizer.colorizer}")
 
+            # 记录渲染设置和修复图的输入签名，供 --render-only 判断缓存是否可复用
+            data_to_save['render_settings'] = self._render_settings_snapshot(config)
+            data_to_save['inpaint_signature'] = self._inpaint_signature(config, _regions_geometry_digest(regions_data))
+
+        # 模板/导出流程需要读取JSON，这些模式下始终保存JSON
+        if self.text_file_format == 'binary' and not (self.template or self.generate_and_export):
+            text_output_file = get_sidecar_path(image_path, create_dir=True)
+            mask = ctx.mask_raw if self.save_mask else None
+            try:
+                save_sidecar(text_output_file, image_key, data_to_save, mask, self.mask_encoding)
+                logger.info(f"Translation data saved to: {text_output_file}")
+            except Exception as e:
+                logger.error(f"Failed to write translation file to {text_output_file}: {e}")
+            return
+
         if self.save_mask and ctx.mask_raw is not None:
             try:
                 import base64
@@ -768,11 +859,16 @@ class MangaTranslator:
 
     def _load_text_and_regions_from_file(self, image_path: str, config: Config) -> (Optional[List[TextBlock]], Optional[np.ndarray], bool):
         """加载翻译数据，支持新的目录结构和向后兼容"""
+        regions, mask_raw, mask_is_refined, _ = self._load_translation_file(image_path, config)
+        return regions, mask_raw, mask_is_refined
+
+    def _load_translation_file(self, image_path: str, config: Config) -> (Optional[List[TextBlock]], Optional[np.ndarray], bool, dict):
+        """加载翻译数据，额外返回JSON中除regions和mask_raw以外的元数据"""
         if not image_path:
-            return None, None, False
+            return None, None, False, {}
 
-        # 使用path_manager查找JSON文件（新位置优先）
-        text_file_path = find_json_path(image_path)
+        # 使用path_manager查找JSON/二进制文件（新位置优先）
+        text_file_path = find_translation_file(image_path)
 
         if not text_file_path:
             # 检查旧的TXT格式
@@ -782,28 +878,34 @@ class MangaTranslator:
                 # If the old format is found, load from it
                 regions = self._load_text_and_regions_from_txt_file(image_path)
                 # Since old format doesn't have mask, we return None for mask and refined status
-                return regions, None, False
+                return regions, None, False, {}
             else:
                 logger.info(f"Translation file not found for: {image_path}")
-                return None, None, False
+                return None, None, False, {}
 
+        mask_raw = None
         try:
-            # Force UTF-8 encoding to handle potential file encoding issues
-            with open(text_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if text_file_path.endswith(SIDECAR_EXT):
+                image_key, image_data, mask_raw = load_sidecar(text_file_path)
+                data = {image_key: image_data}
+            else:
+                # Force UTF-8 encoding to handle potential file encoding issues
+                with open(text_file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
         except Exception as e:
             logger.error(f"Failed to read or parse translation file {text_file_path}: {e}")
-            return None, None, False
+            return None, None, False, {}
 
         # Don't check the image key. Assume the user knows what they are doing
         # and that the first entry in the JSON is the one they want to load.
         if not data or len(data.values()) == 0:
             logger.warning(f"JSON file {text_file_path} is empty or invalid.")
-            return None, None, False
+            return None, None, False, {}
 
         # Get the first value from the dictionary, regardless of the key.
         image_data = next(iter(data.values()))
         mask_is_refined = False
+        meta = {}
 
         # Handle both old and new JSON formats
         if isinstance(image_data, list):
@@ -815,10 +917,35 @@ class MangaTranslator:
             regions_data = image_data.get('regions', [])
             mask_raw_data = image_data.get('mask_raw', None)
             mask_is_refined = image_data.get('mask_is_refined', False)
+            meta = {k: v for k, v in image_data.items() if k not in ('regions', 'mask_raw')}
         else:
             logger.warning(f"Invalid data format in JSON file {text_file_path}.")
-            return None, None, False
+            return None, None, False, {}
 
+        meta['geometry_digest'] = _regions_geometry_digest(regions_data)
+
+        regions = self._regions_from_data(regions_data, config, text_file_path)
+
+        if isinstance(mask_raw_data, str):
+            try:
+                import base64
+                import cv2
+                img_bytes = base64.b64decode(mask_raw_data)
+                img_array = np.frombuffer(img_bytes, dtype=np.uint8)
+                mask_raw = cv2.imdecode(img_array, cv2.IMREAD_UNCHANGED)
+            except Exception as e:
+                logger.error(f"Failed to decode base64 mask: {e}")
+        elif isinstance(mask_raw_data, list):
+            mask_raw = np.array(mask_raw_data, dtype=np.uint8)
+        
+        logger.info(f"Loaded {len(regions)} regions from {text_file_path}")
+        if mask_raw is not None:
+            logger.info(f"Loaded mask_raw from {text_file_path}")
+
+        return regions if regions else None, mask_raw, mask_is_refined, meta
+
+    def _regions_from_data(self, regions_data: List[dict], config: Config, source: str = '') -> List[TextBlock]:
+        """把 JSON/编辑器格式的区域字典还原为 TextBlock，解析失败的区域跳过"""
         regions = []
         for region_data in regions_data:
             try:
@@ -855,27 +982,9 @@ class MangaTranslator:
                 region = TextBlock(**region_data)
                 regions.append(region)
             except Exception as e:
-                logger.error(f"Failed to parse a region in {text_file_path}: {e}")
+                logger.error(f"Failed to parse a region in {source}: {e}")
                 continue
-        
-        mask_raw = None
-        if isinstance(mask_raw_data, str):
-            try:
-                import base64
-                import cv2
-                img_bytes = base64.b64decode(mask_raw_data)
-                img_array = np.frombuffer(img_bytes, dtype=np.uint8)
-                mask_raw = cv2.imdecode(img_array, cv2.IMREAD_UNCHANGED)
-            except Exception as e:
-                logger.error(f"Failed to decode base64 mask: {e}")
-        elif isinstance(mask_raw_data, list):
-            mask_raw = np.array(mask_raw_data, dtype=np.uint8)
-        
-        logger.info(f"Loaded {len(regions)} regions from {text_file_path}")
-        if mask_raw is not None:
-            logger.info(f"Loaded mask_raw from {text_file_path}")
-
-        return regions if regions else None, mask_raw, mask_is_refined
+        return regions
 
     def _load_text_and_regions_from_txt_file(self, image_path: str) -> Optional[List[TextBlock]]:
         # This is the old implementation for reading .txt files
@@ -939,10 +1048,219 @@ class MangaTranslator:
         logger.info(f"Loaded {len(regions)} regions from {text_file_path}")
         return regions if regions else None
 
+    def _fill_loaded_font_sizes(self, regions: List[TextBlock]):
+        """为从JSON加载的文本区域补全缺失的font_size"""
+        # In --load-text mode, TextBlock objects are missing calculated fields like font_size.
+        # We must add a reasonable font_size based on the bounding box height to prevent rendering errors.
+        for region in regions:
+            if not hasattr(region, 'font_size') or not region.font_size:
+                box_height = np.max(region.lines[:,:,1]) - np.min(region.lines[:,:,1])
+                # Heuristic: Set font size to 80% of box height, but cap at a max of 128 to be safe.
+                region.font_size = min(int(box_height * 0.8), 128)
+
+    def _upscale_loaded_regions(self, regions: List[TextBlock], upscale_ratio):
+        """将加载的文本区域坐标和字体大小放大到超分后的尺寸"""
+        logger.info(f"Upscaling text region coordinates and font sizes by {upscale_ratio}x")
+        for i, region in enumerate(regions):
+            # 放大坐标
+            region.lines = region.lines * upscale_ratio
+            # 放大字体大小
+            if hasattr(region, 'font_size') and region.font_size:
+                old_font_size = region.font_size
+                region.font_size = int(region.font_size * upscale_ratio)
+                logger.debug(f"Region {i}: coordinates scaled, font_size {old_font_size} → {region.font_size}")
+            else:
+                logger.debug(f"Region {i}: coordinates scaled, no font_size to scale")
+
+    def _render_settings_snapshot(self, config: Config) -> dict:
+        """只影响渲染阶段的设置快照"""
+        snapshot = config.render.model_dump(mode='json')
+        snapshot['font_path'] = self.font_path or ''
+        return snapshot
+
+    def _inpaint_signature(self, config: Config, geometry_digest: str) -> dict:
+        """决定修复图内容的输入签名（与渲染设置无关）"""
+        return {
+            'detector': config.detector.model_dump(mode='json'),
+            'inpainter': config.inpainter.model_dump(mode='json'),
+            'upscale': config.upscale.model_dump(mode='json'),
+            'colorizer': config.colorizer.model_dump(mode='json'),
+            'mask_dilation_offset': config.mask_dilation_offset,
+            'kernel_size': self.kernel_size,
+            'geometry': geometry_digest,
+        }
+
+    async def _try_render_only(self, config: Config, ctx: Context) -> Optional[Context]:
+        """
+        仅渲染模式：复用JSON中的文本区域和缓存的修复图，跳过检测、OCR、翻译、蒙版和修复，
+        只重新执行渲染。缓存不可用时返回None，由调用方回退到完整的load_text流程。
+        """
+        image_path = ctx.image_name
+        inpainted_path = find_inpainted_path(image_path) if image_path else None
+        if not inpainted_path:
+            logger.info(f"Render-only: no cached inpainted image for {image_path}")
+            return None
+
+        loaded_regions, _, _, meta = self._load_translation_file(image_path, config)
+        if not loaded_regions:
+            return None
+
+        cached_signature = meta.get('inpaint_signature')
+        if cached_signature is None:
+            # 旧版本写的文件，无法确认修复图是否与当前的区域和设置对应
+            logger.info("Render-only: translation file has no inpaint signature, cannot verify the cached inpainted image")
+            return None
+        current_signature = self._inpaint_signature(config, meta.get('geometry_digest'))
+        changed = sorted(k for k in set(cached_signature) | set(current_signature)
+                         if cached_signature.get(k) != current_signature.get(k))
+        if changed:
+            logger.info(f"Render-only: inpainting inputs changed ({', '.join(changed)}), cached inpainted image is stale")
+            return None
+
+        cached_render = meta.get('render_settings')
+        if cached_render is not None:
+            current_render = self._render_settings_snapshot(config)
+            changed = [k for k in current_render if cached_render.get(k) != current_render[k]]
+            if changed:
+                logger.info(f"Render-only: render settings changed since last run: {', '.join(changed)}")
+            else:
+                logger.info("Render-only: render settings unchanged, re-rendering loaded regions")
+
+        try:
+            img_inpainted = cv2.imdecode(np.fromfile(inpainted_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except Exception as e:
+            logger.error(f"Render-only: failed to read cached inpainted image {inpainted_path}: {e}")
+            return None
+        if img_inpainted is None:
+            logger.warning(f"Render-only: failed to decode cached inpainted image {inpainted_path}")
+            return None
+        img_inpainted = cv2.cvtColor(img_inpainted, cv2.COLOR_BGR2RGB)
+
+        ctx.img_rgb, ctx.img_alpha = load_image(ctx.input)
+        height, width = ctx.img_rgb.shape[:2]
+        upscale_ratio = config.upscale.upscale_ratio
+        if upscale_ratio:
+            height, width = int(height * upscale_ratio), int(width * upscale_ratio)
+        if img_inpainted.shape[:2] != (height, width):
+            logger.info(f"Render-only: cached inpainted image size {img_inpainted.shape[1]}x{img_inpainted.shape[0]} "
+                        f"does not match expected {width}x{height}")
+            return None
+
+        logger.info(f"Render-only: reusing {os.path.basename(inpainted_path)}, skipping detection, OCR, translation and inpainting.")
+        self._fill_loaded_font_sizes(loaded_regions)
+        if upscale_ratio:
+            # 渲染只需要原图做气泡分析，无需重新超分
+            ctx.img_rgb = cv2.resize(ctx.img_rgb, (width, height), interpolation=cv2.INTER_LINEAR)
+            if ctx.img_alpha is not None:
+                ctx.img_alpha = ctx.img_alpha.resize((width, height))
+            self._upscale_loaded_regions(loaded_regions, upscale_ratio)
+
+        ctx.text_regions = loaded_regions
+        ctx.img_inpainted = img_inpainted
+
+        await self._report_progress('rendering')
+        ctx.img_rendered = await self._run_text_rendering(config, ctx)
+
+        await self._report_progress('finished', True)
+        ctx.result = dump_image(ctx.input, ctx.img_rendered, ctx.img_alpha)
+        return await self._revert_upscale(config, ctx)
+
+    def _dedup_enabled(self) -> bool:
+        # 这些模式需要逐页读写 JSON/TXT，或者只做上色/超分，不复用
+        return (self._page_dedup is not None and not (
+            self.load_text or self.save_text or self.template or self.generate_and_export
+            or self.colorize_only or self.upscale_only or self.prep_manual))
+
+    def _page_signature(self, config: Config) -> str:
+        """影响整页输出的设置摘要，只有相同设置下的结果才能复用"""
+        return config_signature(config.model_dump(mode='json'), self.font_path or '', self.kernel_size,
+                                self.pre_dict or '', self.post_dict or '')
+
+    async def _reuse_duplicate_page(self, config: Config, ctx: Context) -> Optional[Context]:
+        """
+        整页去重：与之前处理过的页面字节相同时，直接复用其文本区域、翻译、修复图和渲染结果，
+        跳过全部模型推理。感知哈希在容差内、字节不同的页面只在 --dedup-near-pages 时整页复用，
+        否则照常翻译（重复的区域仍由区域去重复用译文）。
+        """
+        if not self._dedup_enabled():
+            return None
+        ctx.page_fingerprint = fingerprint(ctx.input)
+        hit = self._page_dedup.lookup(ctx.page_fingerprint, self._page_signature(config),
+                                      exact_only=not self.dedup_near_pages)
+        if hit is None:
+            return None
+        payload, distance = hit
+        logger.info(f"Duplicate page detected ({'identical' if distance < 0 else f'hamming distance {distance}'}), "
+                    f"reusing previous result. {self._page_dedup.summary()}")
+        ctx.text_regions = copy.deepcopy(payload['text_regions'])
+        ctx.img_inpainted = payload['img_inpainted']
+        ctx.mask = payload['mask']
+        if ctx.img_inpainted is not None and ctx.mask is not None:
+            ctx.gimp_mask = np.dstack((cv2.cvtColor(ctx.img_inpainted, cv2.COLOR_RGB2BGR), ctx.mask))
+        ctx.result = payload['result'].copy()
+        ctx.dedup_distance = distance
+        await self._report_progress('finished', True)
+        return ctx
+
+    def _remember_page(self, config: Config, ctx: Context):
+        """保存整页结果（还原超分前）供后续重复页面复用"""
+        fp = getattr(ctx, 'page_fingerprint', None)
+        if fp is None or not self._dedup_enabled() or ctx.result is None:
+            return
+        self._page_dedup.store(fp, self._page_signature(config), {
+            'text_regions': copy.deepcopy(ctx.text_regions or []),
+            'img_inpainted': ctx.img_inpainted,
+            'mask': ctx.mask,
+            'result': ctx.result.copy(),
+        })
+
+    def _translate_duplicate_regions(self, config: Config, ctx: Context) -> dict:
+        """
+        区域去重：原文相同且区域截图近似重复（如反复出现的拟声词）时复用之前的译文。
+        返回 {区域下标: 译文}
+        """
+        if self._region_dedup is None or not self._dedup_enabled() or ctx.img_rgb is None:
+            return {}
+        signature = config_signature(config.translator.model_dump(mode='json'))
+        reused = {}
+        ctx.region_fingerprints = []
+        height, width = ctx.img_rgb.shape[:2]
+        for i, region in enumerate(ctx.text_regions):
+            x1, y1, x2, y2 = [int(v) for v in region.xyxy]
+            crop = ctx.img_rgb[max(0, y1):min(height, y2), max(0, x1):min(width, x2)]
+            fp = fingerprint(crop) if crop.size else None
+            ctx.region_fingerprints.append(fp)
+            if fp is None:
+                continue
+            hit = self._region_dedup.lookup(fp, config_signature(signature, region.text))
+            if hit is not None:
+                reused[i] = hit[0]
+        if reused:
+            logger.info(f"Reusing translations of {len(reused)}/{len(ctx.text_regions)} duplicate regions. "
+                        f"{self._region_dedup.summary()}")
+        return reused
+
+    def _remember_regions(self, config: Config, ctx: Context, translations: dict):
+        fingerprints = getattr(ctx, 'region_fingerprints', None)
+        if not fingerprints or self._region_dedup is None:
+            return
+        signature = config_signature(config.translator.model_dump(mode='json'))
+        for i, translation in translations.items():
+            if fingerprints[i] is not None and translation:
+                self._region_dedup.store(fingerprints[i], config_signature(signature, ctx.text_regions[i].text), translation)
+
+    def dedup_summary(self) -> str:
+        if self._page_dedup is None:
+            return ''
+        return f'{self._page_dedup.summary()}; {self._region_dedup.summary()}'
+
     async def _translate(self, config: Config, ctx: Context) -> Context:
         # Start the background cleanup job once if not already started.
         if self._detector_cleanup_task is None:
             self._detector_cleanup_task = asyncio.create_task(self._detector_cleanup_job())
+        duplicate_ctx = await self._reuse_duplicate_page(config, ctx)
+        if duplicate_ctx is not None:
+            return await self._revert_upscale(config, duplicate_ctx)
         # -- Colorization
         if config.colorizer.colorizer != Colorizer.none:
             await self._report_progress('colorizing')
@@ -1041,6 +1359,7 @@ class MangaTranslator:
             await self._report_progress('skip-no-regions', True)
             # If no text was found result is intermediate image product
             ctx.result = ctx.upscaled
+            self._remember_page(config, ctx)
             return await self._revert_upscale(config, ctx)
 
         if self.verbose:
@@ -1063,6 +1382,7 @@ class MangaTranslator:
             await self._report_progress('skip-no-text', True)
             # If no text was found result is intermediate image product
             ctx.result = ctx.upscaled
+            self._remember_page(config, ctx)
             return await self._revert_upscale(config, ctx)
 
         # -- Textline merge
@@ -1238,6 +1558,7 @@ class MangaTranslator:
 
         await self._report_progress('finished', True)
         ctx.result = dump_image(ctx.input, ctx.img_rendered, ctx.img_alpha)
+        self._remember_page(config, ctx)
 
         return await self._revert_upscale(config, ctx)
     
@@ -1295,7 +1616,39 @@ class MangaTranslator:
             **ctx
         )
 
+    async def _upscale_batch_ahead(self, batch):
+        """
+        批量模式：逐页预处理前先把整批页面一次交给超分器，
+        外部可执行文件（esrgan/waifu2x）只需启动一次，结果在 _run_upscaling 中按页取用。
+        上色会改变超分的输入，开启上色的页面仍逐页超分。
+        """
+        self._batch_upscaled = {}
+        groups = {}
+        for image, config in batch:
+            if config.upscale.upscale_ratio and config.colorizer.colorizer == Colorizer.none:
+                key = json.dumps(config.upscale.model_dump(mode='json'), sort_keys=True)
+                groups.setdefault(key, []).append((image, config))
+        for pages in groups.values():
+            if len(pages) < 2:
+                continue
+            images = [image for image, _ in pages]
+            await self._report_progress('upscaling')
+            try:
+                results = await self._upscale_images(pages[0][1], images)
+            except Exception:
+                # 逐页超分时再按原有的错误处理
+                logger.warning(f"Batch upscaling failed, falling back to per-page upscaling:\n{traceback.format_exc()}")
+                continue
+            for image, upscaled in zip(images, results):
+                self._batch_upscaled[id(image)] = (image, upscaled)
+
     async def _run_upscaling(self, config: Config, ctx: Context):
+        prefetched = getattr(self, '_batch_upscaled', {}).pop(id(ctx.img_colorized), None)
+        if prefetched is not None and prefetched[0] is ctx.img_colorized:
+            return prefetched[1]
+        return (await self._upscale_images(config, [ctx.img_colorized]))[0]
+
+    async def _upscale_images(self, config: Config, images: List[Image.Image]) -> List[Image.Image]:
         current_time = time.time()
         self._model_usage_timestamps[("upscaling", config.upscale.upscaler)] = current_time
         
@@ -1310,13 +1663,13 @@ class MangaTranslator:
             if tile_size is not None:
                 upscaler_kwargs['tile_size'] = tile_size
         
-        result = (await dispatch_upscaling(
+        result = await dispatch_upscaling(
             config.upscale.upscaler, 
-            [ctx.img_colorized], 
+            images, 
             config.upscale.upscale_ratio, 
             self.device,
             **upscaler_kwargs
-        ))[0]
+        )
         
         # Unload upscaling model immediately after use to free VRAM
         logger.info(f"Unloading upscaling model {config.upscale.upscaler} to free VRAM")
@@ -1446,17 +1799,25 @@ class MangaTranslator:
         if torch.cuda.is_available():
             torch.cuda.empty_cache()  # empty CUDA cache
 
+    async def unload_translators(self):
+        """显式释放整个批次/会话中常驻的离线翻译模型"""
+        await unload_all_translators()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
     # Background models cleanup job.
     async def _detector_cleanup_job(self):
         while True:
             if self.models_ttl == 0:
                 await asyncio.sleep(1)
                 continue
+            # 由驻留管理器按模型的实际最后使用时间卸载，已固定的模型不会被卸载；
+            # 注册表缓存保留实例，下次 dispatch 时会自动重新加载
+            await model_residency.evict_idle(self.models_ttl)
             now = time.time()
-            for (tool, model), last_used in list(self._model_usage_timestamps.items()):
+            for key, last_used in list(self._model_usage_timestamps.items()):
                 if now - last_used > self.models_ttl:
-                    await self._unload_model(tool, model)
-                    del self._model_usage_timestamps[(tool, model)]
+                    del self._model_usage_timestamps[key]
             await asyncio.sleep(1)
 
     async def _run_ocr(self, config: Config, ctx: Context):
@@ -1939,8 +2300,23 @@ class MangaTranslator:
             logger.debug("Pre-translation de-duplication finished.")
             # --- END PRE-TRANSLATION DE-DUPLICATION ---
 
-            texts = [region.text.replace('\ufffd', '') for region in ctx.text_regions]
-            translated_sentences = await self._dispatch_with_context(config, texts, ctx)
+            # 重复区域直接复用之前的译文，只把其余区域交给翻译器
+            reused = self._translate_duplicate_regions(config, ctx)
+            pending = [i for i in range(len(ctx.text_regions)) if i not in reused]
+            translated_sentences = [reused.get(i) for i in range(len(ctx.text_regions))]
+            if pending:
+                all_regions = ctx.text_regions
+                if reused:
+                    # 部分翻译器按下标读取 ctx.text_regions（AI 断句），临时换成待翻译的区域
+                    ctx.text_regions = [all_regions[i] for i in pending]
+                try:
+                    texts = [all_regions[i].text.replace('\ufffd', '') for i in pending]
+                    new_sentences = await self._dispatch_with_context(config, texts, ctx)
+                finally:
+                    ctx.text_regions = all_regions
+                for i, translation in zip(pending, new_sentences):
+                    translated_sentences[i] = translation
+                self._remember_regions(config, ctx, dict(zip(pending, new_sentences)))
 
             for region, translation in zip(ctx.text_regions, translated_sentences):
                 if config.render.uppercase:
@@ -2709,12 +3085,32 @@ class MangaTranslator:
             logger.info(f"[Pipeline] 📊 Progress: {completed}/{total_images} images completed")
         
         await asyncio.gather(*workers)
+        await self._flush_result_saves()
         
         logger.info("="*50)
         logger.info(f"🎉 Two-Stage Pipeline Completed: {total_images} images")
         logger.info("="*50)
         return results
     
+    async def _submit_result_save(self, ctx: Context, image: Image.Image, path: str):
+        """把结果图交给后台写入，并记住对应的 ctx，写入结果在 _flush_result_saves 中回填"""
+        # quality 只对有损格式有意义，PNG 等格式不传
+        save_kwargs = {}
+        if self.save_quality is not None and os.path.splitext(path)[1].lower() in ('.jpg', '.jpeg', '.webp'):
+            save_kwargs['quality'] = self.save_quality
+        future = await self._result_writer.submit_async(image, path, **save_kwargs)
+        self._pending_result_saves.append((future, ctx))
+
+    async def _flush_result_saves(self):
+        """等待后台写入全部完成；写入失败的页面不再算作成功，错误通过 translation_error 交给调用方"""
+        await self._result_writer.flush_async(raise_errors=False)
+        pending, self._pending_result_saves = self._pending_result_saves, []
+        for future, ctx in pending:
+            error = future.result().error
+            if error is not None and ctx is not None:
+                ctx.success = False
+                ctx.translation_error = f'保存失败 ({type(error).__name__}): {error}'
+
     async def _save_single_result(self, ctx: Context, save_info: dict):
         """保存单个结果的辅助方法"""
         try:
@@ -2754,8 +3150,8 @@ class MangaTranslator:
                 if final_output_path.lower().endswith(('.jpg', '.jpeg')) and image_to_save.mode in ('RGBA', 'LA'):
                     image_to_save = image_to_save.convert('RGB')
 
-                image_to_save.save(final_output_path, quality=self.save_quality)
-                logger.info(f"  -> ✅ [PIPELINE] Saved successfully: {os.path.basename(final_output_path)}")
+                await self._submit_result_save(ctx, image_to_save, final_output_path)
+                logger.info(f"  -> ✅ [PIPELINE] Queued for saving: {os.path.basename(final_output_path)}")
                 
         except Exception as save_err:
             logger.error(f"Error saving pipeline result for {os.path.basename(ctx.image_name)}: {save_err}")
@@ -2765,6 +3161,7 @@ class MangaTranslator:
         批量翻译多张图片，在翻译阶段进行批量处理以提高效率
         
         如果启用了pipeline_mode，将自动使用流水线并行处理模式。
+        结果图由后台写入线程池保存，返回前会等待全部写入完成。
         
         Args:
             images_with_configs: List of (image, config) tuples
@@ -2773,10 +3170,67 @@ class MangaTranslator:
         Returns:
             List of Context objects with translation results
         """
+        try:
+            if self._dedup_enabled() and ((batch_size or self.batch_size) > 1 or self.pipeline_mode):
+                return await self._translate_batch_deduplicated(images_with_configs, batch_size, save_info)
+            return await self._translate_batch(images_with_configs, batch_size, image_names, save_info)
+        finally:
+            # 没被取用的预超分结果（如预处理失败的页面）不再保留
+            self._batch_upscaled = {}
+            await self._flush_result_saves()
+            logger.debug(memory_cleanup.summary())
+            if self._page_dedup is not None:
+                logger.info(self.dedup_summary())
+
+    async def _translate_batch_deduplicated(self, images_with_configs: List[tuple], batch_size: int = None,
+                                            save_info: dict = None) -> List[Context]:
+        """
+        批量模式的整页去重：重复页面直接复用结果（有 save_info 时同样保存），
+        其余页面照常批量翻译后记入索引
+        """
+        results = [None] * len(images_with_configs)
+        misses = []
+        for i, (image, config) in enumerate(images_with_configs):
+            ctx = Context()
+            ctx.input = image
+            ctx.image_name = getattr(image, 'name', None)
+            ctx.result = None
+            duplicate_ctx = await self._reuse_duplicate_page(config, ctx)
+            if duplicate_ctx is not None:
+                duplicate_ctx = await self._revert_upscale(config, duplicate_ctx)
+                duplicate_ctx.success = True
+                if save_info and duplicate_ctx.result is not None and duplicate_ctx.image_name:
+                    await self._save_single_result(duplicate_ctx, save_info)
+                results[i] = duplicate_ctx
+            else:
+                misses.append((i, ctx.page_fingerprint))
+        if misses:
+            # 保存后会丢弃结果图的批量路径（高质量模式）在丢弃前通过 _remember_batch_page 记入索引
+            self._batch_page_fingerprints = {id(images_with_configs[i][0]): (images_with_configs[i][0], fp) for i, fp in misses}
+            try:
+                translated = await self._translate_batch([images_with_configs[i] for i, _ in misses], batch_size, None, save_info)
+            finally:
+                self._batch_page_fingerprints = {}
+            for (i, fp), ctx in zip(misses, translated):
+                results[i] = ctx
+                if ctx is not None and getattr(ctx, 'page_fingerprint', None) is None:
+                    ctx.page_fingerprint = fp
+                    self._remember_page(images_with_configs[i][1], ctx)
+        return results
+
+    def _remember_batch_page(self, config: Config, ctx: Context):
+        """批量去重时，在结果图被释放前把页面记入索引"""
+        entry = getattr(self, '_batch_page_fingerprints', {}).pop(id(ctx.input), None)
+        if entry is None or entry[0] is not ctx.input or getattr(ctx, 'page_fingerprint', None) is not None:
+            return
+        ctx.page_fingerprint = entry[1]
+        self._remember_page(config, ctx)
+
+    async def _translate_batch(self, images_with_configs: List[tuple], batch_size: int = None, image_names: List[str] = None, save_info: dict = None) -> List[Context]:
         batch_size = batch_size or self.batch_size
         
         # ✅ 如果启用了四线流水线模式，使用并行处理工作流
-        if self.pipeline_mode and len(images_with_configs) > 1:
+        if self.pipeline_mode and len(images_with_configs) > 1 and not self.render_only:
             logger.info(f"启动四线流水线模式：{len(images_with_configs)} 张图片")
             logger.info(f"并发设置 - Line1(检测+OCR):{self.pipeline_line1_concurrency}, Line2(翻译):{self.pipeline_line2_concurrency}, Line3(修复):{self.pipeline_line3_concurrency}, Line4(渲染+超分):{self.pipeline_line4_concurrency}")
             logger.info(f"翻译打包大小: {self.pipeline_translation_batch_size}")
@@ -2857,8 +3311,8 @@ class MangaTranslator:
                             if final_output_path.lower().endswith(('.jpg', '.jpeg')) and image_to_save.mode in ('RGBA', 'LA'):
                                 image_to_save = image_to_save.convert('RGB')
 
-                            image_to_save.save(final_output_path, quality=self.save_quality)
-                            logger.info(f"  -> ✅ [SEQUENTIAL] Saved successfully: {os.path.basename(final_output_path)}")
+                            await self._submit_result_save(ctx, image_to_save, final_output_path)
+                            logger.info(f"  -> ✅ [SEQUENTIAL] Queued for saving: {os.path.basename(final_output_path)}")
 
                     except Exception as save_err:
                         logger.error(f"Error saving sequential result for {os.path.basename(ctx.image_name)}: {save_err}")
@@ -2943,8 +3397,8 @@ class MangaTranslator:
                                 if final_output_path.lower().endswith(('.jpg', '.jpeg')) and image_to_save.mode in ('RGBA', 'LA'):
                                     image_to_save = image_to_save.convert('RGB')
 
-                                image_to_save.save(final_output_path, quality=self.save_quality)
-                                logger.info(f"  -> ✅ [LOAD_TEXT] Saved successfully: {os.path.basename(final_output_path)}")
+                                await self._submit_result_save(ctx, image_to_save, final_output_path)
+                                logger.info(f"  -> ✅ [LOAD_TEXT] Queued for saving: {os.path.basename(final_output_path)}")
                             
                             # 标记成功
                             ctx.success = True
@@ -2958,6 +3412,7 @@ class MangaTranslator:
                 continue
 
             # 标准模式：执行检测、OCR等预处理
+            await self._upscale_batch_ahead(current_batch_images)
             for i, (image, config) in enumerate(current_batch_images):
                 # 检查是否被取消
                 await asyncio.sleep(0)
@@ -3074,8 +3529,8 @@ class MangaTranslator:
                                 if final_output_path.lower().endswith(('.jpg', '.jpeg')) and image_to_save.mode in ('RGBA', 'LA'):
                                     image_to_save = image_to_save.convert('RGB')
                                 
-                                image_to_save.save(final_output_path, quality=self.save_quality)
-                                logger.info(f"  -> ✅ [BATCH] Saved successfully: {os.path.basename(final_output_path)}")
+                                await self._submit_result_save(ctx, image_to_save, final_output_path)
+                                logger.info(f"  -> ✅ [BATCH] Queued for saving: {os.path.basename(final_output_path)}")
 
                         except Exception as save_err:
                             logger.error(f"Error saving standard batch result for {os.path.basename(ctx.image_name)}: {save_err}")
@@ -4047,18 +4502,7 @@ class MangaTranslator:
         await self._report_progress('inpainting')
         try:
             ctx.img_inpainted = await self._run_inpainting(config, ctx)
-            
-            # ✅ Inpainting完成后强制GC和GPU清理
-            import gc
-            gc.collect()
-            if hasattr(self, 'device') and (self.device == 'cuda' or self.device == 'mps'):
-                try:
-                    import torch
-                    if torch.cuda.is_available():
-                        torch.cuda.empty_cache()
-                        torch.cuda.synchronize()
-                except Exception:
-                    pass
+            # gc 和 CUDA 缓存清理由 OfflineInpainter 按内存压力触发（memory_cleanup）
 
         except Exception as e:
             logger.error(f"Error during inpainting:\n{traceback.format_exc()}")
@@ -4349,6 +4793,7 @@ class MangaTranslator:
 
             # 阶段一：预处理当前批次
             preprocessed_contexts = []
+            await self._upscale_batch_ahead(current_batch_images)
             for i, (image, config) in enumerate(current_batch_images):
                 # 检查是否被取消
                 await asyncio.sleep(0)
@@ -4553,8 +4998,8 @@ class MangaTranslator:
                                 if final_output_path.lower().endswith(('.jpg', '.jpeg')) and image_to_save.mode in ('RGBA', 'LA'):
                                     image_to_save = image_to_save.convert('RGB')
                                 
-                                image_to_save.save(final_output_path, quality=self.save_quality)
-                                logger.info(f"  -> ✅ [HQ] Saved successfully: {os.path.basename(final_output_path)}")
+                                await self._submit_result_save(ctx, image_to_save, final_output_path)
+                                logger.info(f"  -> ✅ [HQ] Queued for saving: {os.path.basename(final_output_path)}")
 
                         except Exception as save_err:
                             logger.error(f"Error saving high-quality result for {os.path.basename(ctx.image_name)}: {save_err}")
@@ -4568,7 +5013,9 @@ class MangaTranslator:
                     ctx.success = True
                     
                     # ✅ 清理ctx中的大对象，只保留必要信息
-                    if hasattr(ctx, 'result'):
+                    # 渲染结果只有在上面已经交给保存时才能删除，否则调用方（如 translate_archive）还要用
+                    if save_info and hasattr(ctx, 'result'):
+                        self._remember_batch_page(config, ctx)
                         ctx.result = None  # 保存后删除渲染结果
                     
                     # ✅ 清理中间处理图像（保留text_regions等元数据）
@@ -4594,7 +5041,6 @@ class MangaTranslator:
                     raise RuntimeError(f"Rendering failed for {os.path.basename(ctx.image_name) if hasattr(ctx, 'image_name') else 'Unknown'}: {e}") from e
             
             # ✅ 批次完成后立即清理内存（但保留翻译历史供下一批次使用）
-            import gc
             # 1. 清理batch_data中的图像引用
             for data in batch_data:
                 if 'image' in data:
@@ -4607,18 +5053,8 @@ class MangaTranslator:
                     ctx.input = None
             preprocessed_contexts.clear()
             
-            # 3. 强制垃圾回收
-            gc.collect()
-            
-            # 4. GPU显存清理（如果使用GPU）
-            if hasattr(self, 'device') and (self.device == 'cuda' or self.device == 'mps'):
-                try:
-                    import torch
-                    if torch.cuda.is_available():
-                        torch.cuda.empty_cache()
-                        torch.cuda.synchronize()
-                except Exception:
-                    pass
+            # 3. 内存/显存超过阈值时才做 gc 和 CUDA 缓存清理
+            memory_cleanup.check(f'batch {batch_start//batch_size + 1}')
             
             logger.debug(f'[MEMORY] Batch {batch_start//batch_size + 1} cleanup completed (kept translation history for context)')
 
@@ -5457,8 +5893,8 @@ class MangaTranslator:
                 if final_output_path.lower().endswith(('.jpg', '.jpeg')) and image_to_save.mode in ('RGBA', 'LA'):
                     image_to_save = image_to_save.convert('RGB')
                 
-                image_to_save.save(final_output_path, quality=self.save_quality)
-                logger.info(f"  -> ✅ [PIPELINE] Saved successfully: {os.path.basename(final_output_path)}")
+                await self._submit_result_save(ctx, image_to_save, final_output_path)
+                logger.info(f"  -> ✅ [PIPELINE] Queued for saving: {os.path.basename(final_output_path)}")
 
         except Exception as save_err:
             logger.error(f"Error saving pipeline result for {os.path.basename(ctx.image_name) if hasattr(ctx, 'image_name') else 'Unknown'}: {save_err}")
@@ -9,12 +9,12 @@ from PIL import Image
 import psutil
 
 from manga_translator import MangaTranslator, Context, TranslationInterrupt, Config
-from ..save import save_result
 from ..translators import (
     LanguageUnsupportedException,
     dispatch as dispatch_translation,
 )
 from ..utils import natural_sort, replace_prefix, get_color_name, rgb2hex, get_logger
+from ..utils.archive import ArchiveReader, ArchiveWriter, is_archive
 
 # 使用专用的local logger
 logger = get_logger('local')
@@ -79,6 +79,8 @@ class MangaTranslatorLocal(MangaTranslator):
         self.save_text = params.get('save_text', None)
         self.batch_size = params.get('batch_size', 1)
         self.disable_memory_optimization = params.get('disable_memory_optimization', False)
+        # 已提交后台写入、尚未确认结果的页面: (future, 原图路径, 输出路径)
+        self._pending_saves = []
 
     async def translate_path(self, path: str, dest: str = None, params: dict[str, Union[int, str]] = None, config: Config = None):
         """
@@ -124,7 +126,10 @@ class MangaTranslatorLocal(MangaTranslator):
             elif params.get('format') != 'jpg':
                 raise ValueError('--save-quality of lower than 100 is only supported for .jpg files')
 
-        if os.path.isfile(path):
+        if os.path.isfile(path) and is_archive(path):
+            await self.translate_archive(path, self._archive_dest(path, dest), params, config, file_ext)
+
+        elif os.path.isfile(path):
             # Determine destination file path
             if not dest:
                 # Use the same folder as the source
@@ -140,6 +145,7 @@ class MangaTranslatorLocal(MangaTranslator):
                 p, ext = os.path.splitext(dest)
                 _dest = f'{p}.{file_ext or ext[1:]}'
             await self.translate_file(path, _dest, params,config)
+            await self._flush_pending_saves(params, config)
 
         elif os.path.isdir(path):
             # Determine destination folder path
@@ -166,6 +172,10 @@ class MangaTranslatorLocal(MangaTranslator):
 
                         file_path = os.path.join(root, f)
                         p, ext = os.path.splitext(f)
+                        if is_archive(f):
+                            if await self.translate_archive(file_path, self._archive_dest(file_path, dest_root), params, config, file_ext):
+                                translated_count += 1
+                            continue
                         if dest_root == root:
                             output_filename = f'{p}_translated.{file_ext or ext[1:]}'
                         else:
@@ -177,6 +187,10 @@ class MangaTranslatorLocal(MangaTranslator):
                         except Exception as e:
                             logger.error(e)
                             raise e
+                # 写入与后续页面的翻译重叠进行，全部翻译完后统一等待并处理写入失败的页面
+                translated_count -= await self._flush_pending_saves(params, config)
+                if self._page_dedup is not None:
+                    logger.info(self.dedup_summary())
                 
                 # 计算总耗时
                 total_time = time.time() - start_time
@@ -200,6 +214,103 @@ class MangaTranslatorLocal(MangaTranslator):
                     except Exception as e:
                         logger.debug(f'Failed to play completion sound: {e}')
 
+    @staticmethod
+    def _archive_dest(path: str, dest: str) -> str:
+        """压缩包的输出路径；CBR 只能读不能写，统一输出为 CBZ"""
+        p, ext = os.path.splitext(os.path.basename(path))
+        out_ext = '.zip' if ext.lower() == '.zip' else '.cbz'
+        if not dest:
+            return os.path.join(os.path.dirname(path), f'{p}-translated{out_ext}')
+        if os.path.isdir(dest):
+            if os.path.abspath(os.path.dirname(path)) == os.path.abspath(dest):
+                return os.path.join(dest, f'{p}_translated{out_ext}')
+            return os.path.join(dest, f'{p}{out_ext}')
+        dest_p, dest_ext = os.path.splitext(dest)
+        return dest if is_archive(dest) and dest_ext.lower() not in ('.cbr', '.rar') else dest_p + out_ext
+
+    @staticmethod
+    def _archive_entry_names(page_names: List[str], other_names: List[str], file_ext: str = None) -> dict:
+        """译图在压缩包中的条目名；按 --format 改扩展名后与已有条目重名时保留原名（按原格式编码）"""
+        if not file_ext:
+            return {name: name for name in page_names}
+        taken = set(page_names) | set(other_names)
+        entries = {}
+        for name in page_names:
+            entry = f'{os.path.splitext(name)[0]}.{file_ext}'
+            if entry != name and entry in taken:
+                logger.warning(f'"{entry}" already exists in the archive, keeping "{name}" in its original format')
+                entry = name
+            taken.add(entry)
+            entries[name] = entry
+        return entries
+
+    async def translate_archive(self, path: str, dest: str, params: dict, config: Config, file_ext: str = None) -> bool:
+        """
+        直接从 CBZ/ZIP/CBR 中逐页读取并翻译，结果页流式写入输出 CBZ，不解压到磁盘。
+        未翻译的页面（无文字、--skip-no-text、翻译失败且 --ignore-errors）和非图片条目原样保留。
+        """
+        if not params.get('overwrite') and os.path.exists(dest):
+            logger.info(f'Skipping as already translated: "{dest}". Use --overwrite to overwrite existing translations.')
+            return True
+        if self.save_text or self.save_text_file or self.load_text or self.template:
+            logger.error(f'Text import/export modes are not supported for archives, extract "{path}" first')
+            return False
+        if file_ext and file_ext not in ('png', 'webp', 'jpg', 'jpeg'):
+            raise ValueError(f'--format {file_ext} is not supported inside archives')
+
+        start_time = time.time()
+        translated_count = 0
+        logger.info(f'Translating archive: "{path}"')
+        with ArchiveReader(path) as reader:
+            logger.info(f'Found {len(reader)} pages in "{os.path.basename(path)}"')
+            writer = ArchiveWriter(dest, max_workers=self._result_writer.max_workers, max_pending=max(2, self.batch_size * 2),
+                                   png_compress_level=self.png_compress_level)
+            try:
+                entries = self._archive_entry_names(reader.page_names, reader.other_names, file_ext)
+                for name in reader.other_names:
+                    await writer.add_bytes_async(name, reader.read(name))
+                step = max(1, self.batch_size)
+                for i in range(0, len(reader.page_names), step):
+                    names = reader.page_names[i:i + step]
+                    # 只解码当前批次的页面
+                    images = [reader.open_image(name) for name in names]
+                    try:
+                        if step > 1:
+                            contexts = await self.translate_batch([(img, config) for img in images], len(images))
+                        else:
+                            contexts = [await self.translate(images[0], config)]
+                    except TranslationInterrupt:
+                        raise
+                    except Exception as e:
+                        if not self.ignore_errors:
+                            raise
+                        logger.error(f'Failed to translate {names} in "{os.path.basename(path)}": {e}')
+                        contexts = [None] * len(names)
+
+                    for name, ctx in zip(names, contexts):
+                        if ctx is None or not ctx.result or (self.skip_no_text and not ctx.text_regions):
+                            await writer.add_bytes_async(name, reader.read(name))
+                            continue
+                        entry = entries[name]
+                        save_kwargs = {'quality': self.save_quality} \
+                            if self.save_quality and os.path.splitext(entry)[1].lower() in ('.jpg', '.jpeg', '.webp') else {}
+                        await writer.submit_image_async(ctx.result, entry, **save_kwargs)
+                        translated_count += 1
+                        ctx.result = None
+                        ctx.input = None
+                    for img in images:
+                        img.close()
+                    await self._report_progress('saved', True)
+                await writer.commit_async()
+            except BaseException:
+                writer.abort()
+                raise
+
+        logger.info(f'Done. Translated {translated_count}/{len(reader)} pages of "{os.path.basename(path)}" '
+                    f'in {time.time() - start_time:.1f} seconds')
+        logger.info(f'Results saved to: "{dest}"')
+        return True
+
     async def translate_file(self, path: str, dest: str, params: dict, config: Config):
         if not params.get('overwrite') and os.path.exists(dest):
             logger.info(
@@ -242,6 +353,39 @@ class MangaTranslatorLocal(MangaTranslator):
             attempts += 1
         return False
 
+    async def _flush_pending_saves(self, params: dict, config: Config) -> int:
+        """
+        等待所有后台写入完成，统一处理写入失败的页面：按 --attempts 重新翻译并写入，
+        重试用完后 --ignore-errors 时记录错误继续，否则抛出第一个错误。返回最终没有写入的页数。
+        """
+        max_retries = self.attempts if self.attempts is not None else 0
+        retry_params = {**(params or {}), 'overwrite': True}
+        lost = []
+        attempt = 0
+        while True:
+            pending, self._pending_saves = self._pending_saves, []
+            await self._result_writer.flush_async(raise_errors=False)
+            failed = [(path, dest, future.result().error) for future, path, dest in pending
+                      if future.result().error is not None]
+            if not failed:
+                break
+            attempt += 1
+            if max_retries != -1 and attempt > max_retries:
+                lost.extend(failed)
+                break
+            for path, dest, error in failed:
+                logger.info(f'Retrying "{path}" after failed save ({error.__class__.__name__}: {error}), attempt {attempt}'
+                            + (f' of {max_retries}' if max_retries != -1 else ''))
+                # 翻译本身失败时 translate_file 已按 --ignore-errors 处理，这里只记下没有结果的页面
+                if not await self.translate_file(path, dest, retry_params, config):
+                    lost.append((path, dest, error))
+
+        if lost and not self.ignore_errors:
+            raise lost[0][2]
+        for path, dest, error in lost:
+            logger.error(f'Failed to save "{dest}" for "{path}": {error.__class__.__name__}: {error}')
+        return len(lost)
+
     async def _translate_file(self, path: str, dest: str, config: Config, ctx: Context) -> bool:
         if path.endswith('.txt'):
             with open(path, 'r') as f:
@@ -287,7 +431,10 @@ class MangaTranslatorLocal(MangaTranslator):
                 if not (self.save_text or self.save_text_file):
                     logger.info(f'Saving "{dest}"')
                     ctx.save_quality = self.save_quality
-                    save_result(result, dest, ctx)
+                    # 编码和写盘在后台线程中完成，不等待写完就继续下一页；
+                    # 写入失败在 _flush_pending_saves 中统一按 --attempts / --ignore-errors 处理
+                    future = await self._result_writer.submit_async(result, dest, ctx)
+                    self._pending_saves.append((future, path, dest))
                     await self._report_progress('saved', True)
 
                 if self.save_text or self.save_text_file:
@@ -334,8 +481,9 @@ class MangaTranslatorLocal(MangaTranslator):
         else:
             logger.info('Memory optimization enabled')
         
-        # 收集所有需要翻译的图片文件
+        # 收集所有需要翻译的图片文件（压缩包单独逐页流式处理）
         image_tasks = []
+        archive_tasks = []
         for root, subdirs, files in os.walk(path):
             files = natural_sort(files)
             dest_root = replace_prefix(root, path, dest)
@@ -347,6 +495,9 @@ class MangaTranslatorLocal(MangaTranslator):
                     
                 file_path = os.path.join(root, f)
                 p, ext = os.path.splitext(f)
+                if is_archive(f):
+                    archive_tasks.append((file_path, self._archive_dest(file_path, dest_root)))
+                    continue
                 if dest_root == root:
                     output_filename = f'{p}_translated.{file_ext or ext[1:]}'
                 else:
@@ -368,8 +519,12 @@ class MangaTranslatorLocal(MangaTranslator):
                     logger.warning(f'Failed to open image: {file_path}, error: {e}')
                     continue
         
+        for archive_path, archive_dest in archive_tasks:
+            await self.translate_archive(archive_path, archive_dest, params, config, file_ext)
+
         if not image_tasks:
-            logger.info('No images found to translate, use --overwrite to write over existing translations.')
+            if not archive_tasks:
+                logger.info('No images found to translate, use --overwrite to write over existing translations.')
             return
             
         logger.info(f'Found {len(image_tasks)} images to translate')
@@ -417,6 +572,7 @@ class MangaTranslatorLocal(MangaTranslator):
                 batch_results = await self.translate_batch(images_with_configs, len(batch))
                 
                 # 保存结果
+                submitted = 0
                 for j, (ctx, (img, _, file_path, output_dest)) in enumerate(zip(batch_results, batch)):
                     # 检查是否应该跳过没有文本的图片（遵循skip_no_text参数）
                     if self.skip_no_text and ctx and not ctx.text_regions:
@@ -433,8 +589,9 @@ class MangaTranslatorLocal(MangaTranslator):
                             save_ctx.gimp_font = batch_config.render.gimp_font
                             save_ctx.save_quality = self.save_quality
                             
-                            save_result(ctx.result, output_dest, save_ctx)
-                            translated_count += 1
+                            future = await self._result_writer.submit_async(ctx.result, output_dest, save_ctx)
+                            self._pending_saves.append((future, file_path, output_dest))
+                            submitted += 1
                         
                         # 保存文本文件（如果需要）
                         if self.save_text or self.save_text_file:
@@ -502,6 +659,8 @@ class MangaTranslatorLocal(MangaTranslator):
                             error_msg = f'Translation failed: {file_path} (unexpected condition)'
                             logger.error(error_msg)
                             raise RuntimeError(error_msg)
+                # 写入在后台与下一批次的翻译重叠进行，失败的页面在全部批次结束后统一处理
+                translated_count += submitted
                 # 成功处理批次，重置连续错误计数
                 logger.debug(f'Batch {batch_num} processed successfully')
                         
@@ -549,6 +708,9 @@ class MangaTranslatorLocal(MangaTranslator):
             # 移动到下一批次
             i += current_batch_size
             
+        # 等待后台写入全部落盘，写入失败的页面按 --attempts 重试
+        translated_count -= await self._flush_pending_saves(params, config)
+        
         # 最终报告
         total_time = time.time() - start_time  # 计算总耗时
         
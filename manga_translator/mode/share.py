@@ -136,4 +136,8 @@ class MangaShare:
 
         config = uvicorn.Config(app, host=self.host, port=self.port)
         server = uvicorn.Server(config)
-        await server.serve()
+        try:
+            await server.serve()
+        finally:
+            # 离线翻译模型在整个服务期间常驻，服务退出时统一释放
+            await self.manga.unload_translators()
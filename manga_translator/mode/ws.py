@@ -9,6 +9,7 @@ from PIL import Image
 
 from manga_translator import logger, Context, MangaTranslator, Config
 from manga_translator.utils import PriorityLock, Throttler, imwrite_unicode
+from .ws_pipeline import PrefetchBuffer, decode_image, encode_png, fetch_image, image_nbytes, upload
 
 
 class MangaTranslatorWS(MangaTranslator):
@@ -17,6 +18,10 @@ class MangaTranslatorWS(MangaTranslator):
         self.url = params.get('ws_url')
         self.secret = params.get('ws_secret', os.getenv('WS_SECRET', ''))
         self.ignore_errors = params.get('ignore_errors', True)
+        # 预取：翻译当前任务时提前下载并解码后续任务的图片
+        self.prefetch_depth = params.get('prefetch_depth') or 2
+        self.prefetch_memory = params.get('prefetch_memory') or 512
+        self.upload_concurrency = params.get('upload_concurrency') or 2
 
         self._task_id = None
         self._websocket = None
@@ -32,6 +37,8 @@ class MangaTranslatorWS(MangaTranslator):
         self._server_loop = asyncio.new_event_loop()
         self.task_lock = PriorityLock()
         self.counter = 0
+        prefetch = PrefetchBuffer(self.prefetch_depth, self.prefetch_memory)
+        upload_slots = None
 
         async def _send_and_yield(websocket, msg):
             # send message and yield control to the event loop (to actually send the message)
@@ -54,8 +61,10 @@ class MangaTranslatorWS(MangaTranslator):
 
         self.add_progress_hook(sync_state)
 
-        async def translate(task_id, websocket, image, params):
+        async def translate(task_id, websocket, image, params, on_start=None):
             async with self.task_lock((1 << 31) - params['ws_count']):
+                if on_start is not None:
+                    on_start()
                 self._task_id = task_id
                 self._websocket = websocket
                 result = await self.translate(image, params)
@@ -90,65 +99,72 @@ class MangaTranslatorWS(MangaTranslator):
             }
             self.counter += 1
 
-            logger_task.info(f'-- Downloading image from {task.source_image}')
-            await server_send_status(websocket, task.id, 'downloading')
-            async with session.get(task.source_image) as resp:
-                if resp.status == 200:
-                    source_image = await resp.read()
-                else:
-                    msg = ws_pb2.WebSocketMessage()
-                    msg.status.id = task.id
-                    msg.status.status = 'error-download'
-                    await websocket.send(msg.SerializeToString())
-                    await asyncio.sleep(0)
-                    return False, False
-
-            logger_task.info(f'-- Translating image')
-            if translation_params:
-                for p, default_value in translation_params.items():
-                    current_value = params.get(p)
-                    params[p] = current_value if current_value is not None else default_value
+            # 预取阶段：下载并在线程池中解码，数量和内存受限；进入翻译后释放名额
+            await prefetch.enter()
+            prefetched_bytes = 0
+            released = False
 
-            image = Image.open(io.BytesIO(source_image))
+            def leave_prefetch():
+                # 在主循环中拿到翻译锁时调用，释放 ws 线程事件循环里的预取名额
+                nonlocal released
+                released = True
+                asyncio.run_coroutine_threadsafe(prefetch.leave(prefetched_bytes), self._server_loop)
 
-            (ori_w, ori_h) = image.size
-            if max(ori_h, ori_w) > 1200:
-                params['upscale_ratio'] = 1
+            try:
+                logger_task.info(f'-- Downloading image from {task.source_image}')
+                await server_send_status(websocket, task.id, 'downloading')
+                source_image = await fetch_image(session, task.source_image)
+                if source_image is None:
+                    await server_send_status(websocket, task.id, 'error-download')
+                    return False, False
 
-            await server_send_status(websocket, task.id, 'preparing')
-            # translation_dict = await self.translate(image, params)
-            translation_dict = await asyncio.wrap_future(
-                asyncio.run_coroutine_threadsafe(
-                    translate(task.id, websocket, image, params),
-                    main_loop
+                if translation_params:
+                    for p, default_value in translation_params.items():
+                        current_value = params.get(p)
+                        params[p] = current_value if current_value is not None else default_value
+
+                image = await decode_image(source_image)
+                del source_image
+                prefetched_bytes = image_nbytes(image)
+                await prefetch.charge(prefetched_bytes)
+                logger_task.debug(f'-- Prefetched image, buffer usage: {prefetch.usage}')
+
+                (ori_w, ori_h) = image.size
+                if max(ori_h, ori_w) > 1200:
+                    params['upscale_ratio'] = 1
+
+                logger_task.info(f'-- Translating image')
+                await server_send_status(websocket, task.id, 'preparing')
+                # translation_dict = await self.translate(image, params)
+                translation_dict = await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(
+                        translate(task.id, websocket, image, params, on_start=leave_prefetch),
+                        main_loop
+                    )
                 )
-            )
+            finally:
+                if not released:
+                    await prefetch.leave(prefetched_bytes)
             await send_throttler.flush()
 
+            # 编码和上传不占用翻译锁，下一个任务此时已经可以开始翻译
             output: Image.Image = translation_dict.result
             if output is not None:
                 await server_send_status(websocket, task.id, 'saving')
 
-                output = output.resize((ori_w, ori_h), resample=Image.LANCZOS)
-
-                img = io.BytesIO()
-                output.save(img, format='PNG')
+                img_bytes = await encode_png(output, (ori_w, ori_h))
                 if self.verbose:
-                    output.save(self._result_path('ws_final.png'))
+                    with open(self._result_path('ws_final.png'), 'wb') as f:
+                        f.write(img_bytes)
 
-                img_bytes = img.getvalue()
                 logger_task.info(f'-- Uploading result to {task.translation_mask}')
                 await server_send_status(websocket, task.id, 'uploading')
-                async with session.put(task.translation_mask, data=img_bytes) as resp:
-                    if resp.status != 200:
-                        logger_task.error(f'-- Failed to upload result:')
-                        logger_task.error(f'{resp.status}: {resp.reason}')
-                        msg = ws_pb2.WebSocketMessage()
-                        msg.status.id = task.id
-                        msg.status.status = 'error-upload'
-                        await websocket.send(msg.SerializeToString())
-                        await asyncio.sleep(0)
-                        return False, False
+                status, reason = await upload(session, task.translation_mask, img_bytes, upload_slots)
+                if status != 200:
+                    logger_task.error(f'-- Failed to upload result:')
+                    logger_task.error(f'{status}: {reason}')
+                    await server_send_status(websocket, task.id, 'error-upload')
+                    return False, False
 
             return True, output is not None
 
@@ -171,7 +187,9 @@ class MangaTranslatorWS(MangaTranslator):
                 logger_task.info(f'-- Task finished')
 
         async def async_server_thread(main_loop):
+            nonlocal upload_slots
             from aiohttp import ClientSession, ClientTimeout
+            upload_slots = asyncio.Semaphore(self.upload_concurrency)
             timeout = ClientTimeout(total=30)
             async with ClientSession(timeout=timeout) as session:
                 logger_conn = logger.getChild('connection')
@@ -222,7 +240,11 @@ class MangaTranslatorWS(MangaTranslator):
         ).start()
 
         # create a future that is never done
-        await future
+        try:
+            await future
+        finally:
+            # 离线翻译模型在整个服务期间常驻，服务退出时统一释放
+            await self.unload_translators()
 
     async def _run_text_translation(self, config: Config, ctx: Context):
         coroutine = super()._run_text_translation(config, ctx)
@@ -0,0 +1,101 @@
+"""
+WebSocket 工作模式的任务流水线辅助
+
+服务端可能一次推送多个任务。每个任务的下载和解码在翻译锁之外提前完成（预取），
+结果图的缩放/PNG 编码放到线程池、上传单独限流，GPU 不必等待网络 I/O，
+事件循环也不会被编码阻塞。预取数量和预取图片占用的内存都有上限。
+"""
+import asyncio
+import io
+from typing import Optional, Tuple
+
+from PIL import Image
+
+
+class PrefetchBuffer:
+    """
+    限制"已开始下载但还没进入翻译"的任务数（depth）和它们解码后占用的内存（memory_mb）。
+    内存上限不会卡死单个超大图片：缓冲区为空时总是允许放入。
+    """
+
+    def __init__(self, depth: int = 2, memory_mb: float = 512):
+        self.depth = max(1, int(depth))
+        self.memory_bytes = int(memory_mb * 1024 * 1024)
+        self._count = 0
+        self._bytes = 0
+        self._cond: Optional[asyncio.Condition] = None
+
+    def _condition(self) -> asyncio.Condition:
+        # 在 ws 服务线程自己的事件循环里创建
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def enter(self):
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self._count < self.depth)
+            self._count += 1
+
+    async def charge(self, nbytes: int):
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self._bytes == 0 or self._bytes + nbytes <= self.memory_bytes)
+            self._bytes += nbytes
+
+    async def leave(self, nbytes: int = 0):
+        cond = self._condition()
+        async with cond:
+            self._count = max(0, self._count - 1)
+            self._bytes = max(0, self._bytes - nbytes)
+            cond.notify_all()
+
+    @property
+    def usage(self) -> Tuple[int, int]:
+        return self._count, self._bytes
+
+
+def image_nbytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+def _decode(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+async def fetch_image(session, url: str) -> Optional[bytes]:
+    """下载源图片，失败返回 None"""
+    async with session.get(url) as resp:
+        if resp.status != 200:
+            return None
+        return await resp.read()
+
+
+async def decode_image(data: bytes) -> Image.Image:
+    """在线程池里完整解码，翻译时不再做惰性解码"""
+    return await asyncio.get_running_loop().run_in_executor(None, _decode, data)
+
+
+def _encode_png(output: Image.Image, size: Tuple[int, int]) -> bytes:
+    if output.size != size:
+        output = output.resize(size, resample=Image.LANCZOS)
+    buffer = io.BytesIO()
+    output.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+async def encode_png(output: Image.Image, size: Tuple[int, int]) -> bytes:
+    """缩放回原尺寸并编码为 PNG（线程池）"""
+    return await asyncio.get_running_loop().run_in_executor(None, _encode_png, output, size)
+
+
+async def upload(session, url: str, data: bytes, slots: Optional[asyncio.Semaphore] = None) -> Tuple[int, str]:
+    """上传结果，slots 限制同时进行的上传数；返回 (状态码, 原因)"""
+    if slots is None:
+        async with session.put(url, data=data) as resp:
+            return resp.status, resp.reason
+    async with slots:
+        async with session.put(url, data=data) as resp:
+            return resp.status, resp.reason
@@ -7,7 +7,7 @@ from .model_48px_ctc import Model48pxCTCOCR
 from .model_manga_ocr import ModelMangaOCR
 from .model_paddleocr import ModelPaddleOCR, ModelPaddleOCRKorean, ModelPaddleOCRLatin
 from ..config import Ocr, OcrConfig
-from ..utils import Quadrilateral
+from ..utils import Quadrilateral, unload_model_instance
 
 OCRS = {
     Ocr.ocr32px: Model32pxOCR,
@@ -43,4 +43,4 @@ async def dispatch(ocr_key: Ocr, image: np.ndarray, regions: List[Quadrilateral]
     return await ocr.recognize(image, regions, config, verbose)
 
 async def unload(ocr_key: Ocr):
-    ocr_cache.pop(ocr_key, None)
\ No newline at end of file
+    await unload_model_instance(ocr_cache.pop(ocr_key, None))
\ No newline at end of file
@@ -18,6 +18,7 @@ from .xpos_relative_position import XPOS
 
 from .common import OfflineOCR
 from ..utils import TextBlock, Quadrilateral, chunks, imwrite_unicode
+from ..utils.cpu_export import quantize_linear_int8, synthetic_text_lines, use_int8_on, verify_quantized
 from ..utils.generic import AvgMeter
 from ..utils.bubble import is_ignore
 
@@ -70,6 +71,30 @@ class Model48pxOCR(OfflineOCR):
             self.use_gpu = False
         if self.use_gpu:
             self.model = self.model.to(device)
+        elif use_int8_on(device):
+            self.model = self._quantize_model(self.model)
+
+    def _quantize_model(self, model: 'OCR') -> 'OCR':
+        """CPU 上对 Transformer 线性层做动态 int8 量化，样例文本行解码结果不一致时保留 fp32 模型"""
+        quantized = quantize_linear_int8(model)
+        lines = synthetic_text_lines()
+        widths = [line.shape[1] for line in lines]
+        batch = np.zeros((len(lines), 48, max(widths), 3), dtype=np.uint8)
+        for i, line in enumerate(lines):
+            batch[i, :, :line.shape[1]] = line
+        image_tensor = einops.rearrange((torch.from_numpy(batch).float() - 127.5) / 127.5, 'N H W C -> N C H W')
+
+        def run(m):
+            with torch.no_grad():
+                ret = m.infer_beam_batch_tensor(image_tensor, widths, beams_k=5, max_seq_length=64)
+            return [list(r[0]) for r in ret], [np.array([float(r[1]) for r in ret])]
+
+        report = verify_quantized(lambda: run(model), lambda: run(quantized), max_abs_tolerance=0.05, mean_abs_tolerance=0.02)
+        if not report.passed:
+            self.logger.warning(f'int8 OCR model drifts from fp32 ({report}), using fp32')
+            return model
+        self.logger.info(f'Using dynamic int8 OCR model on CPU: {report}')
+        return quantized
 
 
     async def _unload(self):
@@ -190,94 +190,184 @@ def calculate_uniformity(lines: List[str]) -> float:
     cv = std_length / mean_length if mean_length > 0 else float('inf')
     return cv
 
+def _measure_line_break_runs(segments: List[str], region: TextBlock, config: Config, target_font_size: int):
+    """
+    Measure every contiguous run of segments (segments[i..j] joined with their [BR] removed)
+    exactly once.
+
+    Returns a dict (i, j) -> (line_count, max_extent, stripped_length_sum, stripped_length_square_sum),
+    or None for runs that cannot be laid out.
+    """
+    n = len(segments)
+    runs = {}
+    for i in range(n):
+        for j in range(i, n):
+            run_text = ''.join(segments[i:j + 1])
+            # 保留下来的 [BR] 会吞掉两侧空白（与 re.sub(r'\s*\[BR\]\s*', '\n') 一致）
+            if i > 0:
+                run_text = run_text.lstrip()
+            if j < n - 1:
+                run_text = run_text.rstrip()
+            try:
+                if region.horizontal:
+                    lines, extents = text_render.calc_horizontal(
+                        target_font_size, run_text,
+                        max_width=99999, max_height=99999,
+                        language=region.target_lang
+                    )
+                else:
+                    if config.render.auto_rotate_symbols:
+                        run_text = text_render.auto_add_horizontal_tags(run_text)
+                    lines, extents = text_render.calc_vertical(target_font_size, run_text, max_height=99999)
+            except Exception as e:
+                logger.warning(f"[OPTIMIZE_LINE_BREAKS] Error measuring segments {i}-{j}: {e}")
+                runs[(i, j)] = None
+                continue
+            if not extents:
+                runs[(i, j)] = None
+                continue
+            lengths = [len(line.strip()) for line in lines]
+            runs[(i, j)] = (len(lines), max(extents), sum(lengths), sum(l * l for l in lengths))
+    return runs
+
 def optimize_line_breaks_for_region(region: TextBlock, config: Config, target_font_size: int, bubble_width: float, bubble_height: float):
     """
-    Optimize line breaks for a single region by testing all combinations.
+    Optimize line breaks for a single region.
+
+    Instead of laying out all 2^n subsets of [BR] markers, every contiguous run of segments is
+    measured once and a dynamic program over break positions finds, per line count, the split
+    with the smallest widest line (-> largest font size). Among the splits whose font size is
+    within 0.5px of the best, a second pass picks the most uniform line lengths.
     Returns the best text variant and the font size it achieves.
     """
     original_translation = region.translation
-    combinations = generate_line_break_combinations(original_translation)
-    
-    best_text = original_translation
-    best_font_size = 0
-    best_uniformity = float('inf')
-    
+    # Standardize all break markers to [BR] (including full-width brackets)
+    text = re.sub(r'\s*(<br>|【BR】)\s*', '[BR]', original_translation, flags=re.IGNORECASE)
+    segments = re.split(r'\[BR\]', text, flags=re.IGNORECASE)
+    n = len(segments)
+
     layout_mode = config.render.layout_mode if config and hasattr(config.render, 'layout_mode') else 'default'
-    logger.debug(f"[OPTIMIZE_LINE_BREAKS] Testing {len(combinations)} combinations, layout_mode={layout_mode}")
-    
-    for text_variant, combo_desc, skip_reason in combinations:
-        if skip_reason:
-            logger.debug(f"[OPTIMIZE_LINE_BREAKS] Skipping {combo_desc}: {skip_reason}")
-            continue
-        
-        # Convert [BR] to \n for calculation
-        text_for_calc = re.sub(r'\s*\[BR\]\s*', '\n', text_variant, flags=re.IGNORECASE)
-        
-        # 严格智能缩放模式：如果去掉所有断句（无\n），会导致文本框扩大，淘汰此方案
-        strict_smart_scaling = getattr(config.render, 'strict_smart_scaling', False) if config and hasattr(config, 'render') else False
-        if layout_mode == 'smart_scaling' and strict_smart_scaling:
-            if '\n' not in text_for_calc:
-                logger.debug(f"[OPTIMIZE_LINE_BREAKS] Skipping {combo_desc}: 严格智能缩放模式下无断句会扩大文本框")
+    strict_smart_scaling = getattr(config.render, 'strict_smart_scaling', False) if config and hasattr(config, 'render') else False
+    # 严格智能缩放模式：如果去掉所有断句（无\n），会导致文本框扩大，淘汰此方案
+    require_break = layout_mode == 'smart_scaling' and strict_smart_scaling and n > 1
+    # 第一段过短（<=2字符）时不允许去掉第一个断句
+    keep_first_break = n > 1 and len(segments[0].strip()) <= 2
+    logger.debug(f"[OPTIMIZE_LINE_BREAKS] Optimizing {n - 1} breaks, layout_mode={layout_mode}")
+
+    runs = _measure_line_break_runs(segments, region, config, target_font_size)
+
+    def allowed(i: int, j: int) -> bool:
+        if runs[(i, j)] is None:
+            return False
+        if keep_first_break and i == 0 and j > 0:
+            return False
+        if require_break and i == 0 and j == n - 1:
+            return False
+        return True
+
+    if region.horizontal:
+        spacing = int(target_font_size * (config.render.line_spacing or 0.01))
+    else:
+        spacing = int(target_font_size * (config.render.line_spacing or 0.2))
+
+    def effective_font_size(extent: float, line_count: int) -> float:
+        # 横排：宽度由最长行决定，高度由行数决定；竖排相反
+        stacked = target_font_size * line_count + spacing * max(0, line_count - 1)
+        if region.horizontal:
+            required_width, required_height = extent, stacked
+        else:
+            required_width, required_height = stacked, extent
+        width_ratio = bubble_width / required_width if required_width > 0 else 1.0
+        height_ratio = bubble_height / required_height if required_height > 0 else 1.0
+        return target_font_size * min(width_ratio, height_ratio)
+
+    # Pass 1: min_extent[j][L] = smallest widest line over splits of segments[0..j] into L lines
+    min_extent = [{} for _ in range(n)]
+    for j in range(n):
+        for i in range(j + 1):
+            if not allowed(i, j):
                 continue
-        
-        try:
-            # Calculate required dimensions
+            k, extent = runs[(i, j)][0], runs[(i, j)][1]
+            prev_states = {0: 0} if i == 0 else min_extent[i - 1]
+            for prev_lines, prev_extent in prev_states.items():
+                candidate = max(prev_extent, extent)
+                if candidate < min_extent[j].get(prev_lines + k, float('inf')):
+                    min_extent[j][prev_lines + k] = candidate
+
+    final_states = min_extent[n - 1]
+    if not final_states:
+        logger.debug("[OPTIMIZE_LINE_BREAKS] No valid layout found, keeping original text")
+        best_text, best_font_size = text, 0
+    else:
+        best_font_size = max(effective_font_size(e, L) for L, e in final_states.items())
+
+        # Pass 2: among splits within 0.5px of the best font size, minimize line length variation.
+        # For a fixed line count and total length, a smaller sum of squares means a smaller
+        # coefficient of variation, so each state keeps the best sum of squares per total length.
+        threshold = best_font_size - 0.5
+        extent_cap = float('inf')
+        if threshold > 0:
             if region.horizontal:
-                lines, widths = text_render.calc_horizontal(
-                    target_font_size, text_for_calc, 
-                    max_width=99999, max_height=99999, 
-                    language=region.target_lang
-                )
-                if widths:
-                    spacing_y = int(target_font_size * (config.render.line_spacing or 0.01))
-                    required_width = max(widths)
-                    required_height = target_font_size * len(lines) + spacing_y * max(0, len(lines) - 1)
-                else:
+                extent_cap = bubble_width * target_font_size / threshold
+            else:
+                extent_cap = bubble_height * target_font_size / threshold
+        # states[j][L] = {total_length: (square_sum, widest, i, prev_total_length)}
+        states = [{} for _ in range(n)]
+        for j in range(n):
+            for i in range(j + 1):
+                if not allowed(i, j):
                     continue
-            else:  # Vertical
-                if config.render.auto_rotate_symbols:
-                    text_for_calc = text_render.auto_add_horizontal_tags(text_for_calc)
-                
-                lines, heights = text_render.calc_vertical(target_font_size, text_for_calc, max_height=99999)
-                if heights:
-                    spacing_x = int(target_font_size * (config.render.line_spacing or 0.2))
-                    required_height = max(heights)
-                    required_width = target_font_size * len(lines) + spacing_x * max(0, len(lines) - 1)
+                k, extent, length, square = runs[(i, j)]
+                if extent > extent_cap + 1e-6:
+                    continue
+                if i == 0:
+                    prev_items = [(0, 0, 0, 0)]
                 else:
+                    prev_items = [(L, total, sq, widest) for L, by_total in states[i - 1].items()
+                                  for total, (sq, widest, _, _) in by_total.items()]
+                for prev_lines, prev_total, prev_square, prev_widest in prev_items:
+                    total = prev_total + length
+                    entry = (prev_square + square, max(prev_widest, extent), i, prev_total)
+                    by_total = states[j].setdefault(prev_lines + k, {})
+                    if total not in by_total or entry[:2] < by_total[total][:2]:
+                        by_total[total] = entry
+
+        best_choice = None
+        for L, by_total in states[n - 1].items():
+            for total, (square, widest, _, _) in by_total.items():
+                font_size = effective_font_size(widest, L)
+                if font_size < threshold - 1e-6:
                     continue
-            
-            # Calculate how much the text fits in the bubble
-            # Larger font size is better
-            width_ratio = bubble_width / required_width if required_width > 0 else 1.0
-            height_ratio = bubble_height / required_height if required_height > 0 else 1.0
-            fit_ratio = min(width_ratio, height_ratio)
-            
-            # Calculate effective font size for this combination
-            effective_font_size = target_font_size * fit_ratio
-            
-            # Calculate uniformity
-            uniformity = calculate_uniformity(lines)
-            
-            logger.debug(f"[OPTIMIZE_LINE_BREAKS] {combo_desc}: font_size={effective_font_size:.1f}, uniformity={uniformity:.3f}")
-            
-            # Choose the best: prioritize font size, then uniformity
-            is_better = False
-            if effective_font_size > best_font_size + 0.5:  # Significantly larger font
-                is_better = True
-            elif abs(effective_font_size - best_font_size) <= 0.5:  # Similar font size
-                if uniformity < best_uniformity:  # Better uniformity
-                    is_better = True
-            
-            if is_better:
-                best_text = text_variant
-                best_font_size = effective_font_size
-                best_uniformity = uniformity
-                logger.debug(f"[OPTIMIZE_LINE_BREAKS] New best: {combo_desc}")
-        
-        except Exception as e:
-            logger.warning(f"[OPTIMIZE_LINE_BREAKS] Error evaluating {combo_desc}: {e}")
-            continue
-    
+                if L <= 1:
+                    uniformity = 0.0
+                elif total == 0:
+                    uniformity = float('inf')
+                else:
+                    mean = total / L
+                    uniformity = np.sqrt(max(square / L - mean * mean, 0.0)) / mean
+                # 优先均匀度，其次字体大小，最后保留更多断句
+                rank = (uniformity, -font_size, -L)
+                if best_choice is None or rank < best_choice[0]:
+                    best_choice = (rank, L, total, font_size)
+
+        if best_choice is None:
+            best_text = text
+        else:
+            _, L, total, best_font_size = best_choice
+            # 回溯得到保留的断句位置
+            kept_breaks = set()
+            j = n - 1
+            while j >= 0:
+                _, _, i, prev_total = states[j][L][total]
+                k = runs[(i, j)][0]
+                if i > 0:
+                    kept_breaks.add(i - 1)
+                j, L, total = i - 1, L - k, prev_total
+            best_text = segments[0]
+            for idx in range(1, n):
+                best_text += ('[BR]' if idx - 1 in kept_breaks else '') + segments[idx]
+            logger.debug(f"[OPTIMIZE_LINE_BREAKS] Best: kept breaks {sorted(kept_breaks)}, font_size={best_font_size:.1f}, uniformity={best_choice[0][0]:.3f}")
+
     # Compare and log optimization results
     # 使用统一的正则匹配所有BR变体进行统计
     br_pattern = r'(\[BR\]|【BR】|<br>)'
@@ -305,6 +395,25 @@ def optimize_line_breaks_for_region(region: TextBlock, config: Config, target_fo
         # 即使数量相同，也返回标准化后的文本（全角变半角）
         return best_text, best_font_size
 
+def search_max_fitting_font_size(fits, min_size: int, max_size: int) -> int:
+    """
+    Binary search for the largest font size in [min_size, max_size] for which fits(size) is True,
+    assuming larger sizes never fit better than smaller ones. Returns min_size - 1 if nothing fits,
+    and max_size unchanged if max_size < min_size (same as the previous linear search).
+    """
+    if max_size < min_size:
+        return max_size
+    if fits(max_size):
+        return max_size
+    lo, hi = min_size - 1, max_size  # fits(lo) 视为 True，fits(hi) 为 False
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
 def resize_regions_to_font_size(img: np.ndarray, text_regions: List['TextBlock'], config: Config, original_img: np.ndarray = None, return_debug_img: bool = False):
     """
     Resize text regions based on layout mode.
@@ -553,43 +662,18 @@ def resize_regions_to_font_size(img: np.ndarray, text_regions: List['TextBlock']
                 region.translation = optimized_text
                 logger.debug(f"[OPTIMIZE] Optimized text: {region.translation}")
             
-            font_size = target_font_size
             min_shrink_font_size = max(min_font_size, 8)
 
-            # Step 1: 先缩小字体直到文本能放进文本框
-            iteration_count = 0
-            while font_size >= min_shrink_font_size:
-                iteration_count += 1
+            # 二分查找不超过初始大小、且行数不超过原文行数的最大字号
+            # （行数随字号单调不减，等价于原来的先逐级缩小再逐级放大）
+            def fits(size: int) -> bool:
                 if region.horizontal:
-                    lines, _ = text_render.calc_horizontal(font_size, region.translation, max_width=region.unrotated_size[0], max_height=region.unrotated_size[1], language=region.target_lang)
-                    if len(lines) <= len(region.texts):
-                        break
+                    lines, _ = text_render.calc_horizontal(size, region.translation, max_width=region.unrotated_size[0], max_height=region.unrotated_size[1], language=region.target_lang)
                 else:
-                    lines, _ = text_render.calc_vertical(font_size, region.translation, max_height=region.unrotated_size[1])
-                    if len(lines) <= len(region.texts):
-                        break
-                font_size -= 1
+                    lines, _ = text_render.calc_vertical(size, region.translation, max_height=region.unrotated_size[1])
+                return len(lines) <= len(region.texts)
 
-            # Step 2: 尝试扩大字体以更好地填充空间（但不超过初始大小）
-            # 从当前能放下的字体大小开始，逐步增加
-            max_fitting_font_size = font_size
-            test_font_size = font_size + 1
-
-            while test_font_size <= target_font_size:
-                if region.horizontal:
-                    test_lines, _ = text_render.calc_horizontal(test_font_size, region.translation, max_width=region.unrotated_size[0], max_height=region.unrotated_size[1], language=region.target_lang)
-                    if len(test_lines) <= len(region.texts):
-                        max_fitting_font_size = test_font_size
-                        test_font_size += 1
-                    else:
-                        break
-                else:
-                    test_lines, _ = text_render.calc_vertical(test_font_size, region.translation, max_height=region.unrotated_size[1])
-                    if len(test_lines) <= len(region.texts):
-                        max_fitting_font_size = test_font_size
-                        test_font_size += 1
-                    else:
-                        break
+            max_fitting_font_size = search_max_fitting_font_size(fits, min_shrink_font_size, target_font_size)
 
             # Calculate total font scale (font_scale_ratio + max_font_size limit)
             final_font_size = int(max(max_fitting_font_size, min_shrink_font_size) * config.render.font_scale_ratio)
@@ -1072,6 +1156,31 @@ async def dispatch(
         return img, debug_img
     return img
 
+def composite_text_box(img: np.ndarray, box: np.ndarray, M: np.ndarray, rect: tuple) -> bool:
+    """
+    Warp the RGBA text box with homography M and alpha-blend it into img inside rect (x1, y1, x2, y2).
+
+    Only the destination bounding box is warped: M is translated to the rect origin, which gives the
+    same pixels as warping onto the full page and cropping, at a cost proportional to the text area.
+    Returns False if the warped patch does not match the target size.
+    """
+    x1, y1, x2, y2 = rect
+    translate = np.array([[1, 0, -x1], [0, 1, -y1], [0, 0, 1]], dtype=np.float64)
+    # 使用INTER_LANCZOS4获得最高质量的插值,避免字体模糊
+    rgba_region = cv2.warpPerspective(box, translate @ M, (x2 - x1, y2 - y1), flags=cv2.INTER_LANCZOS4, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+    canvas_region = rgba_region[:, :, :3]
+    mask_region = rgba_region[:, :, 3:4].astype(np.float32) / 255.0
+
+    # 确保尺寸匹配
+    target_region = img[y1:y2, x1:x2]
+    if canvas_region.shape[:2] != target_region.shape[:2]:
+        return False
+    img[y1:y2, x1:x2] = np.clip(
+        (target_region.astype(np.float32) * (1 - mask_region) + canvas_region.astype(np.float32) * mask_region),
+        0, 255
+    ).astype(np.uint8)
+    return True
+
 def render(
     img,
     region: TextBlock,
@@ -1283,8 +1392,6 @@ def render(
         logger.info(f"Adjusted text position to fit within image: offset=({offset_x}, {offset_y}), original_bbox=({x}, {y}, {w}, {h})")
 
     M, _ = cv2.findHomography(src_points, adjusted_dst_points[0], cv2.RANSAC, 5.0)
-    # 使用INTER_LANCZOS4获得最高质量的插值,避免字体模糊
-    rgba_region = cv2.warpPerspective(box, M, (img.shape[1], img.shape[0]), flags=cv2.INTER_LANCZOS4, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
     x_adj, y_adj, w_adj, h_adj = cv2.boundingRect(np.round(adjusted_dst_points[0]).astype(np.int32))
     
     # 边界检查：确保调整后仍在图片内
@@ -1293,26 +1400,10 @@ def render(
     valid_x1 = max(0, x_adj)
     valid_x2 = min(img_w, x_adj + w_adj)
     
-    # 计算rgba_region中对应的区域
-    region_y1 = valid_y1
-    region_y2 = region_y1 + (valid_y2 - valid_y1)
-    region_x1 = valid_x1
-    region_x2 = region_x1 + (valid_x2 - valid_x1)
-    
     # 检查是否有有效区域
     if valid_y2 > valid_y1 and valid_x2 > valid_x1:
-        canvas_region = rgba_region[region_y1:region_y2, region_x1:region_x2, :3]
-        mask_region = rgba_region[region_y1:region_y2, region_x1:region_x2, 3:4].astype(np.float32) / 255.0
-        
-        # 确保尺寸匹配
-        target_region = img[valid_y1:valid_y2, valid_x1:valid_x2]
-        if canvas_region.shape[:2] == target_region.shape[:2]:
-            img[valid_y1:valid_y2, valid_x1:valid_x2] = np.clip(
-                (target_region.astype(np.float32) * (1 - mask_region) + canvas_region.astype(np.float32) * mask_region), 
-                0, 255
-            ).astype(np.uint8)
-        else:
-            logger.warning(f"Text region size mismatch: canvas={canvas_region.shape[:2]}, target={target_region.shape[:2]}, skipping region")
+        if not composite_text_box(img, box, M, (valid_x1, valid_y1, valid_x2, valid_y2)):
+            logger.warning(f"Text region size mismatch for bbox {(valid_x1, valid_y1, valid_x2, valid_y2)}, skipping region")
     else:
         logger.warning(f"Text region completely outside image bounds after adjustment: x={x_adj}, y={y_adj}, w={w_adj}, h={h_adj}, image_size=({img_w}, {img_h}). Text: '{region.translation[:50] if hasattr(region, 'translation') else 'N/A'}...'")
     return img
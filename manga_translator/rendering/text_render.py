@@ -5,6 +5,7 @@ import numpy as np
 import freetype
 import functools
 import logging
+from collections import OrderedDict
 from pathlib import Path
 from typing import Tuple, Optional, List
 from hyphen import Hyphenator
@@ -252,6 +253,15 @@ FALLBACK_FONTS = [
 ]
 FONT_SELECTION: List[freetype.Face] = []
 font_cache = {}
+# 当前主字体的标识（规范化后的路径），用于测量缓存的键；set_font 传入相同路径时不再重复加载
+FONT_KEY = os.path.normcase(os.path.abspath(DEFAULT_FONT)) if FONT is not None else None
+
+# 每个 (字体, 字号, 方向) 一张字符前进量表，只在第一次遇到某字符时加载字形
+_advance_tables = {}
+_MAX_ADVANCE_TABLES = 256
+# calc_horizontal/calc_vertical 的结果缓存，键包含字体标识、字号、方向、限制尺寸和文本
+_layout_cache = OrderedDict()
+_LAYOUT_CACHE_SIZE = 4096
 def get_cached_font(path: str) -> freetype.Face:
     path = path.replace('\\', '/')
     if not font_cache.get(path):
@@ -272,29 +282,30 @@ def update_font_selection():
             logger.error(f"Failed to load fallback font: {font_path} - {e}")
 
 
+def _font_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
 def set_font(path: str):
-    global FONT
-    if not path or not os.path.exists(path):
-        if path:
-            logger.error(f'Could not load font: {path}')
+    global FONT, FONT_KEY
+    requested_key = _font_key(path) if path and os.path.exists(path) else _font_key(DEFAULT_FONT)
+    if FONT is not None and requested_key == FONT_KEY:
+        # 同一字体无需重新加载，也保留字形与测量缓存
+        return
+    # FONT_KEY 记录实际加载成功的字体，加载失败回退到默认字体时不能沿用请求的路径，否则测量缓存会混用
+    font, key = None, None
+    if path and os.path.exists(path):
         try:
-            FONT = freetype.Face(Path(DEFAULT_FONT).open('rb'))
+            font, key = freetype.Face(Path(path).open('rb')), requested_key
         except (freetype.ft_errors.FT_Exception, FileNotFoundError):
-            logger.critical("Default font could not be loaded. Please check your installation.")
-            FONT = None
-        update_font_selection()
-        get_char_glyph.cache_clear()
-        return
-
-    try:
-        FONT = freetype.Face(Path(path).open('rb'))
-    except (freetype.ft_errors.FT_Exception, FileNotFoundError):
-        logger.error(f'Could not load font: {path}')
+            pass
+    if font is None:
+        if path:
+            logger.error(f'Could not load font: {path}')
         try:
-            FONT = freetype.Face(Path(DEFAULT_FONT).open('rb'))
+            font, key = freetype.Face(Path(DEFAULT_FONT).open('rb')), _font_key(DEFAULT_FONT)
         except (freetype.ft_errors.FT_Exception, FileNotFoundError):
             logger.critical("Default font could not be loaded. Please check your installation.")
-            FONT = None
+    FONT, FONT_KEY = font, key
     update_font_selection()
     get_char_glyph.cache_clear()
 
@@ -455,6 +466,10 @@ def calc_horizontal_block_height(font_size: int, content: str) -> int:
         return font_size
 
 def calc_vertical(font_size: int, text: str, max_height: int, config=None):
+    """Cached wrapper of _calc_vertical (the config argument does not affect the layout)."""
+    return _cached_layout(('v', font_size, max_height, text), lambda: _calc_vertical(font_size, text, max_height))
+
+def _calc_vertical(font_size: int, text: str, max_height: int):
     """
     Line breaking logic for vertical text.
     Handles forced newlines (\\n) and is aware of <H> horizontal blocks.
@@ -506,13 +521,7 @@ def calc_vertical(font_size: int, text: str, max_height: int, config=None):
                         continue
                     
                     cdpt_trans, rot_degree = CJK_Compatibility_Forms_translate(cdpt, 1)
-                    ckpt = get_char_glyph(cdpt_trans, font_size, 1)
-                    bitmap = ckpt.bitmap
-
-                    if bitmap.rows * bitmap.width == 0 or len(bitmap.buffer) != bitmap.rows * bitmap.width:
-                        char_offset_y = ckpt.metrics.vertAdvance >> 6 if hasattr(ckpt.metrics, 'vertAdvance') and ckpt.metrics.vertAdvance != 0 else font_size
-                    else:
-                        char_offset_y = ckpt.metrics.vertAdvance >> 6 if hasattr(ckpt.metrics, 'vertAdvance') and ckpt.metrics.vertAdvance != 0 else font_size
+                    char_offset_y = get_char_offset_y(font_size, cdpt_trans)
 
                     should_wrap = current_line_height + char_offset_y > max_height
 
@@ -845,24 +854,72 @@ def select_hyphenator(lang: str):
     except Exception:
         return None
 
+def _get_advance_table(font_size: int, direction: int) -> dict:
+    key = (FONT_KEY, font_size, direction)
+    table = _advance_tables.get(key)
+    if table is None:
+        if len(_advance_tables) >= _MAX_ADVANCE_TABLES:
+            _advance_tables.clear()
+        table = _advance_tables[key] = {}
+    return table
+
 def get_char_offset_x(font_size: int, cdpt: str):
+    table = _get_advance_table(font_size, 0)
+    char_offset_x = table.get(cdpt)
+    if char_offset_x is not None:
+        return char_offset_x
+
     if cdpt == '＿':
         # Return the width of a full-width space for the placeholder
-        return get_char_offset_x(font_size, '　')
-
-    c, rot_degree = CJK_Compatibility_Forms_translate(cdpt, 0)
-    glyph = get_char_glyph(c, font_size, 0)
-    bitmap = glyph.bitmap
-    if bitmap.rows * bitmap.width == 0 or len(bitmap.buffer) != bitmap.rows * bitmap.width:
-        char_offset_x = glyph.advance.x >> 6
+        char_offset_x = get_char_offset_x(font_size, '　')
     else:
-        char_offset_x = glyph.metrics.horiAdvance >> 6
+        c, rot_degree = CJK_Compatibility_Forms_translate(cdpt, 0)
+        glyph = get_char_glyph(c, font_size, 0)
+        bitmap = glyph.bitmap
+        if bitmap.rows * bitmap.width == 0 or len(bitmap.buffer) != bitmap.rows * bitmap.width:
+            char_offset_x = glyph.advance.x >> 6
+        else:
+            char_offset_x = glyph.metrics.horiAdvance >> 6
+    table[cdpt] = char_offset_x
     return char_offset_x
 
+def get_char_offset_y(font_size: int, cdpt: str):
+    """竖排时字符的纵向前进量（cdpt 应为已经过 CJK_Compatibility_Forms_translate 的字符）"""
+    table = _get_advance_table(font_size, 1)
+    char_offset_y = table.get(cdpt)
+    if char_offset_y is None:
+        ckpt = get_char_glyph(cdpt, font_size, 1)
+        char_offset_y = ckpt.metrics.vertAdvance >> 6 if hasattr(ckpt.metrics, 'vertAdvance') and ckpt.metrics.vertAdvance != 0 else font_size
+        table[cdpt] = char_offset_y
+    return char_offset_y
+
 def get_string_width(font_size: int, text: str):
-    return sum([get_char_offset_x(font_size, c) for c in text])
+    table = _get_advance_table(font_size, 0)
+    width = 0
+    for c in text:
+        char_offset_x = table.get(c)
+        width += char_offset_x if char_offset_x is not None else get_char_offset_x(font_size, c)
+    return width
+
+def _cached_layout(key: tuple, compute):
+    """按键缓存排版测量结果，返回副本以免调用方修改缓存内容"""
+    key = (FONT_KEY,) + key
+    cached = _layout_cache.get(key)
+    if cached is None:
+        lines, sizes = compute()
+        cached = (tuple(lines), tuple(sizes))
+        _layout_cache[key] = cached
+        if len(_layout_cache) > _LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    else:
+        _layout_cache.move_to_end(key)
+    return list(cached[0]), list(cached[1])
 
 def calc_horizontal_cjk(font_size: int, text: str, max_width: int) -> Tuple[List[str], List[int]]:
+    """Cached wrapper of _calc_horizontal_cjk."""
+    return _cached_layout(('h_cjk', font_size, max_width, text), lambda: _calc_horizontal_cjk(font_size, text, max_width))
+
+def _calc_horizontal_cjk(font_size: int, text: str, max_width: int) -> Tuple[List[str], List[int]]:
     """
     Line breaking logic for CJK languages with punctuation rules.
     Handles forced newlines (\n) and invisible placeholders (＿).
@@ -916,6 +973,11 @@ def calc_horizontal_cjk(font_size: int, text: str, max_width: int) -> Tuple[List
     return line_text_list, line_width_list
 
 def calc_horizontal(font_size: int, text: str, max_width: int, max_height: int, language: str = 'en_US', hyphenate: bool = True) -> Tuple[List[str], List[int]]:
+    """Cached wrapper of _calc_horizontal."""
+    return _cached_layout(('h', font_size, max_width, max_height, language, hyphenate, text),
+                          lambda: _calc_horizontal(font_size, text, max_width, max_height, language, hyphenate))
+
+def _calc_horizontal(font_size: int, text: str, max_width: int, max_height: int, language: str = 'en_US', hyphenate: bool = True) -> Tuple[List[str], List[int]]:
 
     # 统一处理所有类型的AI换行符
     text = re.sub(r'\s*(\[BR\]|<br>|【BR】)\s*', '\n', text, flags=re.IGNORECASE)
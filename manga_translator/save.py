@@ -1,9 +1,21 @@
+import asyncio
 import os
-from PIL import Image
+import threading
+import time
+import uuid
 from abc import abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+import numpy as np
+from PIL import Image
+
 from .rendering.gimp_render import gimp_render
+from .utils import Context, get_logger
 
-from .utils import Context
+logger = get_logger('save')
 
 
 class FormatNotSupportedException(Exception):
@@ -43,13 +55,36 @@ def save_result(result: Image.Image, dest: str, ctx: Context):
     format_handler.save(result, dest, ctx)
 
 
+def write_image_atomic(result: Union[Image.Image, np.ndarray], dest: str, png_compress_level: Optional[int] = None, **save_kwargs):
+    """
+    先编码到同目录下的临时文件再重命名，避免中断时留下写了一半的图片。
+    png_compress_level 只对 PNG 生效（0-9，越小越快、文件越大）。
+    """
+    if isinstance(result, np.ndarray):
+        result = Image.fromarray(result)
+    ext = os.path.splitext(dest)[1].lower()
+    if 'format' not in save_kwargs:
+        # 临时文件的扩展名无法用来推断格式，这里按目标扩展名确定
+        save_kwargs['format'] = Image.registered_extensions().get(ext)
+    if save_kwargs['format'] == 'PNG' and png_compress_level is not None:
+        save_kwargs.setdefault('compress_level', png_compress_level)
+    tmp_path = os.path.join(os.path.dirname(dest) or '.', f'.{os.path.basename(dest)}.{uuid.uuid4().hex[:8]}.tmp')
+    try:
+        result.save(tmp_path, **save_kwargs)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 # -- Format Implementations
 
 class ImageFormat(ExportFormat):
     SUPPORTED_FORMATS = ['png', 'webp']
 
     def _save(self, result: Image.Image, dest: str, ctx: Context):
-        result.save(dest)
+        write_image_atomic(result, dest, png_compress_level=ctx.png_compress_level)
 
 class JPGFormat(ExportFormat):
     SUPPORTED_FORMATS = ['jpg', 'jpeg']
@@ -57,7 +92,7 @@ class JPGFormat(ExportFormat):
     def _save(self, result: Image.Image, dest: str, ctx: Context):
         result = result.convert('RGB')
         # Certain versions of PIL only support JPEG but not JPG
-        result.save(dest, quality=ctx.save_quality, format='JPEG')
+        write_image_atomic(result, dest, quality=ctx.save_quality, format='JPEG')
 
 class GIMPFormat(ExportFormat):
     SUPPORTED_FORMATS = ['xcf', 'psd', 'pdf']
@@ -74,3 +109,116 @@ class GIMPFormat(ExportFormat):
 # class SvgFormat(TranslationExportFormat):
 #     SUPPORTED_FORMATS = ['svg']
 
+
+
+# -- Background writer
+
+@dataclass
+class WriteRecord:
+    dest: str
+    wait_ms: float
+    write_ms: float
+    error: Optional[BaseException] = None
+
+
+class ResultWriter:
+    """
+    后台结果写入线程池。
+
+    翻译线程只负责提交成品图，PNG/JPEG/WebP 编码（Pillow 编码时会释放 GIL）和写盘在线程池里并行完成。
+    排队数量达到 max_pending 时 submit 会阻塞，避免成品图在内存里无限堆积；
+    flush() 等待所有已提交的写入完成，批处理结束时调用以保证结果全部落盘。
+    写入失败（磁盘已满、路径无效、格式不支持等）记录在 WriteRecord.error 中，flush() 默认抛出第一个错误；
+    KeyboardInterrupt、CancelledError 等非 Exception 的异常不会被吞掉，由 flush() 原样抛出。
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 4, png_compress_level: Optional[int] = None):
+        self.max_workers = max(1, int(max_workers))
+        self.png_compress_level = png_compress_level
+        self._slots = threading.BoundedSemaphore(max(1, int(max_pending)))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: List[Future] = []
+        self._records: deque = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='result-writer')
+        return self._executor
+
+    def submit(self, result: Union[Image.Image, np.ndarray], dest: str, ctx: Optional[Context] = None, **save_kwargs) -> Future:
+        """
+        提交一张结果图。传入 ctx 时按 save_result 的格式处理（包括 xcf/psd/pdf），
+        否则直接按目标扩展名编码，save_kwargs 会传给 PIL 的 save。
+        """
+        self._slots.acquire()
+        return self._submit(result, dest, ctx, save_kwargs)
+
+    async def submit_async(self, result: Union[Image.Image, np.ndarray], dest: str, ctx: Optional[Context] = None, **save_kwargs) -> Future:
+        """submit 的协程版本，队列满时在线程中等待空位，不阻塞事件循环"""
+        if not self._slots.acquire(blocking=False):
+            await asyncio.get_running_loop().run_in_executor(None, self._slots.acquire)
+        return self._submit(result, dest, ctx, save_kwargs)
+
+    def _submit(self, result, dest: str, ctx: Optional[Context], save_kwargs: dict) -> Future:
+        try:
+            future = self._get_executor().submit(self._write, result, dest, ctx, save_kwargs, time.perf_counter())
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def _write(self, result, dest: str, ctx: Optional[Context], save_kwargs: dict, queued_at: float) -> WriteRecord:
+        start = time.perf_counter()
+        error = None
+        try:
+            if ctx is not None:
+                if ctx.png_compress_level is None:
+                    ctx.png_compress_level = self.png_compress_level
+                save_result(result, dest, ctx)
+            else:
+                write_image_atomic(result, dest, png_compress_level=self.png_compress_level, **save_kwargs)
+        except Exception as e:
+            error = e
+            logger.error(f'Failed to save "{dest}": {e}')
+        finally:
+            self._slots.release()
+        record = WriteRecord(dest, (start - queued_at) * 1000, (time.perf_counter() - start) * 1000, error)
+        logger.debug(f'Saved "{os.path.basename(dest)}" in {record.write_ms:.0f}ms (queued {record.wait_ms:.0f}ms)')
+        with self._lock:
+            self._records.append(record)
+        return record
+
+    def flush(self, raise_errors: bool = True) -> List[WriteRecord]:
+        """
+        等待所有已提交的写入完成，返回这批写入的记录（包含失败的）。
+        raise_errors 为 True 时，只要有写入失败就在全部完成后抛出第一个错误。
+        """
+        with self._lock:
+            futures, self._futures = self._futures, []
+        wait(futures)
+        # 非 Exception 的异常（KeyboardInterrupt 等）在这里重新抛出
+        records = [future.result() for future in futures]
+        failed = [r for r in records if r.error is not None]
+        if records:
+            write_ms = [r.write_ms for r in records]
+            logger.info(f'Result writer: {len(records)} file(s), avg {sum(write_ms) / len(write_ms):.0f}ms, '
+                        f'max {max(write_ms):.0f}ms per file' + (f', {len(failed)} failed' if failed else ''))
+        if raise_errors and failed:
+            raise failed[0].error
+        return records
+
+    async def flush_async(self, raise_errors: bool = True) -> List[WriteRecord]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.flush, raise_errors)
+
+    def records(self) -> List[WriteRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def close(self):
+        self.flush(raise_errors=False)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
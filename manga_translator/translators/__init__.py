@@ -24,7 +24,7 @@ from .gemini import GeminiTranslator
 from .openai_hq import OpenAIHighQualityTranslator
 from .gemini_hq import GeminiHighQualityTranslator
 from ..config import Config, Translator, TranslatorConfig, TranslatorChain
-from ..utils import Context
+from ..utils import Context, unload_model_instance
 
 OFFLINE_TRANSLATORS = {
     Translator.offline: SelectiveOfflineTranslator,
@@ -75,6 +75,20 @@ def get_translator(key: Translator, *args, **kwargs) -> CommonTranslator:
 
 prepare_selective_translator(get_translator)
 
+def get_translator_for_target(key: Translator, to_lang: str) -> CommonTranslator:
+    """
+    获取翻译链中某一跳使用的翻译器实例。
+    模型按翻译方向区分的离线翻译器（如 sugoi/jparacrawl）每个目标语言一个常驻实例，
+    这样多目标语言/链式翻译时无需在每一跳之间卸载、重新加载权重。
+    """
+    translator = get_translator(key)
+    if not getattr(translator, '_PER_DIRECTION_MODEL', False):
+        return translator
+    cache_key = (key, to_lang)
+    if cache_key not in translator_cache:
+        translator_cache[cache_key] = TRANSLATORS[key]()
+    return translator_cache[cache_key]
+
 async def prepare(chain: TranslatorChain):
     for key, tgt_lang in chain.chain:
         translator = get_translator(key)
@@ -95,19 +109,18 @@ async def dispatch(chain: TranslatorChain, queries: List[str], config: Config, u
             #if text_lang == lang:
                 #translator = get_translator(key)
             #if translator is None:
-            translator = get_translator(chain.translators[flag])
+            translator = get_translator_for_target(chain.translators[flag], chain.langs[flag])
+            # 已加载时 load 不会重复读取权重，模型在整个会话中常驻，由 unload()/unload_all() 显式释放
             if isinstance(translator, OfflineTranslator):
                 await translator.load('auto', chain.langs[flag], device)
-                pass
             translator.parse_args(config.translator)
             queries = await translator.translate('auto', chain.langs[flag], queries, use_mtpe)
-            await translator.unload(device)
             flag+=1
         return queries
     if args is not None:
         args['translations'] = {}
     for key, tgt_lang in chain.chain:
-        translator = get_translator(key)
+        translator = get_translator_for_target(key, tgt_lang)
         if isinstance(translator, OfflineTranslator):
             await translator.load('auto', tgt_lang, device)
         translator.parse_args(config.translator)
@@ -184,4 +197,11 @@ LANGDETECT_MAP = {
 }
 
 async def unload(key: Translator):
-    translator_cache.pop(key, None)
\ No newline at end of file
+    for cache_key in list(translator_cache):
+        if cache_key == key or (isinstance(cache_key, tuple) and cache_key[0] == key):
+            await unload_model_instance(translator_cache.pop(cache_key, None))
+
+async def unload_all():
+    """会话结束时显式释放所有常驻的翻译模型"""
+    for cache_key in list(translator_cache):
+        await unload_model_instance(translator_cache.pop(cache_key, None))
\ No newline at end of file
@@ -1,7 +1,7 @@
 import re
 import time
 import asyncio
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 from abc import abstractmethod
 
 from ..utils import InfererModule, ModelWrapper, repeating_sequence, is_valuable_text
@@ -146,8 +146,9 @@ class CommonTranslator(InfererModule):
         self._SPLIT_THRESHOLD = 2  # 重试N次后触发分割
         self._global_attempt_count = 0  # 全局尝试计数器
         self._max_total_attempts = -1  # 全局最大尝试次数
+        self._salvage_partial_results = True  # 批次部分失败时保留有效的行，只重新请求其余的行
 
-    def _build_user_prompt_for_texts(self, texts: List[str], ctx=None, prev_context: str = "") -> str:
+    def _build_user_prompt_for_texts(self, texts: List[str], ctx=None, prev_context: str = "", region_indices: List[int] = None) -> str:
         """
         统一的用户提示词构建方法（纯文本翻译）
         适用于 openai.py 和 gemini.py
@@ -156,6 +157,7 @@ class CommonTranslator(InfererModule):
             texts: 要翻译的文本列表
             ctx: 上下文对象（可选）
             prev_context: 历史上下文（可选）
+            region_indices: texts 中每条对应的 ctx.text_regions 索引（可选，只重新请求部分文本时使用）
 
         Returns:
             构建好的用户提示词字符串
@@ -180,8 +182,9 @@ class CommonTranslator(InfererModule):
         for i, text in enumerate(texts):
             text_to_translate = text.replace('\n', ' ').replace('\ufffd', '')
             # 只有开启AI断句时才添加区域信息
-            if enable_ai_break and ctx and hasattr(ctx, 'text_regions') and ctx.text_regions and i < len(ctx.text_regions):
-                region = ctx.text_regions[i]
+            region_idx = region_indices[i] if region_indices and i < len(region_indices) else i
+            if enable_ai_break and ctx and hasattr(ctx, 'text_regions') and ctx.text_regions and region_idx < len(ctx.text_regions):
+                region = ctx.text_regions[region_idx]
                 region_count = len(region.lines) if hasattr(region, 'lines') else 1
                 prompt += f"{i+1}. [Original regions: {region_count}] {text_to_translate}\n"
             else:
@@ -393,14 +396,121 @@ class CommonTranslator(InfererModule):
                 return False, f"Detected potential merged translation at position {i+1}"
 
         # 4. 检查可疑符号（模型幻觉）
-        SUSPICIOUS_SYMBOLS = ["ହ", "ି", "ഹ"]
-        for symbol in SUSPICIOUS_SYMBOLS:
+        for symbol in self._SUSPICIOUS_SYMBOLS:
             for translation in translations:
                 if symbol in translation:
                     return False, f"Suspicious symbol '{symbol}' detected in translation"
 
         return True, ""
 
+    # --- 部分结果保留 ---
+
+    _SALVAGE_CONTEXT_RADIUS = 2  # 重新请求时附带的前后已翻译行数
+    _SUSPICIOUS_SYMBOLS = ["ହ", "ି", "ഹ"]
+
+    @staticmethod
+    def _parse_numbered_response(result_text: str, count: int) -> Dict[int, str]:
+        """
+        按行首编号（"3. xxx"）解析回复，返回 {0 起的索引: 译文}。
+        任何一行没有编号、编号越界或重复时无法对齐，返回空字典。
+        """
+        numbered = {}
+        for line in result_text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            match = re.match(r'^(\d+)\.\s*(.*)$', line)
+            if not match:
+                return {}
+            index = int(match.group(1)) - 1
+            if index < 0 or index >= count or index in numbered:
+                return {}
+            numbered[index] = match.group(2).replace('\\n', '\n').replace('↵', '\n')
+        return numbered
+
+    def _invalid_translation_indices(self, queries: List[str], translations: Dict[int, str], ctx=None,
+                                     region_indices: List[int] = None, split_level: int = 0) -> List[int]:
+        """逐行检查（与 _validate_translation_quality / _validate_br_markers 的规则一致），返回不合格的索引"""
+        import string
+
+        check_br = split_level < 3 and ctx is not None and hasattr(ctx, 'config') and hasattr(ctx.config, 'render') \
+            and getattr(ctx.config.render, 'check_br_and_retry', False) and getattr(ctx.config.render, 'disable_auto_wrap', False)
+        invalid = []
+        for i, translation in translations.items():
+            source = queries[i]
+            if source.strip() and not translation.strip():
+                invalid.append(i)
+                continue
+            is_source_simple = all(char in string.punctuation or char.isspace() for char in source)
+            is_translation_simple = all(char in string.punctuation or char.isspace() for char in translation)
+            if is_translation_simple and not is_source_simple:
+                invalid.append(i)
+                continue
+            if any(symbol in translation for symbol in self._SUSPICIOUS_SYMBOLS):
+                invalid.append(i)
+                continue
+            if check_br and getattr(ctx, 'text_regions', None):
+                region_idx = region_indices[i] if region_indices and i < len(region_indices) else i
+                if region_idx < len(ctx.text_regions):
+                    region = ctx.text_regions[region_idx]
+                    region_count = len(region.lines) if hasattr(region, 'lines') else 1
+                    if region_count >= 2 and not re.search(r'(\[BR\]|【BR】|<br>)', translation, flags=re.IGNORECASE):
+                        invalid.append(i)
+        return invalid
+
+    def _salvageable_translations(self, queries: List[str], translations: List[str], result_text: str = None, ctx=None,
+                                  region_indices: List[int] = None, split_level: int = 0) -> Dict[int, str]:
+        """
+        批次校验失败时找出可以保留的行。行数一致时按位置对齐，行数不一致时只能按行首编号对齐。
+        返回 {索引: 译文}；没有可保留的行，或逐行检查找不出问题（只能整批重试）时返回空字典。
+        """
+        if not self._salvage_partial_results or len(queries) <= 1:
+            return {}
+        if len(translations) == len(queries):
+            candidates = dict(enumerate(translations))
+        elif result_text:
+            candidates = self._parse_numbered_response(result_text, len(queries))
+            # 缺失编号旁边的行可能合并了缺失行的译文（如 "2. <2和3的译文>" 而没有 "3."），不能保留
+            missing = set(range(len(queries))) - set(candidates)
+            candidates = {i: t for i, t in candidates.items() if i - 1 not in missing and i + 1 not in missing}
+        else:
+            candidates = {}
+        if not candidates:
+            return {}
+        invalid = set(self._invalid_translation_indices(queries, candidates, ctx, region_indices, split_level))
+        kept = {i: t for i, t in candidates.items() if i not in invalid}
+        if not kept or (len(kept) == len(queries) and len(translations) == len(queries)):
+            return {}
+        return kept
+
+    def _build_salvage_context(self, queries: List[str], kept: Dict[int, str], missing: List[int]) -> str:
+        """重新请求时附带缺失行前后已经翻译好的行，保证语气和用词连贯"""
+        neighbours = sorted({j for i in missing
+                             for j in range(i - self._SALVAGE_CONTEXT_RADIUS, i + self._SALVAGE_CONTEXT_RADIUS + 1)
+                             if j in kept})
+        if not neighbours:
+            return ""
+        lines = [f"{queries[j].replace(chr(10), ' ')} => {kept[j]}" for j in neighbours]
+        return ("Already translated neighbouring text regions (for context only, do NOT include them in your output):\n"
+                + "\n".join(lines))
+
+    async def _retry_missing_translations(self, translator_func, queries: List[str], kept: Dict[int, str], split_level: int = 0,
+                                          region_indices: List[int] = None, **kwargs) -> List[str]:
+        """保留 kept 中的译文，只把其余的行（带上前后文）重新交给 translator_func 翻译"""
+        missing = [i for i in range(len(queries)) if i not in kept]
+        translations = [kept.get(i, '') for i in range(len(queries))]
+        if not missing:
+            return translations
+        self.logger.warning(f"[部分保留] 保留 {len(kept)}/{len(queries)} 条有效译文，只重新请求 {len(missing)} 条: {[i + 1 for i in missing]}")
+        if region_indices is None:
+            region_indices = list(range(len(queries)))
+        kwargs['salvage_context'] = self._build_salvage_context(queries, kept, missing)
+        kwargs['region_indices'] = [region_indices[i] for i in missing]
+        retried = await self._translate_with_split(translator_func, [queries[i] for i in missing], split_level, **kwargs)
+        for i, translation in zip(missing, retried):
+            translations[i] = translation
+        return translations
+
     def _reset_global_attempt_count(self):
         """重置全局尝试计数器（每次新的翻译任务开始时调用）"""
         self._global_attempt_count = 0
@@ -472,18 +582,22 @@ class CommonTranslator(InfererModule):
 
                 self.logger.info(f"Split: left={len(left_texts)}, right={len(right_texts)}, global_attempts={self._global_attempt_count}/{self._max_total_attempts}")
 
-                # 并发翻译左右两部分（kwargs保持完整传递）
+                # 并发翻译左右两部分（kwargs保持完整传递，region_indices 随文本一起分割）
+                left_kwargs, right_kwargs = kwargs, kwargs
+                if kwargs.get('region_indices'):
+                    left_kwargs = {**kwargs, 'region_indices': kwargs['region_indices'][:mid]}
+                    right_kwargs = {**kwargs, 'region_indices': kwargs['region_indices'][mid:]}
                 try:
                     left_translations, right_translations = await asyncio.gather(
-                        self._translate_with_split(translator_func, left_texts, split_level + 1, **kwargs),
-                        self._translate_with_split(translator_func, right_texts, split_level + 1, **kwargs),
+                        self._translate_with_split(translator_func, left_texts, split_level + 1, **left_kwargs),
+                        self._translate_with_split(translator_func, right_texts, split_level + 1, **right_kwargs),
                         return_exceptions=False
                     )
                 except Exception as split_error:
                     # 如果并发失败，回退到串行处理
                     self.logger.warning(f"Concurrent split failed, falling back to sequential: {split_error}")
-                    left_translations = await self._translate_with_split(translator_func, left_texts, split_level + 1, **kwargs)
-                    right_translations = await self._translate_with_split(translator_func, right_texts, split_level + 1, **kwargs)
+                    left_translations = await self._translate_with_split(translator_func, left_texts, split_level + 1, **left_kwargs)
+                    right_translations = await self._translate_with_split(translator_func, right_texts, split_level + 1, **right_kwargs)
 
                 # 合并结果
                 return left_translations + right_translations
@@ -702,6 +816,8 @@ class CommonTranslator(InfererModule):
 
 class OfflineTranslator(CommonTranslator, ModelWrapper):
     _MODEL_SUB_DIR = 'translators'
+    # 为 True 时每个翻译方向是单独的模型，链式翻译会为每个目标语言保留一个实例
+    _PER_DIRECTION_MODEL = False
 
     async def _translate(self, *args, **kwargs):
         return await self.infer(*args, **kwargs)
@@ -724,5 +840,5 @@ class OfflineTranslator(CommonTranslator, ModelWrapper):
     async def _load(self, from_lang: str, to_lang: str, device: str):
         pass
 
-    async def unload(self, device: str):
+    async def unload(self, device: str = None):
         return await super().unload()
@@ -3,10 +3,10 @@ import re
 import asyncio
 import json
 from typing import List, Dict, Any
-import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 from .common import CommonTranslator, VALID_LANGUAGES
+from .gemini_async import GeminiAsyncClient, reserve_request_slot, retry_delay
 from .keys import GEMINI_API_KEY
 from ..utils import Context
 
@@ -95,14 +95,7 @@ class GeminiTranslator(CommonTranslator):
     def _setup_client(self):
         """设置Gemini客户端"""
         if not self.client and self.api_key:
-            client_options = {"api_endpoint": self.base_url} if self.base_url else None
-
-            genai.configure(
-                api_key=self.api_key,
-                transport='rest',  # 支持自定义base_url
-                client_options=client_options
-            )
-            
+            # 原生异步 REST 客户端，支持自定义 base_url，并发请求共享连接池
             # Apply different configs for different API types
             # 判断是否为官方 API：未设置 base_url 或 base_url 是官方地址
             is_official_api = not self.base_url or self.base_url == 'https://generativelanguage.googleapis.com' or self.base_url.startswith('https://generativelanguage.googleapis.com')
@@ -134,7 +127,7 @@ class GeminiTranslator(CommonTranslator):
                 }
                 self.logger.info(f"检测到第三方API，使用简化配置（不发送安全设置）。Base URL: {self.base_url}")
 
-            self.client = genai.GenerativeModel(**model_args)
+            self.client = GeminiAsyncClient(api_key=self.api_key, base_url=self.base_url, **model_args)
     
     def _build_system_prompt(self, source_lang: str, target_lang: str, custom_prompt_json: Dict[str, Any] = None, line_break_prompt_json: Dict[str, Any] = None) -> str:
         """构建系统提示词"""
@@ -231,12 +224,16 @@ This is an incorrect response because it includes extra text and explanations.
         final_prompt += base_prompt
         return final_prompt
 
-    def _build_user_prompt(self, texts: List[str], ctx: Any) -> str:
+    def _build_user_prompt(self, texts: List[str], ctx: Any, salvage_context: str = "", region_indices: List[int] = None) -> str:
         """构建用户提示词（纯文本版）- 使用统一方法"""
-        return self._build_user_prompt_for_texts(texts, ctx, self.prev_context)
-
-    async def _translate_batch(self, texts: List[str], source_lang: str, target_lang: str, custom_prompt_json: Dict[str, Any] = None, line_break_prompt_json: Dict[str, Any] = None, ctx: Any = None, split_level: int = 0) -> List[str]:
-        """批量翻译方法（纯文本）"""
+        prev_context = self.prev_context
+        if salvage_context:
+            prev_context = f"{prev_context}\n\n{salvage_context}" if prev_context else salvage_context
+        return self._build_user_prompt_for_texts(texts, ctx, prev_context, region_indices=region_indices)
+
+    async def _translate_batch(self, texts: List[str], source_lang: str, target_lang: str, custom_prompt_json: Dict[str, Any] = None, line_break_prompt_json: Dict[str, Any] = None, ctx: Any = None, split_level: int = 0,
+                               salvage_context: str = "", region_indices: List[int] = None) -> List[str]:
+        """批量翻译方法（纯文本）；salvage_context/region_indices 在只重新请求部分行时使用"""
         if not texts:
             return []
         
@@ -255,7 +252,10 @@ This is an incorrect response because it includes extra text and explanations.
 
         # 添加系统提示词和用户提示词
         system_prompt = self._build_system_prompt(source_lang, target_lang, custom_prompt_json=custom_prompt_json, line_break_prompt_json=line_break_prompt_json)
-        user_prompt = self._build_user_prompt(texts, ctx)
+        user_prompt = self._build_user_prompt(texts, ctx, salvage_context, region_indices)
+        # 部分行校验失败时，只重新请求这些行
+        salvage_kwargs = dict(source_lang=source_lang, target_lang=target_lang, custom_prompt_json=custom_prompt_json,
+                              line_break_prompt_json=line_break_prompt_json, ctx=ctx)
         
         combined_prompt = system_prompt + "\n\n" + user_prompt
         
@@ -275,9 +275,6 @@ This is an incorrect response because it includes extra text and explanations.
         else:
             request_args["safety_settings"] = self.safety_settings
 
-        def generate_content_with_logging(**kwargs):
-            return self.client.generate_content(**kwargs)
-
         while is_infinite or attempt < max_retries:
             # 检查全局尝试次数
             if not self._increment_global_attempt():
@@ -293,20 +290,13 @@ This is an incorrect response because it includes extra text and explanations.
                 raise self.SplitException(local_attempt, texts)
 
             try:
-                # RPM限制
+                # RPM限制：预约发送时间，并发请求各自等待，不互相阻塞
                 if self._MAX_REQUESTS_PER_MINUTE > 0:
-                    import time
-                    now = time.time()
-                    delay = 60.0 / self._MAX_REQUESTS_PER_MINUTE
-                    elapsed = now - GeminiTranslator._GLOBAL_LAST_REQUEST_TS[self._last_request_ts_key]
-                    if elapsed < delay:
-                        await asyncio.sleep(delay - elapsed)
-                    GeminiTranslator._GLOBAL_LAST_REQUEST_TS[self._last_request_ts_key] = time.time()
+                    delay = reserve_request_slot(GeminiTranslator._GLOBAL_LAST_REQUEST_TS, self._last_request_ts_key, self._MAX_REQUESTS_PER_MINUTE)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
                 
-                response = await asyncio.to_thread(
-                    generate_content_with_logging,
-                    **request_args
-                )
+                response = await self.client.generate_content(**request_args)
 
                 # 检查finish_reason，只有成功(1)才继续，其他都重试
                 if hasattr(response, 'candidates') and response.candidates:
@@ -333,7 +323,7 @@ This is an incorrect response because it includes extra text and explanations.
                             if not is_infinite and attempt >= max_retries:
                                 self.logger.error(f"Gemini翻译在多次重试后仍失败: {reason_desc}")
                                 break
-                            await asyncio.sleep(1)
+                            await asyncio.sleep(retry_delay(local_attempt))
                             continue
 
                 # 尝试访问 .text 属性，如果API因安全原因等返回空内容，这里会触发异常
@@ -358,6 +348,9 @@ This is an incorrect response because it includes extra text and explanations.
                 
                 # Strict validation: must match input count
                 if len(translations) != len(texts):
+                    kept = self._salvageable_translations(texts, translations, result_text, ctx, region_indices, split_level)
+                    if kept:
+                        return await self._retry_missing_translations(self._translate_batch, texts, kept, split_level, region_indices, **salvage_kwargs)
                     attempt += 1
                     log_attempt = f"{attempt}/{max_retries}" if not is_infinite else f"Attempt {attempt}"
                     self.logger.warning(f"[{log_attempt}] Translation count mismatch: expected {len(texts)}, got {len(translations)}. Retrying...")
@@ -373,6 +366,9 @@ This is an incorrect response because it includes extra text and explanations.
                 # 质量验证：检查空翻译、合并翻译、可疑符号等
                 is_valid, error_msg = self._validate_translation_quality(texts, translations)
                 if not is_valid:
+                    kept = self._salvageable_translations(texts, translations, result_text, ctx, region_indices, split_level)
+                    if kept:
+                        return await self._retry_missing_translations(self._translate_batch, texts, kept, split_level, region_indices, **salvage_kwargs)
                     attempt += 1
                     log_attempt = f"{attempt}/{max_retries}" if not is_infinite else f"Attempt {attempt}"
                     self.logger.warning(f"[{log_attempt}] Quality check failed: {error_msg}. Retrying...")
@@ -390,7 +386,10 @@ This is an incorrect response because it includes extra text and explanations.
                 self.logger.info("---------------------------")
 
                 # BR检查：检查翻译结果是否包含必要的[BR]标记
-                if not self._validate_br_markers(translations, queries=texts, ctx=ctx):
+                if not self._validate_br_markers(translations, queries=texts, ctx=ctx, batch_indices=region_indices):
+                    kept = self._salvageable_translations(texts, translations, result_text, ctx, region_indices, split_level)
+                    if kept:
+                        return await self._retry_missing_translations(self._translate_batch, texts, kept, split_level, region_indices, **salvage_kwargs)
                     attempt += 1
                     log_attempt = f"{attempt}/{max_retries}" if not is_infinite else f"Attempt {attempt}"
                     self.logger.warning(f"[{log_attempt}] BR markers missing, retrying...")
@@ -423,7 +422,7 @@ This is an incorrect response because it includes extra text and explanations.
                     self.logger.error("Gemini翻译在多次重试后仍然失败。即将终止程序。")
                     raise e
                 
-                await asyncio.sleep(1)
+                await asyncio.sleep(retry_delay(local_attempt, e))
         
         return texts
 
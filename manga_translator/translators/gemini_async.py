@@ -0,0 +1,186 @@
+"""
+Gemini generateContent 的原生异步 REST 客户端
+
+google.generativeai 在 rest 传输（自定义 base_url 需要）下只有同步接口，以前通过 asyncio.to_thread 调用，
+并发翻译受默认线程池大小限制，每个请求都要切换线程。这里直接用 httpx.AsyncClient 请求 REST 接口，
+同一事件循环内的所有请求共享连接池（keep-alive），不占用额外线程。
+
+返回的 GeminiResponse 提供与 SDK 响应相同的 .candidates[0].finish_reason 和 .text，调用方的判断逻辑不变。
+"""
+import asyncio
+import base64
+import random
+import time
+import weakref
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Union
+
+import httpx
+from PIL import Image
+
+# 与 SDK 的 FinishReason 枚举取值一致
+FINISH_REASONS = {
+    'FINISH_REASON_UNSPECIFIED': 0,
+    'STOP': 1,
+    'MAX_TOKENS': 2,
+    'SAFETY': 3,
+    'RECITATION': 4,
+    'OTHER': 5,
+    'BLOCKLIST': 6,
+    'PROHIBITED_CONTENT': 7,
+    'SPII': 8,
+    'MALFORMED_FUNCTION_CALL': 9,
+}
+
+_GENERATION_CONFIG_KEYS = {
+    'temperature': 'temperature',
+    'top_p': 'topP',
+    'top_k': 'topK',
+    'max_output_tokens': 'maxOutputTokens',
+    'response_mime_type': 'responseMimeType',
+}
+
+# 每个事件循环一个连接池
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = weakref.WeakKeyDictionary()
+
+
+def _shared_http_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(300.0, connect=30.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+        )
+        _clients[loop] = client
+    return client
+
+
+class GeminiAPIError(Exception):
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(f'Gemini API error {status_code}: {message}')
+
+
+@dataclass
+class GeminiCandidate:
+    finish_reason: int
+    text: str
+
+
+class GeminiResponse:
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self.candidates: List[GeminiCandidate] = []
+        for candidate in payload.get('candidates') or []:
+            parts = (candidate.get('content') or {}).get('parts') or []
+            text = ''.join(part.get('text', '') for part in parts)
+            reason = candidate.get('finishReason', 'FINISH_REASON_UNSPECIFIED')
+            self.candidates.append(GeminiCandidate(FINISH_REASONS.get(reason, 0) if isinstance(reason, str) else int(reason), text))
+
+    @property
+    def text(self) -> str:
+        """与 SDK 一致：没有可用文本时抛出 ValueError"""
+        if not self.candidates or not self.candidates[0].text:
+            feedback = self.payload.get('promptFeedback')
+            raise ValueError(f'Gemini response contains no text (finish_reason='
+                             f'{self.candidates[0].finish_reason if self.candidates else None}, prompt_feedback={feedback})')
+        return self.candidates[0].text
+
+
+def _enum_name(value) -> str:
+    return getattr(value, 'name', None) or str(value)
+
+
+def _encode_image(image: Image.Image) -> Dict[str, Any]:
+    buffer = BytesIO()
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(buffer, format='JPEG', quality=95)
+    return {'inline_data': {'mime_type': 'image/jpeg', 'data': base64.b64encode(buffer.getvalue()).decode('ascii')}}
+
+
+class GeminiAsyncClient:
+    """
+    generation_config 使用 SDK 的下划线键名（temperature、max_output_tokens 等），
+    safety_settings 可以是 SDK 的枚举，也可以是字符串。
+    """
+
+    def __init__(self, api_key: str, base_url: str, model_name: str, generation_config: Dict[str, Any] = None,
+                 safety_settings: List[Dict[str, Any]] = None, api_version: str = 'v1beta'):
+        self.api_key = api_key
+        self.base_url = (base_url or 'https://generativelanguage.googleapis.com').rstrip('/')
+        self.model_name = model_name[len('models/'):] if model_name.startswith('models/') else model_name
+        self.generation_config = generation_config or {}
+        self.safety_settings = safety_settings
+        self.api_version = api_version
+
+    @property
+    def url(self) -> str:
+        return f'{self.base_url}/{self.api_version}/models/{self.model_name}:generateContent'
+
+    @staticmethod
+    def _parts(contents: Union[str, List[Any]]) -> List[Dict[str, Any]]:
+        if isinstance(contents, str):
+            contents = [contents]
+        parts = []
+        for item in contents:
+            if isinstance(item, Image.Image):
+                parts.append(_encode_image(item))
+            else:
+                parts.append({'text': str(item)})
+        return parts
+
+    def _body(self, parts: List[Dict[str, Any]], safety_settings) -> Dict[str, Any]:
+        body: Dict[str, Any] = {'contents': [{'role': 'user', 'parts': parts}]}
+        config = {_GENERATION_CONFIG_KEYS.get(k, k): v for k, v in self.generation_config.items()}
+        if config:
+            body['generationConfig'] = config
+        safety_settings = safety_settings if safety_settings is not None else self.safety_settings
+        if safety_settings:
+            body['safetySettings'] = [{'category': _enum_name(s['category']), 'threshold': _enum_name(s['threshold'])}
+                                      for s in safety_settings]
+        return body
+
+    async def generate_content(self, contents: Union[str, List[Any]], safety_settings: List[Dict[str, Any]] = None) -> GeminiResponse:
+        if isinstance(contents, list) and any(isinstance(item, Image.Image) for item in contents):
+            # 图片编码是 CPU 工作，放到线程里
+            parts = await asyncio.to_thread(self._parts, contents)
+        else:
+            parts = self._parts(contents)
+        response = await _shared_http_client().post(
+            self.url,
+            json=self._body(parts, safety_settings),
+            headers={'x-goog-api-key': self.api_key},
+        )
+        if response.status_code != 200:
+            retry_after = response.headers.get('retry-after')
+            try:
+                message = response.json().get('error', {}).get('message', response.text)
+            except ValueError:
+                message = response.text
+            raise GeminiAPIError(response.status_code, message[:500], float(retry_after) if retry_after and retry_after.isdigit() else None)
+        return GeminiResponse(response.json())
+
+
+def reserve_request_slot(slots: Dict[str, float], key: str, max_requests_per_minute: int) -> float:
+    """
+    按 RPM 为下一个请求预约发送时间，返回需要等待的秒数。
+    预约是同步完成的（事件循环内不会被打断），并发请求会依次排到间隔之后，
+    但各自等待、各自发送，请求之间不会互相阻塞。
+    """
+    interval = 60.0 / max_requests_per_minute
+    now = time.time()
+    slot = max(now, slots.get(key, 0) + interval)
+    slots[key] = slot
+    return slot - now
+
+
+def retry_delay(attempt: int, error: BaseException = None, base: float = 1.0, cap: float = 30.0) -> float:
+    """指数退避加随机抖动；服务端给出 Retry-After 时优先使用"""
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after:
+        return min(cap, retry_after)
+    return min(cap, base * (2 ** max(0, attempt - 1))) * random.uniform(0.5, 1.0)
@@ -6,10 +6,10 @@ import json
 from io import BytesIO
 from typing import List, Dict, Any
 from PIL import Image
-import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 from .common import CommonTranslator, VALID_LANGUAGES
+from .gemini_async import GeminiAsyncClient, reserve_request_slot, retry_delay
 from .keys import GEMINI_API_KEY
 from ..utils import Context
 
@@ -135,14 +135,7 @@ class GeminiHighQualityTranslator(CommonTranslator):
     def _setup_client(self):
         """设置Gemini客户端"""
         if not self.client and self.api_key:
-            client_options = {"api_endpoint": self.base_url} if self.base_url else None
-
-            genai.configure(
-                api_key=self.api_key,
-                transport='rest',  # 支持自定义base_url
-                client_options=client_options
-            )
-            
+            # 原生异步 REST 客户端，支持自定义 base_url，并发请求共享连接池
             # Apply different configs for different API types
             # 判断是否为官方 API：未设置 base_url 或 base_url 是官方地址
             is_official_api = not self.base_url or self.base_url == 'https://generativelanguage.googleapis.com' or self.base_url.startswith('https://generativelanguage.googleapis.com')
@@ -174,7 +167,7 @@ class GeminiHighQualityTranslator(CommonTranslator):
                 }
                 self.logger.info(f"检测到第三方API，使用简化配置（不发送安全设置）。Base URL: {self.base_url}")
 
-            self.client = genai.GenerativeModel(**model_args)
+            self.client = GeminiAsyncClient(api_key=self.api_key, base_url=self.base_url, **model_args)
     
 
     
@@ -288,21 +281,6 @@ class GeminiHighQualityTranslator(CommonTranslator):
         else:
             request_args["safety_settings"] = self.safety_settings
 
-        def generate_content_with_logging(**kwargs):
-            # 打印请求体（去除图片数据）- 已注释以减少日志输出
-            # log_kwargs = kwargs.copy()
-            # if 'contents' in log_kwargs and isinstance(log_kwargs['contents'], list):
-            #     serializable_contents = []
-            #     for item in log_kwargs['contents']:
-            #         if isinstance(item, Image.Image):
-            #             serializable_contents.append(f"<PIL.Image.Image size={item.size} mode={item.mode}>")
-            #         else:
-            #             serializable_contents.append(item)
-            #     log_kwargs['contents'] = serializable_contents
-            # 
-            # self.logger.info(f"--- Gemini Request Body ---\n{json.dumps(log_kwargs, indent=2, ensure_ascii=False)}\n---------------------------")
-            return self.client.generate_content(**kwargs)
-
         while is_infinite or attempt < max_retries:
             # 检查全局尝试次数
             if not self._increment_global_attempt():
@@ -318,21 +296,13 @@ class GeminiHighQualityTranslator(CommonTranslator):
                 raise self.SplitException(local_attempt, texts)
 
             try:
-                # RPM限制
+                # RPM限制：预约发送时间，并发请求各自等待，不互相阻塞
                 if self._MAX_REQUESTS_PER_MINUTE > 0:
-                    import time
-                    now = time.time()
-                    delay = 60.0 / self._MAX_REQUESTS_PER_MINUTE
-                    elapsed = now - GeminiHighQualityTranslator._GLOBAL_LAST_REQUEST_TS[self._last_request_ts_key]
-                    if elapsed < delay:
-                        await asyncio.sleep(delay - elapsed)
-                    # 在请求前更新时间戳,确保下次计算的是从这次请求开始的间隔
-                    GeminiHighQualityTranslator._GLOBAL_LAST_REQUEST_TS[self._last_request_ts_key] = time.time()
+                    delay = reserve_request_slot(GeminiHighQualityTranslator._GLOBAL_LAST_REQUEST_TS, self._last_request_ts_key, self._MAX_REQUESTS_PER_MINUTE)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
                 
-                response = await asyncio.to_thread(
-                    generate_content_with_logging,
-                    **request_args
-                )
+                response = await self.client.generate_content(**request_args)
 
                 # 检查finish_reason，只有成功(1)才继续，其他都重试
                 if hasattr(response, 'candidates') and response.candidates:
@@ -359,7 +329,7 @@ class GeminiHighQualityTranslator(CommonTranslator):
                             if not is_infinite and attempt >= max_retries:
                                 self.logger.error(f"Gemini翻译在多次重试后仍失败: {reason_desc}")
                                 break
-                            await asyncio.sleep(1)
+                            await asyncio.sleep(retry_delay(local_attempt))
                             continue
 
                 # 尝试访问 .text 属性，如果API因安全原因等返回空内容，这里会触发异常
@@ -466,7 +436,7 @@ class GeminiHighQualityTranslator(CommonTranslator):
                     self.logger.error("Gemini翻译在多次重试后仍然失败。即将终止程序。")
                     raise e
                 
-                await asyncio.sleep(1) # Wait before retrying
+                await asyncio.sleep(retry_delay(local_attempt, e)) # 指数退避，429/503 时按 Retry-After 等待
         
         return texts # Fallback in case loop finishes unexpectedly
 
@@ -530,34 +500,24 @@ class GeminiHighQualityTranslator(CommonTranslator):
             else:
                 request_args["safety_settings"] = self.safety_settings
 
-            def generate_content_with_logging(**kwargs):
-                log_kwargs = kwargs.copy()
-                if 'contents' in log_kwargs and isinstance(log_kwargs['contents'], list):
-                    serializable_contents = []
-                    for item in log_kwargs['contents']:
-                        if isinstance(item, Image.Image):
-                            serializable_contents.append(f"<PIL.Image.Image size={item.size} mode={item.mode}>")
-                        else:
-                            serializable_contents.append(item)
-                    log_kwargs['contents'] = serializable_contents
-                self.logger.info(f"--- Gemini Fallback Request Body ---\n{json.dumps(log_kwargs, indent=2, ensure_ascii=False)}\n------------------------------------")
-                return self.client.generate_content(**kwargs)
-
-            # RPM限制
+            log_kwargs = request_args.copy()
+            if 'contents' in log_kwargs and isinstance(log_kwargs['contents'], list):
+                serializable_contents = []
+                for item in log_kwargs['contents']:
+                    if isinstance(item, Image.Image):
+                        serializable_contents.append(f"<PIL.Image.Image size={item.size} mode={item.mode}>")
+                    else:
+                        serializable_contents.append(item)
+                log_kwargs['contents'] = serializable_contents
+            self.logger.info(f"--- Gemini Fallback Request Body ---\n{json.dumps(log_kwargs, indent=2, ensure_ascii=False, default=str)}\n------------------------------------")
+
+            # RPM限制：预约发送时间，并发请求各自等待，不互相阻塞
             if self._MAX_REQUESTS_PER_MINUTE > 0:
-                import time
-                now = time.time()
-                delay = 60.0 / self._MAX_REQUESTS_PER_MINUTE
-                elapsed = now - GeminiHighQualityTranslator._GLOBAL_LAST_REQUEST_TS[self._last_request_ts_key]
-                if elapsed < delay:
-                    await asyncio.sleep(delay - elapsed)
-                # 在请求前更新时间戳,确保下次计算的是从这次请求开始的间隔
-                GeminiHighQualityTranslator._GLOBAL_LAST_REQUEST_TS[self._last_request_ts_key] = time.time()
+                delay = reserve_request_slot(GeminiHighQualityTranslator._GLOBAL_LAST_REQUEST_TS, self._last_request_ts_key, self._MAX_REQUESTS_PER_MINUTE)
+                if delay > 0:
+                    await asyncio.sleep(delay)
             
-            response = await asyncio.to_thread(
-                generate_content_with_logging,
-                **request_args
-            )
+            response = await self.client.generate_content(**request_args)
             
             if response and response.text:
                 result = response.text.strip()
@@ -176,12 +176,16 @@ This is an incorrect response because it includes extra text and explanations.
         final_prompt += base_prompt
         return final_prompt
 
-    def _build_user_prompt(self, texts: List[str], ctx: Any) -> str:
+    def _build_user_prompt(self, texts: List[str], ctx: Any, salvage_context: str = "", region_indices: List[int] = None) -> str:
         """构建用户提示词（纯文本版）- 使用统一方法"""
-        return self._build_user_prompt_for_texts(texts, ctx, self.prev_context)
-
-    async def _translate_batch(self, texts: List[str], source_lang: str, target_lang: str, custom_prompt_json: Dict[str, Any] = None, line_break_prompt_json: Dict[str, Any] = None, ctx: Any = None, split_level: int = 0) -> List[str]:
-        """批量翻译方法（纯文本）"""
+        prev_context = self.prev_context
+        if salvage_context:
+            prev_context = f"{prev_context}\n\n{salvage_context}" if prev_context else salvage_context
+        return self._build_user_prompt_for_texts(texts, ctx, prev_context, region_indices=region_indices)
+
+    async def _translate_batch(self, texts: List[str], source_lang: str, target_lang: str, custom_prompt_json: Dict[str, Any] = None, line_break_prompt_json: Dict[str, Any] = None, ctx: Any = None, split_level: int = 0,
+                               salvage_context: str = "", region_indices: List[int] = None) -> List[str]:
+        """批量翻译方法（纯文本）；salvage_context/region_indices 在只重新请求部分行时使用"""
         if not texts:
             return []
         
@@ -190,7 +194,10 @@ This is an incorrect response because it includes extra text and explanations.
         
         # 构建消息
         system_prompt = self._build_system_prompt(source_lang, target_lang, custom_prompt_json=custom_prompt_json, line_break_prompt_json=line_break_prompt_json)
-        user_prompt = self._build_user_prompt(texts, ctx)
+        user_prompt = self._build_user_prompt(texts, ctx, salvage_context, region_indices)
+        # 部分行校验失败时，只重新请求这些行
+        salvage_kwargs = dict(source_lang=source_lang, target_lang=target_lang, custom_prompt_json=custom_prompt_json,
+                              line_break_prompt_json=line_break_prompt_json, ctx=ctx)
 
         # Combine system and user prompts into a single user message
         combined_prompt_text = system_prompt + "\n\n" + user_prompt
@@ -256,6 +263,9 @@ This is an incorrect response because it includes extra text and explanations.
                     
                     # Strict validation: must match input count
                     if len(translations) != len(texts):
+                        kept = self._salvageable_translations(texts, translations, result_text, ctx, region_indices, split_level)
+                        if kept:
+                            return await self._retry_missing_translations(self._translate_batch, texts, kept, split_level, region_indices, **salvage_kwargs)
                         attempt += 1
                         log_attempt = f"{attempt}/{max_retries}" if not is_infinite else f"Attempt {attempt}"
                         self.logger.warning(f"[{log_attempt}] Translation count mismatch: expected {len(texts)}, got {len(translations)}. Retrying...")
@@ -271,6 +281,9 @@ This is an incorrect response because it includes extra text and explanations.
                     # 质量验证：检查空翻译、合并翻译、可疑符号等
                     is_valid, error_msg = self._validate_translation_quality(texts, translations)
                     if not is_valid:
+                        kept = self._salvageable_translations(texts, translations, result_text, ctx, region_indices, split_level)
+                        if kept:
+                            return await self._retry_missing_translations(self._translate_batch, texts, kept, split_level, region_indices, **salvage_kwargs)
                         attempt += 1
                         log_attempt = f"{attempt}/{max_retries}" if not is_infinite else f"Attempt {attempt}"
                         self.logger.warning(f"[{log_attempt}] Quality check failed: {error_msg}. Retrying...")
@@ -287,7 +300,10 @@ This is an incorrect response because it includes extra text and explanations.
                     self.logger.info("---------------------------")
 
                     # BR检查：检查翻译结果是否包含必要的[BR]标记
-                    if not self._validate_br_markers(translations, queries=texts, ctx=ctx):
+                    if not self._validate_br_markers(translations, queries=texts, ctx=ctx, batch_indices=region_indices):
+                        kept = self._salvageable_translations(texts, translations, result_text, ctx, region_indices, split_level)
+                        if kept:
+                            return await self._retry_missing_translations(self._translate_batch, texts, kept, split_level, region_indices, **salvage_kwargs)
                         attempt += 1
                         log_attempt = f"{attempt}/{max_retries}" if not is_infinite else f"Attempt {attempt}"
                         self.logger.warning(f"[{log_attempt}] BR markers missing, retrying...")
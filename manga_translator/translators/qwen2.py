@@ -1,8 +1,12 @@
+import copy
 import os
 import re
-from typing import List, Dict
+from collections import OrderedDict
+from typing import List, Dict, Optional
 from omegaconf import OmegaConf
 
+import torch
+
 from ..config import TranslatorConfig
 from .common import OfflineTranslator
 from .config_gpt import ConfigGPT  # Import the `gpt_config` parsing parent class
@@ -11,6 +15,50 @@ from .config_gpt import ConfigGPT  # Import the `gpt_config` parsing parent clas
 # https://github.com/zyddnys/manga-image-translator/issues/680#issue-2428018275
 # manga_translator/translators/chatgpt.py
 
+_SEGMENT_MARKER = re.compile(r'<\|(\d+)\|>')
+
+
+def segments_complete_at(text: str, count: int, last_multiline: bool = False) -> Optional[int]:
+    """
+    判断回复中 <|1|>..<|count|> 是否都已写完，返回有效内容的结束位置，未写完返回 None。
+    出现 <|count+1|> 等多余编号，或最后一段内容后出现换行（原文最后一段本身不含换行时）即视为写完。
+    """
+    last = None
+    for match in _SEGMENT_MARKER.finditer(text):
+        index = int(match.group(1))
+        if index > count:
+            return match.start()
+        if index == count:
+            last = match
+    if last is None and count > 1:
+        return None
+    if last_multiline:
+        return None
+    # 只有一段时模型经常省略 <|1|>
+    start = last.end() if last is not None else 0
+    body = text[start:].lstrip()
+    newline = body.find('\n')
+    if not body or newline < 0:
+        return None
+    return len(text) - len(body) + newline
+
+
+class SegmentsCompleteCriteria:
+    """generate 的停止条件：所有编号段都写完就停，不再让模型继续输出"""
+
+    def __init__(self, tokenizer, prompt_length: int, queries: List[str]):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.count = len(queries)
+        self.last_multiline = '\n' in queries[-1].strip()
+        self.cut: Optional[int] = None
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        text = self.tokenizer.decode(input_ids[0, self.prompt_length:], skip_special_tokens=True)
+        self.cut = segments_complete_at(text, self.count, self.last_multiline)
+        return torch.full((input_ids.shape[0],), self.cut is not None, dtype=torch.bool, device=input_ids.device)
+
+
 class Qwen2Translator(OfflineTranslator, ConfigGPT):
     _LANGUAGE_CODE_MAP = {
         'CHS': 'Simplified Chinese',
@@ -43,10 +91,18 @@ class Qwen2Translator(OfflineTranslator, ConfigGPT):
     _TRANSLATOR_MODEL = "Qwen/Qwen2-1.5B-Instruct"
     _MODEL_SUB_DIR = os.path.join(OfflineTranslator._MODEL_DIR, OfflineTranslator._MODEL_SUB_DIR, _TRANSLATOR_MODEL)
     _IS_4_BIT = False
+    # 每批的生成预算：基础量 + 每段的编号开销 + 原文 token 数的倍数，不超过上限
+    _MAX_NEW_TOKENS = 10240
+    _TOKEN_BUDGET_BASE = 64
+    _TOKEN_BUDGET_PER_SEGMENT = 8
+    _TOKEN_BUDGET_RATIO = 4.0
+    # 缓存的固定前缀（系统提示词 + 示例）KV 数量
+    _PREFIX_CACHE_SIZE = 4
 
     def __init__(self):
         OfflineTranslator.__init__(self)
         ConfigGPT.__init__(self, config_key='qwen2') 
+        self._prefix_caches = OrderedDict()
 
     def parse_args(self, args: TranslatorConfig):
         self.config = args.chatgpt_config
@@ -69,16 +125,43 @@ class Qwen2Translator(OfflineTranslator, ConfigGPT):
         self.tokenizer = AutoTokenizer.from_pretrained(self._TRANSLATOR_MODEL)
 
     async def _unload(self):
+        self._prefix_caches.clear()
         del self.model
         del self.tokenizer
 
+    def _token_budget(self, queries: List[str]) -> int:
+        query_tokens = sum(len(ids) for ids in self.tokenizer(queries, add_special_tokens=False).input_ids)
+        budget = self._TOKEN_BUDGET_BASE + self._TOKEN_BUDGET_PER_SEGMENT * len(queries) + self._TOKEN_BUDGET_RATIO * query_tokens
+        return min(self._MAX_NEW_TOKENS, int(budget))
+
+    def _prefix_cache(self, prefix_ids: torch.Tensor):
+        """返回固定前缀的 KV 缓存副本（generate 会在副本上追加）"""
+        key = tuple(prefix_ids[0].tolist())
+        cache = self._prefix_caches.get(key)
+        if cache is None:
+            with torch.no_grad():
+                cache = self.model(input_ids=prefix_ids, use_cache=True).past_key_values
+            self._prefix_caches[key] = cache
+            while len(self._prefix_caches) > self._PREFIX_CACHE_SIZE:
+                self._prefix_caches.popitem(last=False)
+        else:
+            self._prefix_caches.move_to_end(key)
+        return copy.deepcopy(cache)
+
     async def _infer(self, from_lang: str, to_lang: str, queries: List[str], ctx=None) -> List[str]:
-        model_inputs = self.tokenize(queries, to_lang)
+        model_inputs, prefix_length = self.tokenize(queries, to_lang, return_prefix_length=True)
+        prompt_length = model_inputs.input_ids.shape[1]
+        stopping = SegmentsCompleteCriteria(self.tokenizer, prompt_length, queries)
+        generate_kwargs = {}
+        if 0 < prefix_length < prompt_length:
+            generate_kwargs['past_key_values'] = self._prefix_cache(model_inputs.input_ids[:, :prefix_length])
         # Generate the translation
         generated_ids = self.model.generate(
             model_inputs.input_ids,
             attention_mask=model_inputs.attention_mask,
-            max_new_tokens=10240
+            max_new_tokens=self._token_budget(queries),
+            stopping_criteria=[stopping],
+            **generate_kwargs
         )
 
         # Extract the generated tokens
@@ -86,6 +169,9 @@ class Qwen2Translator(OfflineTranslator, ConfigGPT):
             output_ids[len(input_ids):] for input_ids, output_ids in zip(model_inputs.input_ids, generated_ids)
         ]
         response = self.tokenizer.batch_decode(generated_ids, skip_special_tokens=True)[0]
+        if stopping.cut is not None:
+            response = response[:stopping.cut]
+        self.logger.debug(f'Qwen2 generated {len(generated_ids[0])} tokens (prompt {prompt_length}, cached prefix {prefix_length})')
         query_size = len(queries)
 
         translations = []
@@ -109,9 +195,14 @@ class Qwen2Translator(OfflineTranslator, ConfigGPT):
 
         return translations
 
-    def tokenize(self, queries, to_lang):
+    def tokenize(self, queries, to_lang, return_prefix_length=False):
+        """
+        return_prefix_length=True 时同时返回固定前缀（系统提示词、示例和指令，不含原文）的 token 数，
+        前缀和原文分开编码，保证同一前缀的 token 在每次调用中完全相同，可以复用 KV 缓存。
+        """
         prompt = f"""Translate into {to_lang} and keep the original format.\n"""
         prompt += '\nOriginal:'
+        instruction = prompt
         for i, query in enumerate(queries):
             prompt += f'\n<|{i+1}|>{query}'
 
@@ -139,15 +230,20 @@ class Qwen2Translator(OfflineTranslator, ConfigGPT):
         if tokenizer.pad_token is None:
             tokenizer.pad_token = tokenizer.eos_token
 
-        model_inputs = tokenizer(
-            [text],
+        # 原文之前的部分只取决于目标语言和配置
+        split = text.rfind(instruction) + len(instruction)
+        prefix_ids = tokenizer(text[:split]).input_ids
+        query_ids = tokenizer(text[split:], add_special_tokens=False).input_ids
+        input_ids = (prefix_ids + query_ids)[:self.tokenizer.model_max_length]
+        model_inputs = tokenizer.pad(
+            {'input_ids': [input_ids]},
             return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=self.tokenizer.model_max_length,
             return_attention_mask=True
         ).to(self.device)
 
+        if return_prefix_length:
+            prefix_length = len(prefix_ids) if len(prefix_ids) < len(input_ids) else 0
+            return model_inputs, prefix_length
         return model_inputs
 
 
@@ -7,6 +7,7 @@ from .common import OfflineTranslator
 from ..utils import chunks
 
 class JparacrawlTranslator(OfflineTranslator):
+    _PER_DIRECTION_MODEL = True
     _LANGUAGE_CODE_MAP = {
         'JPN': 'ja',
         'ENG': 'en',
@@ -93,7 +94,7 @@ class JparacrawlTranslator(OfflineTranslator):
             else:
                 from_lang = 'en'
         if self.is_loaded() and to_lang != self.load_params['to_lang']:
-            await self.reload(self.load_params['device'], from_lang, to_lang)
+            await self.reload(from_lang, to_lang, self.load_params['device'])
 
         return await super().infer(from_lang, to_lang, queries)
 
@@ -1,14 +1,8 @@
 import os
-import re
-import subprocess
-import tempfile
-import shutil
-import tqdm
 from sys import platform
 from typing import List
-from PIL import Image
 
-from .common import OfflineUpscaler
+from .ncnn_executable import NcnnExecutableUpscaler
 
 if platform == 'win32':
     esrgan_base_folder = 'esrgan-win/'
@@ -54,59 +48,16 @@ else:
     }
 
 # https://github.com/xinntao/Real-ESRGAN
-class ESRGANUpscaler(OfflineUpscaler):
+class ESRGANUpscaler(NcnnExecutableUpscaler):
     _MODEL_MAPPING = model_mapping
     _VALID_UPSCALE_RATIOS = [2, 3, 4]
+    _PROGRESS_DESC = '[esgran]'
 
-    async def _load(self, device: str):
-        pass
-
-    async def _unload(self):
-        pass
-
-    async def _infer(self, image_batch: List[Image.Image], upscale_ratio: float) -> List[Image.Image]:
-        # Has to cache images because chosen upscaler doesn't support piping
-        in_dir = tempfile.mkdtemp()
-        out_dir = tempfile.mkdtemp()
-        for i, image in enumerate(image_batch):
-            image.save(os.path.join(in_dir, f'{i}.png'))
-
-        try:
-            self._run_esrgan_executable(in_dir, out_dir, upscale_ratio, 0)
-        except Exception:
-            # Maybe throw exception instead
-            self.logger.warn(f'Process returned non-zero exit status. Skipping upscaling.')
-            return image_batch
-
-        output_batch = []
-        for i, image in enumerate(image_batch):
-            img_path = os.path.join(out_dir, f'{i}.png')
-            if os.path.exists(img_path):
-                img = Image.open(img_path)
-                img.load()
-                output_batch.append(img)
-            else:
-                output_batch.append(image)
-
-        shutil.rmtree(in_dir)
-        shutil.rmtree(out_dir)
-        return output_batch
-
-    def _run_esrgan_executable(self, image_directory: str, output_directory: str, upscale_ratio: float, denoise_level: int):
-        cmds = [
+    def _build_command(self, in_dir: str, out_dir: str, upscale_ratio: float) -> List[str]:
+        return [
             self._get_file_path(esrgan_executable_path),
-            '-i', image_directory,
-            '-o', output_directory,
+            '-i', in_dir,
+            '-o', out_dir,
             '-m', self._get_file_path(os.path.join(esrgan_base_folder, 'models')),
             '-s', str(upscale_ratio),
         ]
-        process = subprocess.Popen(cmds, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        with tqdm.tqdm(desc='[esgran]', total=100) as bar:
-            last_progress = 0
-            for line in iter(process.stdout.readline, b''):
-                match = re.search(r'^(\d+\.\d+)%$', str(line, 'utf-8'))
-                if match:
-                    progress = float(match.group(1))
-                    bar.update(progress - last_progress)
-                    last_progress = progress
-            bar.update(100 - last_progress)
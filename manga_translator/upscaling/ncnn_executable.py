@@ -0,0 +1,195 @@
+"""
+基于外部 ncnn 可执行文件（realesrgan-ncnn-vulkan / waifu2x-ncnn-vulkan）的超分公共实现
+
+这些程序没有常驻/管道模式，每次启动都要重新初始化 Vulkan 并加载模型，逐页调用时启动开销占了大头。
+这里把同一配置下的请求合并成一次调用:
+    - 批量翻译时整批页面一次提交（MangaTranslator._upscale_batch_ahead）
+    - 同时到达（或在上一次调用运行期间到达）的页面合并为一批，一次启动处理整个目录
+    - 输入/输出目录优先放在内存盘（/dev/shm），空间不足时回退到系统临时目录
+    - 交接用的输入 PNG 使用低压缩等级，无损且编码很快
+    - 可执行文件在线程中运行，不阻塞事件循环
+"""
+import asyncio
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+import tqdm
+from PIL import Image
+
+from .common import OfflineUpscaler
+
+# 交接用 PNG 的压缩等级（0-9），1 的编码速度接近不压缩，文件小很多
+HANDOFF_PNG_COMPRESS_LEVEL = 1
+
+
+def fast_temp_root(required_bytes: int = 0) -> str:
+    """优先使用内存盘存放临时图片，可用 MT_UPSCALE_TMPDIR 指定"""
+    candidates = [os.environ.get('MT_UPSCALE_TMPDIR'), '/dev/shm']
+    for root in candidates:
+        if not root or not os.path.isdir(root) or not os.access(root, os.W_OK):
+            continue
+        try:
+            if shutil.disk_usage(root).free > required_bytes * 2:
+                return root
+        except OSError:
+            continue
+    return tempfile.gettempdir()
+
+
+def _estimate_bytes(images: List[Image.Image], upscale_ratio: float) -> int:
+    return int(sum(image.width * image.height * 4 * (1 + upscale_ratio ** 2) for image in images))
+
+
+class _Job:
+    def __init__(self, images: List[Image.Image], future: asyncio.Future):
+        self.images = images
+        self.future = future
+
+
+class ExecutableBatcher:
+    """
+    收集同一配置下的超分请求，合并后交给 run_batch 一次处理。
+    同一时间只运行一次可执行文件（GPU 独占），运行期间到达的请求排入下一批。
+    """
+
+    def __init__(self, window: float = 0.05, max_images: int = 16):
+        self.window = window
+        self.max_images = max(1, int(max_images))
+        self._pending: List[_Job] = []
+        # 同一时间只有一个刷新任务，它依次运行各批
+        self._flush_task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.images = 0
+
+    def _pending_images(self) -> int:
+        return sum(len(job.images) for job in self._pending)
+
+    async def submit(self, images: List[Image.Image],
+                     run_batch: Callable[[List[Image.Image]], List[Optional[Image.Image]]]) -> List[Optional[Image.Image]]:
+        loop = asyncio.get_running_loop()
+        job = _Job(images, loop.create_future())
+        self._pending.append(job)
+        if self._flush_task is None or self._flush_task.done() or self._flush_task.get_loop() is not loop:
+            self._flush_task = asyncio.create_task(self._flush(run_batch))
+        return await job.future
+
+    async def _flush(self, run_batch):
+        # 先让出一次，同一轮事件循环中并发提交的请求（如 asyncio.gather）都能排进来；
+        # 只有确实还有其它请求在排队时才再等一个很短的窗口收集稍晚到达的页面，单独的请求直接运行
+        await asyncio.sleep(0)
+        if self.window > 0 and len(self._pending) > 1 and self._pending_images() < self.max_images:
+            await asyncio.sleep(self.window)
+        while self._pending:
+            jobs, count = [], 0
+            while self._pending and (not jobs or count + len(self._pending[0].images) <= self.max_images):
+                job = self._pending.pop(0)
+                jobs.append(job)
+                count += len(job.images)
+            images = [image for job in jobs for image in job.images]
+            try:
+                outputs = await asyncio.to_thread(run_batch, images)
+            except Exception as e:
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                continue
+            self.runs += 1
+            self.images += len(images)
+            offset = 0
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_result(outputs[offset:offset + len(job.images)])
+                offset += len(job.images)
+
+
+# 按 (可执行文件, 参数) 共享，_run_upscaling 每次用完都会卸载并丢弃超分器实例，批处理器需要比实例活得久
+_batchers: Dict[Tuple, ExecutableBatcher] = {}
+
+
+def get_batcher(key: Tuple, window: float, max_images: int) -> ExecutableBatcher:
+    batcher = _batchers.get(key)
+    if batcher is None:
+        batcher = _batchers[key] = ExecutableBatcher(window, max_images)
+    return batcher
+
+
+class NcnnExecutableUpscaler(OfflineUpscaler):
+    """
+    子类只需实现 _build_command。输入目录中的文件名为 <序号>.png，输出写到输出目录的同名文件。
+    """
+    _PROGRESS_DESC = ''
+    # 合并窗口（秒）和单次调用的最大页数
+    _BATCH_WINDOW = 0.05
+    _MAX_BATCH_IMAGES = 16
+
+    async def _load(self, device: str):
+        pass
+
+    async def _unload(self):
+        pass
+
+    def _build_command(self, in_dir: str, out_dir: str, upscale_ratio: float) -> List[str]:
+        raise NotImplementedError
+
+    async def _infer(self, image_batch: List[Image.Image], upscale_ratio: float) -> List[Image.Image]:
+        key = (self.__class__.__name__, tuple(self._build_command('', '', upscale_ratio)))
+        batcher = get_batcher(key, self._BATCH_WINDOW, self._MAX_BATCH_IMAGES)
+        try:
+            outputs = await batcher.submit(image_batch, lambda images: self._run_batch(images, upscale_ratio))
+        except Exception as e:
+            # Maybe throw exception instead
+            self.logger.warning(f'Upscaler executable failed ({e}). Skipping upscaling.')
+            return image_batch
+        return [output if output is not None else image for output, image in zip(outputs, image_batch)]
+
+    def _run_batch(self, images: List[Image.Image], upscale_ratio: float) -> List[Optional[Image.Image]]:
+        # Has to cache images because chosen upscaler doesn't support piping
+        work_dir = tempfile.mkdtemp(prefix='mit-upscale-', dir=fast_temp_root(_estimate_bytes(images, upscale_ratio)))
+        try:
+            in_dir = os.path.join(work_dir, 'in')
+            out_dir = os.path.join(work_dir, 'out')
+            os.makedirs(in_dir)
+            os.makedirs(out_dir)
+            for i, image in enumerate(images):
+                image.save(os.path.join(in_dir, f'{i}.png'), compress_level=HANDOFF_PNG_COMPRESS_LEVEL)
+
+            self._run_executable(self._build_command(in_dir, out_dir, upscale_ratio), len(images))
+
+            outputs = []
+            for i in range(len(images)):
+                img_path = os.path.join(out_dir, f'{i}.png')
+                if os.path.exists(img_path):
+                    img = Image.open(img_path)
+                    img.load()
+                    outputs.append(img)
+                else:
+                    outputs.append(None)
+            return outputs
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _run_executable(self, cmds: List[str], num_images: int):
+        process = subprocess.Popen(cmds, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        # 每张图的进度都是 0% -> 100%，进度回落说明开始处理下一张
+        with tqdm.tqdm(desc=self._PROGRESS_DESC, total=100 * num_images) as bar:
+            done = 0.0
+            last_progress = 0.0
+            for line in iter(process.stdout.readline, b''):
+                match = re.search(r'^(\d+\.\d+)%$', str(line, 'utf-8', errors='ignore').strip())
+                if match:
+                    progress = float(match.group(1))
+                    if progress < last_progress:
+                        done += 100 - last_progress
+                        bar.update(100 - last_progress)
+                        last_progress = 0.0
+                    bar.update(progress - last_progress)
+                    done += progress - last_progress
+                    last_progress = progress
+            bar.update(max(0.0, 100 * num_images - done))
+        returncode = process.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmds)
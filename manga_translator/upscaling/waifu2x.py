@@ -1,12 +1,9 @@
 import os
-import subprocess
-import tempfile
 from sys import platform
 from typing import List
-from PIL import Image
 import shutil
 
-from .common import OfflineUpscaler
+from .ncnn_executable import NcnnExecutableUpscaler
 
 if platform == 'win32':
     waifu2x_base_folder = 'waifu2x-win'
@@ -49,9 +46,11 @@ else:
     }
 
 # https://github.com/nihui/waifu2x-ncnn-vulkan
-class Waifu2xUpscaler(OfflineUpscaler): # ~2GB of vram
+class Waifu2xUpscaler(NcnnExecutableUpscaler): # ~2GB of vram
     _MODEL_MAPPING = model_mapping
     _VALID_UPSCALE_RATIOS = [2, 4, 8, 16, 32]
+    _PROGRESS_DESC = '[waifu2x]'
+    _DENOISE_LEVEL = 0
 
     def __init__(self, *args, **kwargs):
         os.makedirs(self.model_dir, exist_ok=True)
@@ -59,47 +58,12 @@ class Waifu2xUpscaler(OfflineUpscaler): # ~2GB of vram
             shutil.move(os.path.join('models', waifu2x_base_folder), self._get_file_path(waifu2x_base_folder))
         super().__init__(*args, **kwargs)
 
-    async def _load(self, device: str):
-        pass
-
-    async def _unload(self):
-        pass
-
-    async def _infer(self, image_batch: List[Image.Image], upscale_ratio: float) -> List[Image.Image]:
-        # Has to cache images because chosen upscaler doesn't support piping
-        in_dir = tempfile.mkdtemp()
-        out_dir = tempfile.mkdtemp()
-        for i, image in enumerate(image_batch):
-            image.save(os.path.join(in_dir, f'{i}.png'))
-
-        try:
-            self._run_waifu2x_executable(in_dir, out_dir, upscale_ratio, 0)
-        except Exception:
-            # Maybe throw exception instead
-            self.logger.warn(f'Process returned non-zero exit status. Skipping upscaling.')
-            return image_batch
-
-        output_batch = []
-        for i, image in enumerate(image_batch):
-            img_path = os.path.join(out_dir, f'{i}.png')
-            if os.path.exists(img_path):
-                img = Image.open(img_path)
-                img.load()
-                output_batch.append(img)
-            else:
-                output_batch.append(image)
-
-        shutil.rmtree(in_dir)
-        shutil.rmtree(out_dir)
-        return output_batch
-
-    def _run_waifu2x_executable(self, image_directory: str, output_directory: str, upscale_ratio: float, denoise_level: int):
-        cmds = [
+    def _build_command(self, in_dir: str, out_dir: str, upscale_ratio: float) -> List[str]:
+        return [
             self._get_file_path(waifu2x_executable_path),
-            '-i', image_directory,
-            '-o', output_directory,
+            '-i', in_dir,
+            '-o', out_dir,
             '-m', self._get_file_path(os.path.join(waifu2x_base_folder, 'models-cunet')),
             '-s', str(upscale_ratio),
-            '-n', str(denoise_level),
+            '-n', str(self._DENOISE_LEVEL),
         ]
-        subprocess.check_call(cmds)
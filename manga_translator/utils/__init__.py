@@ -3,5 +3,7 @@ from .log import *
 from .generic import *
 from .textblock import *
 from .inference import *
+from .model_residency import ModelResidencyManager, model_residency
+from .memory_cleanup import MemoryCleanupPolicy, memory_cleanup
 from .threading import *
 from .bubble import is_ignore
@@ -0,0 +1,247 @@
+"""
+CBZ/ZIP（以及安装了 rarfile 时的 CBR）漫画压缩包的流式读写
+
+读取时按需逐页解码，不把整本解压到磁盘；写入时页面编码（PNG/JPEG/WebP）在线程池里并行完成，
+已压缩的图片格式以 ZIP_STORED 存入，避免再做一遍无意义的 deflate。输出先写到 *.part 临时文件，
+全部完成后再重命名，中途失败不会留下半个压缩包。
+"""
+import asyncio
+import functools
+import io
+import os
+import threading
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .generic import natural_sort
+from .log import get_logger
+
+try:
+    import rarfile
+except ImportError:
+    rarfile = None
+
+logger = get_logger('archive')
+
+ARCHIVE_EXTS = ('.cbz', '.zip', '.cbr', '.rar')
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.gif', '.tif', '.tiff', '.avif', '.jxl')
+# 这些格式本身已经压缩，再 deflate 只会浪费 CPU
+STORED_EXTS = ('.png', '.jpg', '.jpeg', '.webp', '.gif', '.avif', '.jxl')
+
+
+def is_archive(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in ARCHIVE_EXTS
+
+
+def is_image_entry(name: str) -> bool:
+    base = os.path.basename(name)
+    return (os.path.splitext(name)[1].lower() in IMAGE_EXTS
+            and not base.startswith('.') and not name.startswith('__MACOSX/'))
+
+
+class ArchiveReader:
+    """
+    只读打开漫画压缩包，按自然排序列出图片页面，open_image() 时才读取和解码对应的条目。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.cbr', '.rar'):
+            if rarfile is None:
+                raise ImportError(f'Reading {ext} archives requires the "rarfile" package (pip install rarfile) and an unrar tool')
+            self._archive = rarfile.RarFile(path)
+        else:
+            self._archive = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+        entries = [info for info in self._archive.infolist() if not info.is_dir()]
+        self.page_names: List[str] = natural_sort([info.filename for info in entries if is_image_entry(info.filename)])
+        page_set = set(self.page_names)
+        # 非图片条目（ComicInfo.xml 等）原样带到输出包
+        self.other_names: List[str] = [info.filename for info in entries if info.filename not in page_set]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.page_names)
+
+    def read(self, name: str) -> bytes:
+        # zipfile 同一个句柄不能被多个线程同时读
+        with self._lock:
+            return self._archive.read(name)
+
+    def open_image(self, name: str) -> Image.Image:
+        image = Image.open(io.BytesIO(self.read(name)))
+        image.load()
+        return image
+
+    def iter_images(self) -> Iterator[Tuple[str, Image.Image]]:
+        """逐页产出 (条目名, 图片)，同一时间只有当前页在内存中"""
+        for name in self.page_names:
+            yield name, self.open_image(name)
+
+    def close(self):
+        self._archive.close()
+
+
+class ArchiveWriter:
+    """
+    流式写出漫画压缩包。
+
+    submit_image() 把页面交给线程池编码，编码结果按提交顺序写入压缩包；
+    待写入的页面数达到 max_pending 时 submit 阻塞，成品图不会在内存里堆积。
+    作为上下文管理器使用时正常退出会 commit()，异常退出会 abort()。
+    """
+
+    def __init__(self, path: str, max_workers: int = 2, max_pending: int = 4, png_compress_level: Optional[int] = None,
+                 compresslevel: int = 6):
+        self.path = path
+        self.png_compress_level = png_compress_level
+        self.compresslevel = compresslevel
+        self._tmp_path = os.path.join(os.path.dirname(path) or '.', f'.{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.part')
+        self._zip = zipfile.ZipFile(self._tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix='archive-writer')
+        self._slots = threading.BoundedSemaphore(max(1, int(max_pending)))
+        self._pending: deque = deque()
+        self._write_lock = threading.RLock()
+        self._names = set()
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    @staticmethod
+    def _compress_type(name: str) -> int:
+        return zipfile.ZIP_STORED if os.path.splitext(name)[1].lower() in STORED_EXTS else zipfile.ZIP_DEFLATED
+
+    def _encode(self, image: Union[Image.Image, np.ndarray], name: str, save_kwargs: dict) -> bytes:
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        fmt = save_kwargs.pop('format', None) or Image.registered_extensions().get(os.path.splitext(name)[1].lower(), 'PNG')
+        if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        if fmt == 'PNG' and self.png_compress_level is not None:
+            save_kwargs.setdefault('compress_level', self.png_compress_level)
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, **save_kwargs)
+        return buffer.getvalue()
+
+    def _drain(self):
+        """把队首已经编码完的页面按提交顺序写进压缩包"""
+        with self._write_lock:
+            while self._pending and self._pending[0][1].done():
+                name, future = self._pending.popleft()
+                self._slots.release()
+                try:
+                    data = future.result()
+                except BaseException as e:
+                    logger.error(f'Failed to encode "{name}" for {os.path.basename(self.path)}: {e}')
+                    self._error = self._error or e
+                    continue
+                self._zip.writestr(self._zipinfo(name), data, compress_type=self._compress_type(name), compresslevel=self.compresslevel)
+
+    def _zipinfo(self, name: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = self._compress_type(name)
+        return info
+
+    def _reserve(self, name: str):
+        if self._closed:
+            raise ValueError('ArchiveWriter is closed')
+        if name in self._names:
+            raise ValueError(f'Duplicate archive entry: {name}')
+        self._names.add(name)
+
+    def submit_image(self, image: Union[Image.Image, np.ndarray], name: str, **save_kwargs) -> Future:
+        """提交一页，格式由条目扩展名决定，save_kwargs 传给 PIL 的 save（如 quality）"""
+        self._reserve(name)
+        self._slots.acquire()
+        with self._write_lock:
+            future = self._executor.submit(self._encode, image, name, save_kwargs)
+            self._pending.append((name, future))
+        # 编码完成的线程顺带把队首已完成的页面写入压缩包
+        future.add_done_callback(lambda _: self._drain())
+        return future
+
+    async def submit_image_async(self, image: Union[Image.Image, np.ndarray], name: str, **save_kwargs) -> Future:
+        """submit_image 的协程版本，队列满时在线程中等待，不阻塞事件循环"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(self.submit_image, image, name, **save_kwargs))
+
+    def add_bytes(self, name: str, data: bytes):
+        """原样加入一个条目（未翻译的页面、ComicInfo.xml 等），排在已提交的页面之后"""
+        self._reserve(name)
+        self._slots.acquire()
+        future = Future()
+        future.set_result(data)
+        with self._write_lock:
+            self._pending.append((name, future))
+        self._drain()
+
+    async def add_bytes_async(self, name: str, data: bytes):
+        """add_bytes 的协程版本，队列满时在线程中等待，不阻塞事件循环"""
+        await asyncio.get_running_loop().run_in_executor(None, self.add_bytes, name, data)
+
+    def flush(self):
+        """等待所有已提交页面编码并写入"""
+        while True:
+            with self._write_lock:
+                if not self._pending:
+                    break
+                future = self._pending[0][1]
+            future.exception()
+            self._drain()
+        if self._error is not None:
+            raise self._error
+
+    def commit(self) -> str:
+        """写完并把临时文件重命名为目标文件"""
+        if self._closed:
+            return self.path
+        try:
+            self.flush()
+        except BaseException:
+            self.abort()
+            raise
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        self._zip.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    async def commit_async(self) -> str:
+        return await asyncio.get_running_loop().run_in_executor(None, self.commit)
+
+    def abort(self):
+        if self._closed:
+            return
+        self._closed = True
+        with self._write_lock:
+            self._pending.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        try:
+            self._zip.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    @property
+    def entry_names(self) -> List[str]:
+        return list(self._names)
@@ -0,0 +1,223 @@
+"""
+CPU 推理导出
+
+在纯 CPU 环境下把 PyTorch 模型导出为 ONNX（由 ONNX Runtime 执行），或对 nn.Linear 做动态 int8 量化，
+并在启用前用固定的样例输入检查与 eager 模型的数值偏差，偏差超限时自动回退到原模型。
+
+运行时选择（--cpu-runtime）:
+    eager - 默认。不做任何转换
+    onnx  - 默认检测器（DBNet）首次加载时导出 fp32 ONNX 并校验，之后使用导出的模型
+    auto  - 同 onnx（兼容旧参数）
+    int8  - 在 onnx 基础上对 48px OCR 的线性层做动态 int8 量化
+
+导出会在首次加载时占用一些时间，并在模型目录中写入 <权重文件>.cpu.onnx 及其 .json 校验记录，所以需要显式开启。
+校验记录包含源权重的修改时间/大小和偏差检查结果，权重更新后会重新导出。
+卷积网络的动态 int8 量化（ConvInteger）在 ONNX Runtime CPU 上反而更慢，所以 int8 只作用于 MatMul/Linear。
+
+只覆盖检测器和 OCR。LaMa 修复模型（lama_mpe/lama_large）不在此处导出或校验：
+它们在 CPU 上使用下载的预构建 ONNX（不与 .ckpt 做偏差检查），没有 onnxruntime 时仍是 eager fp32。
+"""
+import copy
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+import torch
+
+from .log import get_logger
+
+logger = get_logger('CpuExport')
+
+CPU_RUNTIMES = ('auto', 'onnx', 'int8', 'eager')
+_cpu_runtime = os.environ.get('MT_CPU_RUNTIME', 'eager')
+
+
+def set_cpu_runtime(runtime: str):
+    global _cpu_runtime
+    if runtime not in CPU_RUNTIMES:
+        raise ValueError(f'Unknown CPU runtime "{runtime}". Choose from: {", ".join(CPU_RUNTIMES)}')
+    _cpu_runtime = runtime
+
+
+def get_cpu_runtime() -> str:
+    return _cpu_runtime
+
+
+def use_onnx_on(device: str) -> bool:
+    return device == 'cpu' and _cpu_runtime != 'eager'
+
+
+def use_int8_on(device: str) -> bool:
+    return device == 'cpu' and _cpu_runtime == 'int8'
+
+
+@dataclass
+class DriftReport:
+    max_abs: float
+    mean_abs: float
+    max_abs_tolerance: float
+    mean_abs_tolerance: float
+    mismatches: int = 0
+
+    @property
+    def passed(self) -> bool:
+        return self.max_abs <= self.max_abs_tolerance and self.mean_abs <= self.mean_abs_tolerance and self.mismatches == 0
+
+    def __str__(self):
+        return (f'max_abs={self.max_abs:.2e} (tol {self.max_abs_tolerance:.0e}), '
+                f'mean_abs={self.mean_abs:.2e} (tol {self.mean_abs_tolerance:.0e}), mismatches={self.mismatches}')
+
+
+def measure_drift(reference: Sequence[np.ndarray], candidate: Sequence[np.ndarray],
+                  max_abs_tolerance: float, mean_abs_tolerance: float, mismatches: int = 0) -> DriftReport:
+    """逐个输出比较数值偏差"""
+    max_abs = mean_abs = 0.0
+    for ref, cand in zip(reference, candidate):
+        diff = np.abs(np.asarray(ref, dtype=np.float64) - np.asarray(cand, dtype=np.float64))
+        max_abs = max(max_abs, float(diff.max()) if diff.size else 0.0)
+        mean_abs = max(mean_abs, float(diff.mean()) if diff.size else 0.0)
+    return DriftReport(max_abs, mean_abs, max_abs_tolerance, mean_abs_tolerance, mismatches)
+
+
+# --- 样例输入 ---
+
+def synthetic_text_page(height: int = 1024, width: int = 768, seed: int = 0) -> np.ndarray:
+    """带若干文字块的合成页面 (RGB uint8)，用作检测器的偏差检查样例"""
+    rng = np.random.default_rng(seed)
+    page = np.full((height, width, 3), 255, dtype=np.uint8)
+    for _ in range(12):
+        x, y = int(rng.integers(0, width - 200)), int(rng.integers(40, height - 40))
+        cv2.putText(page, 'SAMPLE TEXT', (x, y), cv2.FONT_HERSHEY_SIMPLEX, float(rng.uniform(0.6, 1.4)), (0, 0, 0), 2)
+    cv2.ellipse(page, (width // 2, height // 2), (width // 4, height // 8), 0, 0, 360, (30, 30, 30), 3)
+    return page
+
+
+def synthetic_text_lines(height: int = 48, texts: Sequence[str] = ('HELLO WORLD', 'WAIT FOR ME!', '12345 67890', 'OK')) -> List[np.ndarray]:
+    """单行文字图片 (RGB uint8, 高度固定)，用作 OCR 的偏差检查样例"""
+    lines = []
+    for text in texts:
+        (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1.2, 2)
+        line = np.full((height, w + 16, 3), 255, dtype=np.uint8)
+        cv2.putText(line, text, (8, (height + h) // 2), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+        lines.append(line)
+    return lines
+
+
+# --- ONNX ---
+
+class OnnxModule:
+    """
+    用 ONNX Runtime 会话替代 nn.Module 的前向，输入输出仍为 torch 张量，
+    调用方（如 det_batch_forward_default）无需改动。
+    """
+
+    def __init__(self, path: str, num_threads: int = 0):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, *inputs: torch.Tensor):
+        feeds = {name: tensor.detach().cpu().numpy() for name, tensor in zip(self.input_names, inputs)}
+        outputs = self.session.run(None, feeds)
+        return tuple(torch.from_numpy(o) for o in outputs)
+
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
+
+
+def _source_signature(source_path: str) -> dict:
+    stat = os.stat(source_path)
+    return {'source': os.path.basename(source_path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _read_meta(path: str) -> Optional[dict]:
+    try:
+        with open(path + '.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(path: str, meta: dict):
+    with open(path + '.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def export_onnx(model: torch.nn.Module, example_inputs: Tuple[torch.Tensor, ...], path: str,
+                input_names: List[str], output_names: List[str], dynamic_axes: Dict[str, Dict[int, str]], opset: int = 17):
+    """导出 ONNX（需要安装 onnx 包），先写临时文件再重命名"""
+    try:
+        import onnx  # noqa: F401
+    except ImportError as e:
+        raise ImportError('Exporting to ONNX requires the "onnx" package (pip install onnx)') from e
+    tmp_path = path + '.tmp'
+    with torch.no_grad():
+        torch.onnx.export(model, example_inputs, tmp_path, input_names=input_names, output_names=output_names,
+                          dynamic_axes=dynamic_axes, opset_version=opset, dynamo=False)
+    os.replace(tmp_path, path)
+
+
+def load_or_export_onnx(model: torch.nn.Module, source_path: str, example_inputs: Tuple[torch.Tensor, ...],
+                        input_names: List[str], output_names: List[str], dynamic_axes: Dict[str, Dict[int, str]],
+                        drift_inputs: List[Tuple[torch.Tensor, ...]], max_abs_tolerance: float = 1e-3,
+                        mean_abs_tolerance: float = 1e-4) -> Optional[OnnxModule]:
+    """
+    返回与 model 等价的 ONNX 模块；导出文件缓存为 <权重文件>.cpu.onnx。
+    导出不可用或偏差检查失败时返回 None，调用方继续使用 eager 模型。
+    """
+    path = os.path.splitext(source_path)[0] + '.cpu.onnx'
+    signature = _source_signature(source_path)
+    meta = _read_meta(path)
+    try:
+        if not os.path.isfile(path) or meta is None or meta.get('signature') != signature:
+            logger.info(f'Exporting {os.path.basename(source_path)} to ONNX for CPU inference: {path}')
+            export_onnx(model, example_inputs, path, input_names, output_names, dynamic_axes)
+            meta = None
+        module = OnnxModule(path)
+    except Exception as e:
+        logger.info(f'ONNX runtime unavailable for {os.path.basename(source_path)}, using PyTorch: {e}')
+        return None
+
+    if meta is None or not meta.get('passed'):
+        reference, candidate = [], []
+        with torch.no_grad():
+            for inputs in drift_inputs:
+                reference.extend(o.numpy() for o in model(*inputs))
+                candidate.extend(o.numpy() for o in module(*inputs))
+        report = measure_drift(reference, candidate, max_abs_tolerance, mean_abs_tolerance)
+        _write_meta(path, {'signature': signature, 'passed': report.passed, 'drift': asdict(report)})
+        if not report.passed:
+            logger.warning(f'ONNX export of {os.path.basename(source_path)} drifts from PyTorch ({report}), using PyTorch')
+            return None
+        logger.info(f'ONNX export verified against PyTorch: {report}')
+    return module
+
+
+# --- 动态 int8 量化 ---
+
+def quantize_linear_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """对 nn.Linear 做动态 int8 量化（权重 int8，激活运行时量化），返回新模型"""
+    return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def verify_quantized(reference_fn: Callable[[], Tuple[List, List[np.ndarray]]],
+                     candidate_fn: Callable[[], Tuple[List, List[np.ndarray]]],
+                     max_abs_tolerance: float, mean_abs_tolerance: float) -> DriftReport:
+    """
+    reference_fn/candidate_fn 返回 (离散结果列表, 数值输出列表)，
+    离散结果（如 OCR 解码出的文字）必须完全一致，数值输出按容差比较。
+    """
+    ref_labels, ref_values = reference_fn()
+    cand_labels, cand_values = candidate_fn()
+    mismatches = sum(1 for a, b in zip(ref_labels, cand_labels) if a != b)
+    return measure_drift(ref_values, cand_values, max_abs_tolerance, mean_abs_tolerance, mismatches)
@@ -18,6 +18,7 @@ from .generic import (
     get_filename_from_url,
 )
 from .log import get_logger
+from .model_residency import model_residency, LoadMeasurement
 from ..config import TranslatorConfig
 
 
@@ -100,6 +101,9 @@ class ModelWrapper(ABC):
         os.makedirs(self.model_dir, exist_ok=True)
         self._key = self._KEY or self.__class__.__name__
         self._loaded = False
+        # 上次 load() 的参数；被驻留管理器淘汰后 infer() 用它重新加载
+        self._load_args = None
+        self._evicted = False
         self._check_for_malformed_model_mapping()
         self._downloaded = self._check_downloaded()
 
@@ -332,22 +336,43 @@ class ModelWrapper(ABC):
         if not self.is_downloaded():
             await self.download()
         if not self.is_loaded():
+            await model_residency.before_load(self._key, device)
+            measurement = LoadMeasurement(device)
             await self._load(*args, **kwargs, device=device)
             self._loaded = True
+            self._load_args = (device, args, kwargs)
+            self._evicted = False
+            # 登记到驻留管理器，超出预算时会按 LRU 卸载其他模型
+            await model_residency.on_loaded(self, self._key, device, self._unload_evicted, measurement)
+
+    async def _unload_evicted(self):
+        await ModelWrapper.unload(self)
+        self._evicted = True
 
     async def unload(self):
         if self.is_loaded():
             await self._unload()
             self._loaded = False
+            self._evicted = False
+            model_residency.on_unloaded(self)
 
     async def infer(self, *args, **kwargs):
         '''
         Makes a forward pass through the network.
         '''
+        if not self.is_loaded() and self._evicted:
+            # dispatch() 中 load() 之后、推理之前被其他模型的加载淘汰，按原参数重新加载
+            device, load_args, load_kwargs = self._load_args
+            await ModelWrapper.load(self, device, *load_args, **load_kwargs)
         if not self.is_loaded():
             raise Exception(f'{self._key}: Tried to forward pass without having loaded the model.')
         
-        return await self._infer(*args, **kwargs)
+        # 推理期间标记为使用中，防止被淘汰（从 load 返回到这里之间没有 await）
+        model_residency.acquire(self)
+        try:
+            return await self._infer(*args, **kwargs)
+        finally:
+            model_residency.release(self)
 
     @abstractmethod
     async def _load(self, device: str, *args, **kwargs):
@@ -360,3 +385,9 @@ class ModelWrapper(ABC):
     @abstractmethod
     async def _infer(self, *args, **kwargs):
         pass
+
+
+async def unload_model_instance(instance):
+    """从注册表缓存移除模型时调用，真正释放权重而不是只丢弃引用"""
+    if isinstance(instance, ModelWrapper) and instance.is_loaded():
+        await ModelWrapper.unload(instance)
@@ -0,0 +1,160 @@
+"""
+按内存压力触发的清理
+
+以前每次修复后都会执行多次 gc.collect() 和 torch.cuda.empty_cache()，进程里持有大量
+numpy/torch 对象时一次完整回收就要几十毫秒，内存充足时纯属浪费。这里改为只在以下情况清理:
+    - 进程 RSS 超过阈值（默认物理内存的 75%）
+    - CUDA 已保留显存超过阈值（默认显存总量的 85%）
+    - 距离上次清理已处理了 N 页（兜底，保证长批次内存有界）
+每次清理只做一次 gc.collect()，并记录耗时和释放的内存，可以通过 summary() 查看。
+"""
+import gc
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import psutil
+import torch
+
+from .log import get_logger
+
+logger = get_logger('MemoryCleanup')
+
+_MB = 1024 * 1024
+
+
+@dataclass
+class CleanupStats:
+    checks: int = 0
+    cleanups: int = 0
+    total_seconds: float = 0.0
+    freed_ram_bytes: int = 0
+    freed_vram_bytes: int = 0
+    last_reason: str = ''
+
+
+class MemoryCleanupPolicy:
+    """
+    rss_threshold_mb / vram_threshold_mb 为 0 时按物理内存/显存总量自动计算，小于 0 表示不按该项触发；
+    every_n_pages 为 0 表示不做周期清理。
+    """
+
+    def __init__(self, rss_threshold_mb: float = 0, vram_threshold_mb: float = 0, every_n_pages: int = 10,
+                 rss_fraction: float = 0.75, vram_fraction: float = 0.85):
+        self.rss_fraction = rss_fraction
+        self.vram_fraction = vram_fraction
+        self.every_n_pages = every_n_pages
+        self._rss_threshold_mb = rss_threshold_mb
+        self._vram_threshold_mb = vram_threshold_mb
+        # 阈值在第一次检查时才计算，避免导入时就初始化 CUDA
+        self._thresholds: Optional[tuple] = None
+        self.stats = CleanupStats()
+        self._pages_since_cleanup = 0
+        self._lock = threading.Lock()
+
+    def configure(self, rss_threshold_mb: Optional[float] = None, vram_threshold_mb: Optional[float] = None,
+                  every_n_pages: Optional[int] = None):
+        if rss_threshold_mb is not None:
+            self._rss_threshold_mb = rss_threshold_mb
+            self._thresholds = None
+        if vram_threshold_mb is not None:
+            self._vram_threshold_mb = vram_threshold_mb
+            self._thresholds = None
+        if every_n_pages is not None:
+            self.every_n_pages = max(0, int(every_n_pages))
+
+    def thresholds(self) -> tuple:
+        """(RSS 阈值, 显存阈值) 字节数，<= 0 表示不按该项触发"""
+        if self._thresholds is None:
+            rss = self._auto_rss_threshold() if self._rss_threshold_mb == 0 else int(self._rss_threshold_mb * _MB)
+            vram = self._auto_vram_threshold() if self._vram_threshold_mb == 0 else int(self._vram_threshold_mb * _MB)
+            self._thresholds = (rss, vram)
+        return self._thresholds
+
+    def _auto_rss_threshold(self) -> int:
+        try:
+            return int(psutil.virtual_memory().total * self.rss_fraction)
+        except Exception:
+            return -1
+
+    def _auto_vram_threshold(self) -> int:
+        if not torch.cuda.is_available():
+            return -1
+        try:
+            return int(torch.cuda.get_device_properties(torch.cuda.current_device()).total_memory * self.vram_fraction)
+        except Exception:
+            return -1
+
+    @staticmethod
+    def _rss() -> int:
+        try:
+            return psutil.Process().memory_info().rss
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _vram_reserved() -> int:
+        if torch.cuda.is_available():
+            return torch.cuda.memory_reserved()
+        return 0
+
+    def _pressure_reason(self) -> Optional[str]:
+        rss_threshold, vram_threshold = self.thresholds()
+        if rss_threshold > 0:
+            rss = self._rss()
+            if rss > rss_threshold:
+                return f'RSS {rss / _MB:.0f}MB > {rss_threshold / _MB:.0f}MB'
+        if vram_threshold > 0:
+            reserved = self._vram_reserved()
+            if reserved > vram_threshold:
+                return f'VRAM reserved {reserved / _MB:.0f}MB > {vram_threshold / _MB:.0f}MB'
+        if self.every_n_pages and self._pages_since_cleanup >= self.every_n_pages:
+            return f'{self._pages_since_cleanup} pages since last cleanup'
+        return None
+
+    def page_done(self, source: str = '') -> bool:
+        """每处理完一页（一次修复）调用一次，需要时执行清理；返回是否清理过"""
+        with self._lock:
+            self._pages_since_cleanup += 1
+            self.stats.checks += 1
+        return self.check(source)
+
+    def check(self, source: str = '') -> bool:
+        """不增加页数计数，按阈值或已累计的页数判断是否清理（用于批次结束等位置）"""
+        with self._lock:
+            reason = self._pressure_reason()
+        if reason is None:
+            return False
+        self.cleanup(f'{source}: {reason}' if source else reason)
+        return True
+
+    def cleanup(self, reason: str = 'manual'):
+        """执行一次 gc.collect() 并释放 CUDA 缓存，记录耗时和释放量"""
+        start = time.perf_counter()
+        rss_before, vram_before = self._rss(), self._vram_reserved()
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        elapsed = time.perf_counter() - start
+        freed_ram = max(0, rss_before - self._rss())
+        freed_vram = max(0, vram_before - self._vram_reserved())
+        with self._lock:
+            self._pages_since_cleanup = 0
+            self.stats.cleanups += 1
+            self.stats.total_seconds += elapsed
+            self.stats.freed_ram_bytes += freed_ram
+            self.stats.freed_vram_bytes += freed_vram
+            self.stats.last_reason = reason
+        logger.debug(f'Memory cleanup ({reason}) took {elapsed * 1000:.1f}ms, '
+                     f'freed ram={freed_ram / _MB:.1f}MB, vram={freed_vram / _MB:.1f}MB')
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f'Memory cleanup: {s.cleanups} cleanups over {s.checks} pages, {s.total_seconds * 1000:.0f}ms total, '
+                f'freed ram={s.freed_ram_bytes / _MB:.0f}MB, vram={s.freed_vram_bytes / _MB:.0f}MB'
+                f'{f" (last: {s.last_reason})" if s.last_reason else ""}')
+
+
+# 进程级共享实例
+memory_cleanup = MemoryCleanupPolicy()
@@ -0,0 +1,276 @@
+"""
+模型驻留管理器
+
+统一记录每个已加载 ModelWrapper 的内存/显存占用，按 LRU 在预算内淘汰模型，
+支持固定（pin）常用模型，并保留淘汰记录便于排查。
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import psutil
+import torch
+
+from .log import get_logger
+
+logger = get_logger('ModelResidency')
+
+_MB = 1024 * 1024
+
+
+@dataclass
+class ResidentModel:
+    name: str
+    device: str
+    ram_bytes: int
+    vram_bytes: int
+    unload: Callable[[], Awaitable[None]] = field(repr=False)
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    in_use: int = 0
+
+
+@dataclass
+class EvictionRecord:
+    time: float
+    name: str
+    reason: str
+    ram_bytes: int
+    vram_bytes: int
+
+
+def _module_footprint(obj, depth: int = 2, seen: set = None) -> Tuple[int, int]:
+    """统计对象属性中 torch 模块/张量占用的 (内存, 显存) 字节数"""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0, 0
+    seen.add(id(obj))
+    ram = vram = 0
+    if isinstance(obj, torch.nn.Module):
+        for tensor in list(obj.parameters()) + list(obj.buffers()):
+            if id(tensor) in seen:
+                continue
+            seen.add(id(tensor))
+            size = tensor.numel() * tensor.element_size()
+            if tensor.device.type == 'cpu':
+                ram += size
+            else:
+                vram += size
+        return ram, vram
+    if isinstance(obj, torch.Tensor):
+        size = obj.numel() * obj.element_size()
+        return (size, 0) if obj.device.type == 'cpu' else (0, size)
+    if depth <= 0:
+        return 0, 0
+    if isinstance(obj, dict):
+        children = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        children = obj
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        children = vars(obj).values()
+    else:
+        return 0, 0
+    for child in children:
+        r, v = _module_footprint(child, depth - 1, seen)
+        ram += r
+        vram += v
+    return ram, vram
+
+
+class LoadMeasurement:
+    """加载前后的进程内存/显存快照，用于无法直接统计参数量的模型（如 ONNX Runtime 会话）"""
+
+    def __init__(self, device: str):
+        self.device = device
+        self.rss_before = self._rss()
+        self.cuda_before = self._cuda_allocated(device)
+
+    @staticmethod
+    def _rss() -> int:
+        try:
+            return psutil.Process().memory_info().rss
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _cuda_allocated(device: str) -> int:
+        if device.startswith('cuda') and torch.cuda.is_available():
+            return torch.cuda.memory_allocated()
+        return 0
+
+    def delta(self) -> Tuple[int, int]:
+        return (max(0, self._rss() - self.rss_before),
+                max(0, self._cuda_allocated(self.device) - self.cuda_before))
+
+
+class ModelResidencyManager:
+    """
+    在内存/显存预算内管理已加载模型。
+
+    - 预算为 0 表示不限制（默认，与以前的行为一致）
+    - 超出预算时按最近最少使用顺序卸载未固定、当前未在推理中的模型
+    - pin() 的模型名（ModelWrapper 的 _key，默认是类名）永远不会被淘汰
+    - snapshot()/evictions() 可查看当前驻留的模型和淘汰原因
+    """
+
+    def __init__(self, ram_budget_mb: float = 0, vram_budget_mb: float = 0, history_size: int = 100):
+        self.ram_budget_bytes = int(ram_budget_mb * _MB)
+        self.vram_budget_bytes = int(vram_budget_mb * _MB)
+        self._resident: 'OrderedDict[int, ResidentModel]' = OrderedDict()
+        self._known_footprints: Dict[str, Tuple[int, int]] = {}
+        self._pinned: set = set()
+        self._evictions: deque = deque(maxlen=history_size)
+        self._lock = asyncio.Lock()
+
+    # --- 配置 ---
+
+    def configure(self, ram_budget_mb: Optional[float] = None, vram_budget_mb: Optional[float] = None, pinned: Optional[List[str]] = None):
+        if ram_budget_mb is not None:
+            self.ram_budget_bytes = int(ram_budget_mb * _MB)
+        if vram_budget_mb is not None:
+            self.vram_budget_bytes = int(vram_budget_mb * _MB)
+        if pinned is not None:
+            self._pinned = set(pinned)
+
+    def pin(self, name: str):
+        self._pinned.add(name)
+
+    def unpin(self, name: str):
+        self._pinned.discard(name)
+
+    def is_pinned(self, name: str) -> bool:
+        return name in self._pinned
+
+    # --- ModelWrapper 生命周期回调 ---
+
+    async def before_load(self, name: str, device: str):
+        """如果之前加载过同名模型，按已知占用提前腾出空间，避免加载时 OOM"""
+        footprint = self._known_footprints.get(name)
+        if footprint:
+            await self.enforce_budget(extra=footprint, reason=f'making room for {name}')
+
+    async def on_loaded(self, model, name: str, device: str, unload: Callable[[], Awaitable[None]],
+                        measurement: Optional[LoadMeasurement] = None):
+        ram, vram = _module_footprint(model)
+        if ram == 0 and vram == 0 and measurement is not None:
+            ram, vram = measurement.delta()
+        self._known_footprints[name] = (ram, vram)
+        self._resident[id(model)] = ResidentModel(name, device, ram, vram, unload)
+        self._resident.move_to_end(id(model))
+        logger.debug(f'Loaded {name} on {device}: ram={ram / _MB:.1f}MB, vram={vram / _MB:.1f}MB')
+        await self.enforce_budget(reason=f'loading {name}', protect=id(model))
+
+    def on_unloaded(self, model, reason: str = 'unload'):
+        entry = self._resident.pop(id(model), None)
+        if entry is not None:
+            self._record(entry, reason)
+
+    def acquire(self, model):
+        entry = self._resident.get(id(model))
+        if entry is not None:
+            entry.in_use += 1
+            entry.last_used = time.time()
+            self._resident.move_to_end(id(model))
+
+    def release(self, model):
+        entry = self._resident.get(id(model))
+        if entry is not None:
+            entry.in_use = max(0, entry.in_use - 1)
+            entry.last_used = time.time()
+
+    # --- 淘汰 ---
+
+    def usage(self) -> Tuple[int, int]:
+        ram = sum(e.ram_bytes for e in self._resident.values())
+        vram = sum(e.vram_bytes for e in self._resident.values())
+        return ram, vram
+
+    def _over_budget(self, extra: Tuple[int, int] = (0, 0)) -> bool:
+        ram, vram = self.usage()
+        return ((self.ram_budget_bytes > 0 and ram + extra[0] > self.ram_budget_bytes) or
+                (self.vram_budget_bytes > 0 and vram + extra[1] > self.vram_budget_bytes))
+
+    def _evictable(self) -> List[int]:
+        # OrderedDict 头部是最久未使用的
+        return [key for key, e in self._resident.items() if e.in_use == 0 and e.name not in self._pinned]
+
+    async def enforce_budget(self, extra: Tuple[int, int] = (0, 0), reason: str = 'over budget', protect: Optional[int] = None):
+        """淘汰模型直到占用（加上 extra）回到预算内；protect 为不能淘汰的模型（如刚加载的那个）"""
+        if self.ram_budget_bytes <= 0 and self.vram_budget_bytes <= 0:
+            return
+        async with self._lock:
+            while self._over_budget(extra):
+                candidates = [key for key in self._evictable() if key != protect]
+                if not candidates:
+                    ram, vram = self.usage()
+                    logger.warning(f'Model memory budget exceeded but nothing can be evicted '
+                                   f'(ram={ram / _MB:.0f}MB, vram={vram / _MB:.0f}MB, pinned={sorted(self._pinned)})')
+                    break
+                await self._evict(candidates[0], f'LRU eviction: {reason}')
+
+    async def evict_idle(self, ttl: float):
+        """卸载超过 ttl 秒未使用的模型（替代原先的 models_ttl 清理循环）"""
+        if ttl <= 0:
+            return
+        now = time.time()
+        async with self._lock:
+            for key in self._evictable():
+                entry = self._resident.get(key)
+                if entry is not None and now - entry.last_used > ttl:
+                    await self._evict(key, f'idle for {now - entry.last_used:.0f}s (ttl={ttl}s)')
+
+    async def evict_all(self, reason: str = 'manual'):
+        async with self._lock:
+            for key in self._evictable():
+                await self._evict(key, reason)
+
+    async def _evict(self, key: int, reason: str):
+        entry = self._resident.pop(key, None)
+        if entry is None:
+            return
+        self._record(entry, reason)
+        logger.info(f'Unloading {entry.name} ({reason}), freed ram={entry.ram_bytes / _MB:.1f}MB, vram={entry.vram_bytes / _MB:.1f}MB')
+        try:
+            await entry.unload()
+        except Exception as e:
+            logger.error(f'Failed to unload {entry.name}: {e}')
+        if entry.vram_bytes and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def _record(self, entry: ResidentModel, reason: str):
+        self._evictions.append(EvictionRecord(time.time(), entry.name, reason, entry.ram_bytes, entry.vram_bytes))
+
+    # --- 查看 ---
+
+    def snapshot(self) -> List[dict]:
+        """当前驻留模型，按最近使用排序（最久未使用在前）"""
+        return [{
+            'name': e.name,
+            'device': e.device,
+            'ram_mb': round(e.ram_bytes / _MB, 1),
+            'vram_mb': round(e.vram_bytes / _MB, 1),
+            'pinned': e.name in self._pinned,
+            'in_use': e.in_use,
+            'idle_seconds': round(time.time() - e.last_used, 1),
+        } for e in self._resident.values()]
+
+    def evictions(self) -> List[EvictionRecord]:
+        return list(self._evictions)
+
+    def summary(self) -> str:
+        ram, vram = self.usage()
+        lines = [f'Resident models: ram={ram / _MB:.0f}/{self.ram_budget_bytes / _MB:.0f}MB, '
+                 f'vram={vram / _MB:.0f}/{self.vram_budget_bytes / _MB:.0f}MB (0 = unlimited)']
+        for info in self.snapshot():
+            lines.append(f"  {info['name']} [{info['device']}] ram={info['ram_mb']}MB vram={info['vram_mb']}MB"
+                         f"{' pinned' if info['pinned'] else ''}{' in-use' if info['in_use'] else ''}"
+                         f" idle={info['idle_seconds']}s")
+        for record in list(self._evictions)[-5:]:
+            lines.append(f'  evicted {record.name}: {record.reason}')
+        return '\n'.join(lines)
+
+
+# 进程级共享实例，所有 ModelWrapper 都向它登记
+model_residency = ModelResidencyManager()
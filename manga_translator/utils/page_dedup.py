@@ -0,0 +1,288 @@
+"""
+重复页面/区域的感知哈希索引
+
+扫图批次里经常有重复页（汉化组名单、封面、前情提要、章节标题页）和重复的拟声词区域。
+这里对图片计算 pHash + dHash（64 位），与之前处理过的图片比较汉明距离，
+在容差内（两个哈希都满足）就视为同一张图，直接复用之前各阶段的结果。
+
+mode:
+    perceptual - 先按字节哈希精确匹配，再按感知哈希找近似重复
+    strict     - 只复用字节完全相同的图片
+lookup(exact_only=True) 在 perceptual 索引上只做精确匹配：只差几个字的页面（不同章节号的标题页）
+感知哈希可能完全相同，整页复用时需要调用方显式选择。
+结果只在签名（影响输出的配置）相同时复用；设置 cache_dir 后会写入磁盘，下次运行仍可命中。
+
+磁盘缓存用 pickle 保存，只应指向本程序自己写入的可信目录。读回时只允许结果中会出现的类型
+（numpy 数组、PIL 图片、TextBlock），其它对象一律拒绝，按未命中处理。
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .log import get_logger
+
+logger = get_logger('PageDedup')
+
+DEDUP_MODES = ('off', 'perceptual', 'strict')
+_MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ImageFingerprint:
+    sha: str
+    phash: int
+    dhash: int
+    shape: Tuple[int, ...]
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int(np.packbits(bits.reshape(-1).astype(np.uint8)).view('>u8')[0])
+
+
+def _to_gray(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    if isinstance(image, Image.Image):
+        return np.asarray(image.convert('L'))
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+
+def dhash(gray: np.ndarray, size: int = 8) -> int:
+    """差值哈希：相邻像素亮度比较"""
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA).astype(np.int16)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def phash(gray: np.ndarray, size: int = 8, factor: int = 4) -> int:
+    """感知哈希：32x32 DCT 的低频 8x8 与中位数比较"""
+    small = cv2.resize(gray, (size * factor, size * factor), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:size, :size]
+    return _bits_to_int(low > np.median(low))
+
+
+def fingerprint(image: Union[Image.Image, np.ndarray]) -> ImageFingerprint:
+    if isinstance(image, Image.Image):
+        raw = image.tobytes()
+        shape = (image.height, image.width, len(image.getbands()))
+        header = f'{image.mode}{image.size}'.encode()
+    else:
+        image = np.ascontiguousarray(image)
+        raw = image.tobytes()
+        shape = tuple(image.shape)
+        header = f'{image.dtype}{image.shape}'.encode()
+    sha = hashlib.sha256(header + raw).hexdigest()
+    gray = _to_gray(image)
+    return ImageFingerprint(sha, phash(gray), dhash(gray), shape)
+
+
+def config_signature(*parts: Any) -> str:
+    """把影响输出的配置压成短摘要"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _payload_nbytes(obj, depth: int = 3) -> int:
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, Image.Image):
+        return obj.width * obj.height * len(obj.getbands())
+    if depth <= 0:
+        return 0
+    if isinstance(obj, dict):
+        return sum(_payload_nbytes(v, depth - 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_payload_nbytes(v, depth - 1) for v in obj)
+    return 0
+
+
+# 读回磁盘缓存时允许的类型：(模块, 名称)，numpy 按模块前缀匹配（不同版本的内部模块名不同）
+_PICKLE_ALLOWED = {
+    ('PIL.Image', 'Image'),
+    ('manga_translator.utils.textblock', 'TextBlock'),
+}
+_PICKLE_ALLOWED_NUMPY = {'dtype', 'ndarray', 'scalar', '_reconstruct', '_frombuffer'}
+
+
+class _CacheUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if (module, name) in _PICKLE_ALLOWED or (
+                (module == 'numpy' or module.startswith('numpy.')) and name in _PICKLE_ALLOWED_NUMPY):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f'Refusing to load {module}.{name} from dedup cache')
+
+
+@dataclass
+class DedupStats:
+    lookups: int = 0
+    exact_hits: int = 0
+    near_hits: int = 0
+    stores: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.near_hits
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    fp: ImageFingerprint
+    signature: str
+    payload: Any = None
+    nbytes: int = 0
+    path: Optional[str] = None
+
+
+class DedupIndex:
+    """
+    指纹 -> 结果的索引。内存中的结果按字节数做 LRU，超出 max_memory_mb 时丢弃最久未用的结果
+    （有磁盘缓存时仍可从磁盘读回）。
+    """
+
+    def __init__(self, name: str, mode: str = 'perceptual', max_distance: int = 4,
+                 max_memory_mb: float = 512, cache_dir: Optional[str] = None):
+        if mode not in DEDUP_MODES or mode == 'off':
+            raise ValueError(f'Invalid dedup mode: {mode}')
+        self.name = name
+        self.mode = mode
+        self.max_distance = max_distance
+        self.max_memory_bytes = int(max_memory_mb * _MB)
+        self.stats = DedupStats()
+        self._entries: 'OrderedDict[Tuple[str, str], _Entry]' = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._dir = os.path.join(cache_dir, name) if cache_dir else None
+        if self._dir:
+            self._load_disk_index()
+
+    # --- 磁盘缓存 ---
+
+    def _index_path(self) -> str:
+        return os.path.join(self._dir, 'index.jsonl')
+
+    def _load_disk_index(self):
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                item = json.loads(line)
+                fp = ImageFingerprint(item['sha'], int(item['phash']), int(item['dhash']), tuple(item['shape']))
+                path = os.path.join(self._dir, item['file'])
+            except (ValueError, KeyError):
+                continue
+            if os.path.isfile(path):
+                self._entries[(fp.sha, item['signature'])] = _Entry(fp, item['signature'], path=path)
+        if self._entries:
+            logger.info(f'Loaded {len(self._entries)} {self.name} fingerprints from {self._dir}')
+
+    def _write_disk(self, entry: _Entry):
+        os.makedirs(self._dir, exist_ok=True)
+        file_name = f'{entry.fp.sha[:32]}_{entry.signature[:12]}.pkl'
+        path = os.path.join(self._dir, file_name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry.payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        with open(self._index_path(), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'sha': entry.fp.sha, 'phash': str(entry.fp.phash), 'dhash': str(entry.fp.dhash),
+                                'shape': list(entry.fp.shape), 'signature': entry.signature, 'file': file_name}) + '\n')
+        entry.path = path
+
+    # --- 查找与保存 ---
+
+    def _find(self, fp: ImageFingerprint, signature: str, exact_only: bool = False) -> Tuple[Optional[_Entry], int]:
+        """返回 (条目, 汉明距离)；字节相同时距离为 -1"""
+        entry = self._entries.get((fp.sha, signature))
+        if entry is not None or exact_only or self.mode == 'strict':
+            return entry, -1
+        best, best_distance = None, self.max_distance + 1
+        for candidate in self._entries.values():
+            if candidate.signature != signature or candidate.fp.shape != fp.shape:
+                continue
+            distance = max((candidate.fp.phash ^ fp.phash).bit_count(), (candidate.fp.dhash ^ fp.dhash).bit_count())
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best, best_distance
+
+    def lookup(self, fp: ImageFingerprint, signature: str, exact_only: bool = False) -> Optional[Tuple[Any, int]]:
+        """返回 (之前保存的结果, 汉明距离)，字节相同时距离为 -1，未命中返回 None；exact_only 时只接受字节相同"""
+        with self._lock:
+            self.stats.lookups += 1
+            entry, distance = self._find(fp, signature, exact_only)
+            if entry is None:
+                return None
+            payload = entry.payload
+            path = entry.path
+        if payload is None:
+            try:
+                with open(path, 'rb') as f:
+                    payload = _CacheUnpickler(f).load()
+            except Exception as e:
+                logger.warning(f'Failed to read cached {self.name} result {path}: {e}')
+                return None
+            with self._lock:
+                self._remember(entry, payload)
+        with self._lock:
+            self._entries.move_to_end((entry.fp.sha, entry.signature))
+            if distance < 0:
+                self.stats.exact_hits += 1
+            else:
+                self.stats.near_hits += 1
+        return payload, distance
+
+    def store(self, fp: ImageFingerprint, signature: str, payload: Any):
+        entry = _Entry(fp, signature)
+        with self._lock:
+            old = self._entries.pop((fp.sha, signature), None)
+            if old is not None and old.payload is not None:
+                self._memory_bytes -= old.nbytes
+            self._entries[(fp.sha, signature)] = entry
+            self._remember(entry, payload)
+            self.stats.stores += 1
+        if self._dir:
+            try:
+                self._write_disk(entry)
+            except Exception as e:
+                logger.warning(f'Failed to write {self.name} dedup cache to {self._dir}: {e}')
+
+    def _remember(self, entry: _Entry, payload: Any):
+        entry.payload = payload
+        entry.nbytes = _payload_nbytes(payload)
+        self._memory_bytes += entry.nbytes
+        # 超出内存预算时丢弃最久未用的结果；没有磁盘缓存的条目整个删除
+        for key in list(self._entries.keys()):
+            if self._memory_bytes <= self.max_memory_bytes:
+                break
+            old = self._entries[key]
+            if old is entry or old.payload is None:
+                continue
+            self._memory_bytes -= old.nbytes
+            old.payload = None
+            if old.path is None:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f'{self.name} dedup ({self.mode}): {s.hits}/{s.lookups} hits ({s.hit_rate:.0%}, '
+                f'{s.exact_hits} exact, {s.near_hits} near), {len(self._entries)} entries, '
+                f'{self._memory_bytes / _MB:.0f}MB in memory')
@@ -139,6 +139,41 @@ def find_json_path(image_path: str) -> Optional[str]:
     return None
 
 
+def get_sidecar_path(image_path: str, create_dir: bool = True) -> str:
+    """
+    获取二进制翻译数据文件（*_translations.mtpack）的路径，与JSON位于同一目录
+    
+    Args:
+        image_path: 原图片路径
+        create_dir: 是否自动创建目录
+        
+    Returns:
+        二进制文件的绝对路径
+    """
+    return os.path.splitext(get_json_path(image_path, create_dir))[0] + '.mtpack'
+
+
+def find_translation_file(image_path: str) -> Optional[str]:
+    """
+    查找翻译数据文件（JSON 或二进制 .mtpack）
+    
+    两者都存在时返回较新的一个（例如用编辑器修改过JSON），否则与 find_json_path 行为一致
+    
+    Args:
+        image_path: 原图片路径
+        
+    Returns:
+        找到的文件路径，如果不存在返回None
+    """
+    json_path = find_json_path(image_path)
+    sidecar_path = get_sidecar_path(image_path, create_dir=False)
+    if not os.path.exists(sidecar_path):
+        return json_path
+    if json_path and os.path.getmtime(json_path) > os.path.getmtime(sidecar_path):
+        return json_path
+    return sidecar_path
+
+
 def find_inpainted_path(image_path: str) -> Optional[str]:
     """
     查找修复后的图片文件
@@ -0,0 +1,169 @@
+"""
+译前/译后替换字典引擎
+
+字典文件按 (路径, 修改时间, 大小) 只解析、编译一次。应用时不再对每条规则都跑一次正则：
+纯文本规则放进一个 Aho-Corasick 自动机，一次扫描找出文本里实际出现的规则，
+只有真正的正则规则和命中的规则才会执行 sub。规则仍严格按文件中的顺序依次生效，
+某条规则修改文本后会在新文本上重新扫描后续的纯文本规则，因此结果与逐条执行完全一致。
+"""
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Tuple
+
+import regex as re
+
+from .log import get_logger
+
+logger = get_logger('Dictionary')
+
+# 不含这些字符的规则按字面量匹配
+_REGEX_META_CHARS = set('.^$*+?{}[]\\|()')
+
+
+def is_literal_pattern(pattern: str) -> bool:
+    return bool(pattern) and not any(c in _REGEX_META_CHARS for c in pattern)
+
+
+class _AhoCorasick:
+    """找出文本中出现的所有关键词（包括重叠出现），返回对应的规则下标"""
+
+    def __init__(self, keywords: List[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for word, index in keywords:
+            state = 0
+            for c in word:
+                nxt = self._goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][c] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and c not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(c, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> set:
+        found = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for c in text:
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class ReplaceDictionary:
+    """
+    编译后的替换字典。可以像原来的列表一样迭代得到 (pattern, value, line_number)。
+    """
+
+    def __init__(self, entries: List[Tuple['re.Pattern', str, int]]):
+        self.entries = entries
+        self._literal = [is_literal_pattern(pattern.pattern) for pattern, _, _ in entries]
+        self._regex_indices = [i for i, literal in enumerate(self._literal) if not literal]
+        self._automaton = _AhoCorasick([(pattern.pattern, i) for i, (pattern, _, _) in enumerate(entries) if self._literal[i]])
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def _candidates(self, text: str, start: int) -> List[int]:
+        hits = self._automaton.search(text)
+        hits.update(self._regex_indices)
+        return sorted(i for i in hits if i >= start)
+
+    def apply(self, text: str) -> str:
+        if not self.entries or not text:
+            return text
+        candidates = self._candidates(text, 0)
+        pos = 0
+        while pos < len(candidates):
+            index = candidates[pos]
+            pattern, value, line_number = self.entries[index]
+            new_text = pattern.sub(value, text)
+            if new_text != text:
+                logger.debug(f'Line {line_number}: Replaced "{text}" with "{new_text}" using pattern "{pattern.pattern}" and value "{value}"')
+                text = new_text
+                # 替换可能让后面的字面量规则新出现或消失，在新文本上重新筛选
+                candidates = self._candidates(text, index + 1)
+                pos = 0
+            else:
+                pos += 1
+        return text
+
+
+def parse_dictionary(file, on_error=None) -> List[Tuple['re.Pattern', str, int]]:
+    entries = []
+    for line_number, line in enumerate(file, start=1):
+        # Ignore empty lines and lines starting with '#' or '//'
+        if not line.strip() or line.strip().startswith('#') or line.strip().startswith('//'):
+            continue
+        # Remove comment parts
+        line = line.split('#')[0].strip()
+        line = line.split('//')[0].strip()
+        parts = line.split()
+        if len(parts) == 1:
+            # If there is only the left part, the right part defaults to an empty string, meaning delete the left part
+            entries.append((re.compile(parts[0]), '', line_number))
+        elif len(parts) == 2:
+            # If both left and right parts are present, perform the replacement
+            entries.append((re.compile(parts[0]), parts[1], line_number))
+        elif on_error is not None:
+            on_error(f'Invalid dictionary entry at line {line_number}: {line.strip()}')
+    return entries
+
+
+_cache: Dict[str, Tuple[Tuple[int, int], ReplaceDictionary]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_replace_dictionary(path: str, on_error=None) -> ReplaceDictionary:
+    """按路径和文件修改时间缓存编译结果，文件未变时直接复用"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ReplaceDictionary([])
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    with open(path, 'r', encoding='utf-8') as file:
+        dictionary = ReplaceDictionary(parse_dictionary(file, on_error))
+    with _cache_lock:
+        _cache[path] = (signature, dictionary)
+    return dictionary
+
+
+def apply_replace_dictionary(text: str, dictionary) -> str:
+    if isinstance(dictionary, ReplaceDictionary):
+        return dictionary.apply(text)
+    # 兼容直接传入 (pattern, value, line_number) 列表
+    for pattern, value, line_number in dictionary:
+        original_text = text
+        text = pattern.sub(value, text)
+        if text != original_text:
+            logger.debug(f'Line {line_number}: Replaced "{original_text}" with "{text}" using pattern "{pattern.pattern}" and value "{value}"')
+    return text
@@ -0,0 +1,160 @@
+"""
+翻译数据的二进制容器（*_translations.mtpack）
+
+JSON 中把 mask_raw 编成 base64 PNG，整页分辨率下文件大、解析慢。这里把文本区域等元数据
+存成紧凑 JSON 头，蒙版以原始数组存放在对齐的偏移处（可直接 np.memmap），或按内容选择
+游程编码（二值蒙版）/ zstd（已安装时）/ zlib 压缩。
+
+文件结构（小端）:
+    b'MTPK' | version:u16 | reserved:u16 | header_len:u32 | header(JSON) | 对齐到 64 字节 | mask payload
+"""
+import json
+import os
+import struct
+import uuid
+import zlib
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SIDECAR_EXT = '.mtpack'
+_MAGIC = b'MTPK'
+_VERSION = 1
+_PREFIX = struct.Struct('<4sHHI')
+_ALIGN = 64
+
+MASK_ENCODINGS = ('auto', 'raw', 'rle', 'zstd', 'zlib')
+
+
+class _NumpyEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        return super().default(obj)
+
+
+def _rle_encode(flat: np.ndarray) -> bytes:
+    if flat.size == 0:
+        return struct.pack('<I', 0)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(flat)) + 1))
+    lengths = np.diff(np.concatenate((starts, [flat.size]))).astype('<u4')
+    values = flat[starts]
+    return struct.pack('<I', len(starts)) + values.tobytes() + lengths.tobytes()
+
+
+def _rle_decode(payload: bytes, dtype: np.dtype, size: int) -> np.ndarray:
+    (count,) = struct.unpack_from('<I', payload)
+    values = np.frombuffer(payload, dtype=dtype, count=count, offset=4)
+    lengths = np.frombuffer(payload, dtype='<u4', count=count, offset=4 + count * dtype.itemsize)
+    out = np.repeat(values, lengths)
+    if out.size != size:
+        raise ValueError('Corrupted run-length mask payload')
+    return out
+
+
+def _choose_encoding(mask: np.ndarray) -> str:
+    # 二值蒙版游程很长，RLE 最小且编解码都是 numpy 向量操作
+    if mask.dtype == np.uint8 and np.count_nonzero(np.diff(mask.reshape(-1))) < mask.size // 64:
+        return 'rle'
+    return 'zstd' if zstandard is not None else 'zlib'
+
+
+def _encode_mask(mask: np.ndarray, encoding: str) -> Tuple[str, bytes]:
+    mask = np.ascontiguousarray(mask)
+    if encoding == 'auto':
+        encoding = _choose_encoding(mask)
+    if encoding == 'zstd' and zstandard is None:
+        encoding = 'zlib'
+    if encoding == 'raw':
+        return encoding, mask.tobytes()
+    if encoding == 'rle':
+        return encoding, _rle_encode(mask.reshape(-1))
+    if encoding == 'zstd':
+        return encoding, zstandard.ZstdCompressor(level=3).compress(mask.tobytes())
+    if encoding == 'zlib':
+        return encoding, zlib.compress(mask.tobytes(), 1)
+    raise ValueError(f'Unknown mask encoding: {encoding}')
+
+
+def save_sidecar(path: str, image_key: str, image_data: dict, mask: Optional[np.ndarray] = None, mask_encoding: str = 'auto'):
+    """
+    写入二进制容器。image_data 与 JSON 中 {image_key: image_data} 的值相同（不含 mask_raw）。
+    先写临时文件再重命名，避免中断时留下损坏的文件。
+    """
+    header = {'image_key': image_key, 'data': image_data, 'mask': None}
+    payload = b''
+    if mask is not None:
+        encoding, payload = _encode_mask(mask, mask_encoding)
+        header['mask'] = {
+            'shape': list(mask.shape),
+            'dtype': np.dtype(mask.dtype).str,
+            'encoding': encoding,
+            'nbytes': len(payload),
+        }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':'), cls=_NumpyEncoder).encode('utf-8')
+    payload_offset = -(-(_PREFIX.size + len(header_bytes)) // _ALIGN) * _ALIGN
+
+    tmp_path = os.path.join(os.path.dirname(path) or '.', f'.{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_PREFIX.pack(_MAGIC, _VERSION, 0, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b'\0' * (payload_offset - _PREFIX.size - len(header_bytes)))
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_sidecar(path: str, mmap: bool = False) -> Tuple[str, dict, Optional[np.ndarray]]:
+    """
+    读取二进制容器，返回 (image_key, image_data, mask)。
+    mmap=True 且蒙版未压缩时返回只读的 np.memmap，不把蒙版读进内存。
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f'{path} is not a translation sidecar file')
+        magic, version, _, header_len = _PREFIX.unpack(prefix)
+        if magic != _MAGIC:
+            raise ValueError(f'{path} is not a translation sidecar file')
+        if version > _VERSION:
+            raise ValueError(f'Unsupported sidecar version {version} in {path}')
+        header = json.loads(f.read(header_len).decode('utf-8'))
+        mask_info = header.get('mask')
+        mask = None
+        if mask_info:
+            shape = tuple(mask_info['shape'])
+            dtype = np.dtype(mask_info['dtype'])
+            offset = -(-(_PREFIX.size + header_len) // _ALIGN) * _ALIGN
+            encoding = mask_info['encoding']
+            if encoding == 'raw' and mmap:
+                mask = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+            else:
+                f.seek(offset)
+                payload = f.read(mask_info['nbytes'])
+                size = int(np.prod(shape))
+                if encoding == 'raw':
+                    mask = np.frombuffer(payload, dtype=dtype, count=size).reshape(shape).copy()
+                elif encoding == 'rle':
+                    mask = _rle_decode(payload, dtype, size).reshape(shape)
+                elif encoding == 'zstd':
+                    if zstandard is None:
+                        raise ImportError('zstandard is required to read this sidecar file (pip install zstandard)')
+                    mask = np.frombuffer(zstandard.ZstdDecompressor().decompress(payload), dtype=dtype).reshape(shape).copy()
+                elif encoding == 'zlib':
+                    mask = np.frombuffer(zlib.decompress(payload), dtype=dtype).reshape(shape).copy()
+                else:
+                    raise ValueError(f'Unknown mask encoding {encoding} in {path}')
+    return header.get('image_key', ''), header.get('data') or {}, mask